@@ -1,11 +1,46 @@
-from flask import Flask, render_template, request, send_file, flash, redirect, url_for
+from flask import Flask, render_template, request, send_file, flash, redirect, url_for, jsonify, g, has_request_context
+import hashlib
+import io
+import json
+import multiprocessing
 import os
 import re
 import logging
+import sqlite3
+import sys
+import numpy as np
+import pandas as pd
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import repeat
 from logging.handlers import RotatingFileHandler
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from datetime import datetime
+
+from blend import (ATS_SOURCES, BLEND_FACTORS, DEFAULT_BLEND, AtsSource, TeamFeatures, blend_scores, blend_sources,
+                   format_blend, parse_blend, register_ats_source)
+from cache import LRUCache
+# The parsers and chart code live outside the web app (ingest and backtest run without Flask);
+# names only the tests and benchmarks use are still importable from here
+from charting import (FUZZY_SUGGESTION_MIN, TEAM_TABLES, TeamResolver, TrigramIndex, chart_frame, chart_rows_from_frame,
+                      create_daily_chart, derive_abbreviation, normalize_team_name, play_market,
+                      team_name_mapping)
+from linehistory import LINE_HISTORY_PATH, LineHistory, record_line, seen_text, slate_moves
+from metrics import MetricsRegistry, server_timing_header
+from parsing import (MAX_INPUT_SIZE, InputTooLargeError, detect_schedule_format, iter_ats_records, iter_espn_schedule,
+                     iter_text_lines, load_ats_data_from_text, make_spread, parse_desktop_format,
+                     parse_espn_schedule_from_text, schedule_date)
+from records import CHART_COLUMNS, ChartRow, as_games, row_confidence
+from store import STORE_PATH, ChartStore
+from workbook import ChartSheetTemplate
+from sweeper import ArtifactSweeper
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this-in-production'
@@ -17,565 +52,211 @@ if not os.path.exists('logs'):
 logger = logging.getLogger('ncaa_ats_app')
 logger.setLevel(logging.INFO)
 
-# File handler with rotation (10MB max, keep 7 backup files)
-file_handler = RotatingFileHandler('logs/app.log', maxBytes=10*1024*1024, backupCount=7)
-file_handler.setLevel(logging.INFO)
+# Handlers are added once even when this module is imported twice (python -m app ingest)
+if not logger.handlers:
+    # File handler with rotation (10MB max, keep 7 backup files)
+    file_handler = RotatingFileHandler('logs/app.log', maxBytes=10*1024*1024, backupCount=7)
+    file_handler.setLevel(logging.INFO)
 
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
 
-# Format: timestamp - level - message
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
+    # Format: timestamp - level - message
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
 
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
 
-# Team name mapping - ESPN Name -> TeamRankings Name
-TEAM_NAME_MAPPING = {}
+# Request, stage and output metrics, served in Prometheus text format at /metrics
+METRICS = MetricsRegistry()
 
-def load_team_name_mapping():
-    """Load complete team name mappings for all 365 Division I teams"""
-    global TEAM_NAME_MAPPING
-    
-    TEAM_NAME_MAPPING = {
-        'Arkansas-Pine Bluff': 'AR-Pine Bluff', 'Abilene Christian': 'Abl Christian',
-        'Alabama State': 'Alabama St', 'Alcorn State': 'Alcorn St', 'Appalachian State': 'App State',
-        'App State': 'App State',
-        'Arizona State': 'Arizona St', 'Arkansas State': 'Arkansas St', 'Ball State': 'Ball St',
-        'Bethune-Cookman': 'Bethune', 'Boise State': 'Boise St', 'Boston University': 'Boston U',
-        'Central Arkansas': 'C Arkansas', 'Central Connecticut': 'C Connecticut', 'Central Michigan': 'C Michigan',
-        'CSU Bakersfield': 'CS Bakersfield', 'Cal State Bakersfield': 'CS Bakersfield',
-        'Cal State Fullerton': 'CS Fullerton', 'CSU Northridge': 'CS Northridge',
-        'Cal State Northridge': 'CS Northridge', 'Cal Baptist': 'Cal Baptist', 'California Baptist': 'Cal Baptist',
-        'Charleston Southern': 'Charleston So', 'Chicago State': 'Chicago St', 'Cleveland State': 'Cleveland St',
-        'Coastal Carolina': 'Coastal Car', 'Colorado State': 'Colorado St', 'Coppin State': 'Coppin St',
-        'East Carolina': 'E Carolina', 'Eastern Illinois': 'E Illinois', 'Eastern Kentucky': 'E Kentucky',
-        'Eastern Michigan': 'E Michigan', 'East Tennessee State': 'E Tennessee St', 'East Texas A&M': 'E Texas A&M',
-        'Eastern Washington': 'E Washington', 'Fairleigh Dickinson': 'F Dickinson', 'Florida Gulf Coast': 'FGCU',
-        'Florida International': 'Florida Intl', 'Florida State': 'Florida St', 'Fresno State': 'Fresno St',
-        'George Washington': 'G Washington', 'Gardner-Webb': 'Gardner-Webb', 'Georgia Southern': 'Georgia So',
-        'Georgia State': 'Georgia St', 'Hawaii': "Hawai'i", "Hawai'i": "Hawai'i", "Hawai'i": "Hawai'i", 'Houston Christian': 'Hou Christian',
-        'IU Indianapolis': 'IU Indy', 'Idaho State': 'Idaho St', 'UIC': 'Illinois Chicago',
-        'Illinois State': 'Illinois St', 'Indiana State': 'Indiana St', 'Iowa State': 'Iowa St',
-        'James Madison': 'J Madison', 'Jackson State': 'Jackson St', 'Jacksonville State': 'Jacksonville St',
-        'Kansas State': 'Kansas St', 'Kennesaw State': 'Kennesaw St', 'Kent State': 'Kent St',
-        'Long Beach State': 'Long Beach St', 'Loyola Chicago': 'Loyola Chi', 'Loyola Maryland': 'Loyola MD',
-        'Loyola Marymount': 'Loyola Mymt', 'Maryland Eastern Shore': 'Maryland ES',
-        'Maryland-Eastern Shore': 'Maryland ES', 'UMES': 'Maryland ES',
-        'Miami (OH)': 'Miami OH',
-        'Miami (FL)': 'Miami', 'Michigan State': 'Michigan St', 'Middle Tennessee': 'Middle Tenn',
-        'Mississippi Valley State': 'Miss Valley St', 'Ole Miss': 'Mississippi', 'Mississippi State': 'Mississippi St',
-        'Missouri State': 'Missouri St', 'Montana State': 'Montana St', 'Morehead State': 'Morehead St',
-        'Morgan State': 'Morgan St', "Mount St. Mary's": "Mt St Mary's", "Mt. St. Mary's": "Mt St Mary's",
-        "Mount St Mary's": "Mt St Mary's", 'Murray State': 'Murray St',
-        'North Alabama': 'N Alabama', 'Northern Arizona': 'N Arizona', 'Northern Colorado': 'N Colorado',
-        'North Dakota State': 'N Dakota St', 'North Florida': 'N Florida', 'Northern Illinois': 'N Illinois',
-        'Northern Iowa': 'N Iowa', 'Northern Kentucky': 'N Kentucky', 'North Texas': 'N Texas',
-        'North Carolina A&T': 'NC A&T', 'UNC Asheville': 'NC Asheville', 'NC Central': 'NC Central',
-        'North Carolina Central': 'NC Central',
-        'UNC Greensboro': 'NC Greensboro', 'UNC Wilmington': 'NC Wilmington', 'Northwestern State': 'NW State',
-        'Norfolk State': 'Norfolk St', 'Ohio State': 'Ohio St', 'Oklahoma State': 'Oklahoma St',
-        'Oregon State': 'Oregon St', 'Penn State': 'Penn St', 'Portland State': 'Portland St',
-        'Prairie View A&M': 'Prairie View', 'Purdue Fort Wayne': 'Purdue FW', 'Queens University': 'Queens',
-        'South Alabama': 'S Alabama', 'South Carolina State': 'S Carolina St', 'South Dakota State': 'S Dakota St',
-        'South Florida': 'S Florida', 'Southern Illinois': 'S Illinois', 'Southern Indiana': 'S Indiana',
-        'Southern Utah': 'S Utah', 'Southeastern Louisiana': 'SE Louisiana', 'SE Louisiana': 'SE Louisiana',
-        'Southeast Missouri State': 'SE Missouri St',
-        'Pennsylvania': 'Penn',
-        'Stephen F. Austin': 'SF Austin', 'Stephen F Austin': 'SF Austin',
-        'SIU Edwardsville': 'SIU Edward', 'Sacramento State': 'Sacramento St',
-        "Saint Mary's (CA)": "Saint Mary's", 'Sam Houston State': 'Sam Houston', 
-        "St. Mary's": "Saint Mary's", "St. Mary's (CA)": "Saint Mary's", "Saint Mary's": "Saint Mary's", 'San Diego State': 'San Diego St',
-        'San Jose State': 'San Jose St', 'San José State': 'San Jose St',
-        'St. Bonaventure': 'St Bonaventure', 'St. Francis (PA)': 'St Francis PA', 'Saint Francis': 'St Francis PA',
-        "St. John's": "St John's", "St John's": "St John's", "Saint John's": "St John's",
-        'St. Thomas': 'St Thomas', 'St. Thomas-Minnesota': 'St Thomas', 'Tarleton State': 'Tarleton St',
-        'Tennessee Tech': 'Tenn Tech', 'Tennessee State': 'Tennessee St', 'Texas A&M-Corpus Christi': 'Texas A&M-CC',
-        'Texas Southern': 'Texas So', 'Texas State': 'Texas St', 'UC San Diego': 'UCSD',
-        'UC Santa Barbara': 'UCSB', 'UMass': 'UMass', 'UT Rio Grande Valley': 'UT Rio Grande',
-        'Utah State': 'Utah St', 'Weber State': 'Weber St', 'Western Carolina': 'W Carolina',
-        'West Georgia': 'W Georgia', 'Western Illinois': 'W Illinois', 'Western Kentucky': 'W Kentucky',
-        'Western Michigan': 'W Michigan', 'Wichita State': 'Wichita St', 'Wright State': 'Wright St',
-        'Washington State': 'Washington St', 'Youngstown State': 'Youngstown St',
-        'Air Force': 'Air Force', 'Akron': 'Akron', 'Alabama': 'Alabama', 'Alabama A&M': 'Alabama A&M',
-        'Albany': 'Albany', 'UAlbany': 'Albany', 'American': 'American', 'American University': 'American',
-        'Arizona': 'Arizona',
-        'Arkansas': 'Arkansas', 'Army': 'Army', 'Auburn': 'Auburn', 'Austin Peay': 'Austin Peay',
-        'BYU': 'BYU', 'Baylor': 'Baylor', 'Bellarmine': 'Bellarmine', 'Belmont': 'Belmont',
-        'Binghamton': 'Binghamton', 'Boston College': 'Boston College', 'Bowling Green': 'Bowling Green',
-        'Bradley': 'Bradley', 'Brown': 'Brown', 'Bryant': 'Bryant', 'Bucknell': 'Bucknell',
-        'Buffalo': 'Buffalo', 'Butler': 'Butler', 'Cal Poly': 'Cal Poly', 'California': 'California',
-        'Campbell': 'Campbell', 'Canisius': 'Canisius', 'Charleston': 'Charleston', 'Charlotte': 'Charlotte',
-        'Chattanooga': 'Chattanooga', 'Cincinnati': 'Cincinnati', 'Clemson': 'Clemson', 'Colgate': 'Colgate',
-        'Colorado': 'Colorado', 'Columbia': 'Columbia', 'Cornell': 'Cornell', 'Creighton': 'Creighton',
-        'Dartmouth': 'Dartmouth', 'Davidson': 'Davidson', 'Dayton': 'Dayton', 'DePaul': 'DePaul',
-        'Delaware': 'Delaware', 'Delaware State': 'Delaware St', 'Denver': 'Denver', 'Detroit Mercy': 'Detroit Mercy',
-        'Drake': 'Drake', 'Drexel': 'Drexel', 'Duke': 'Duke', 'Duquesne': 'Duquesne',
-        'Elon': 'Elon', 'Evansville': 'Evansville', 'Fairfield': 'Fairfield', 'Florida': 'Florida',
-        'Florida A&M': 'Florida A&M', 'Florida Atlantic': 'Florida Atlantic', 'Fordham': 'Fordham',
-        'Furman': 'Furman', 'George Mason': 'George Mason', 'Georgetown': 'Georgetown', 'Georgia': 'Georgia',
-        'Georgia Tech': 'Georgia Tech', 'Gonzaga': 'Gonzaga', 'Grambling': 'Grambling',
-        'Grand Canyon': 'Grand Canyon', 'Green Bay': 'Green Bay', 'Hampton': 'Hampton', 'Harvard': 'Harvard',
-        'High Point': 'High Point', 'Hofstra': 'Hofstra', 'Holy Cross': 'Holy Cross', 'Houston': 'Houston',
-        'Howard': 'Howard', 'Idaho': 'Idaho', 'Illinois': 'Illinois', 'Incarnate Word': 'Incarnate Word',
-        'Indiana': 'Indiana', 'Iona': 'Iona', 'Iowa': 'Iowa', 'Jacksonville': 'Jacksonville',
-        'Kansas': 'Kansas', 'Kansas City': 'Kansas City', 'Kentucky': 'Kentucky', 'LIU': 'LIU',
-        'LSU': 'LSU', 'La Salle': 'La Salle', 'Lafayette': 'Lafayette', 'Lamar': 'Lamar',
-        'Le Moyne': 'Le Moyne', 'Lehigh': 'Lehigh', 'Liberty': 'Liberty', 'Lindenwood': 'Lindenwood',
-        'Lipscomb': 'Lipscomb', 'Little Rock': 'Little Rock', 'Longwood': 'Longwood', 'Louisiana': 'Louisiana',
-        'Louisiana Tech': 'Louisiana Tech', 'Louisville': 'Louisville', 'Maine': 'Maine', 'Manhattan': 'Manhattan',
-        'Marist': 'Marist', 'Marquette': 'Marquette', 'Marshall': 'Marshall', 'Maryland': 'Maryland',
-        'McNeese': 'McNeese', 'Memphis': 'Memphis', 'Mercer': 'Mercer', 'Mercyhurst': 'Mercyhurst',
-        'Merrimack': 'Merrimack', 'Michigan': 'Michigan', 'Milwaukee': 'Milwaukee', 'Minnesota': 'Minnesota',
-        'Missouri': 'Missouri', 'Monmouth': 'Monmouth', 'Montana': 'Montana', 'NJIT': 'NJIT',
-        'NC State': 'NC State', 'Navy': 'Navy', 'Nebraska': 'Nebraska', 'Nevada': 'Nevada',
-        'New Hampshire': 'New Hampshire', 'New Haven': 'New Haven', 'New Mexico': 'New Mexico',
-        'New Mexico State': 'New Mexico St', 'New Orleans': 'New Orleans', 'Niagara': 'Niagara',
-        'Nicholls': 'Nicholls', 'North Carolina': 'North Carolina', 'North Dakota': 'North Dakota',
-        'Northeastern': 'Northeastern', 'Northwestern': 'Northwestern', 'Notre Dame': 'Notre Dame',
-        'Oakland': 'Oakland', 'Ohio': 'Ohio', 'Oklahoma': 'Oklahoma', 'Old Dominion': 'Old Dominion',
-        'Omaha': 'Omaha', 'Oral Roberts': 'Oral Roberts', 'Oregon': 'Oregon', 'Pacific': 'Pacific',
-        'Penn': 'Penn', 'Pepperdine': 'Pepperdine', 'Pittsburgh': 'Pittsburgh', 'Portland': 'Portland',
-        'Presbyterian': 'Presbyterian', 'Princeton': 'Princeton', 'Providence': 'Providence', 'Purdue': 'Purdue',
-        'Queens': 'Queens', 'Quinnipiac': 'Quinnipiac', 'Radford': 'Radford', 'Rhode Island': 'Rhode Island',
-        'Rice': 'Rice', 'Richmond': 'Richmond', 'Rider': 'Rider', 'Robert Morris': 'Robert Morris',
-        'Rutgers': 'Rutgers', 'SC Upstate': 'SC Upstate', 'South Carolina Upstate': 'SC Upstate',
-        'SMU': 'SMU', 'Sacred Heart': 'Sacred Heart',
-        "Saint Joseph's": "Saint Joseph's", 'Saint Louis': 'Saint Louis', "Saint Peter's": "Saint Peter's",
-        "St. Joseph's": "Saint Joseph's", 'St. Louis': 'Saint Louis', "St. Peter's": "Saint Peter's",
-        "Saint Joe's": "Saint Joseph's", "St. Joe's": "Saint Joseph's",
-        'Samford': 'Samford', 'San Diego': 'San Diego', 'San Francisco': 'San Francisco',
-        'Santa Clara': 'Santa Clara', 'Seattle': 'Seattle', 'Seattle U': 'Seattle', 'Seattle University': 'Seattle',
-        'Seton Hall': 'Seton Hall', 'Siena': 'Siena',
-        'South Carolina': 'South Carolina', 'South Dakota': 'South Dakota', 'Southern': 'Southern',
-        'Southern Miss': 'Southern Miss', 'Stanford': 'Stanford', 'Stetson': 'Stetson',
-        'Stonehill': 'Stonehill', 'Stony Brook': 'Stony Brook', 'Syracuse': 'Syracuse', 'TCU': 'TCU',
-        'Temple': 'Temple', 'Tennessee': 'Tennessee', 'Texas': 'Texas', 'Texas A&M': 'Texas A&M',
-        'Texas Tech': 'Texas Tech', 'The Citadel': 'The Citadel', 'Toledo': 'Toledo', 'Towson': 'Towson',
-        'Troy': 'Troy', 'Tulane': 'Tulane', 'Tulsa': 'Tulsa', 'UAB': 'UAB',
-        'UC Davis': 'UC Davis', 'UC Irvine': 'UC Irvine', 'UC Riverside': 'UC Riverside', 'UCF': 'UCF',
-        'UCLA': 'UCLA', 'UConn': 'UConn', 'UL Monroe': 'UL Monroe', 'UMBC': 'UMBC',
-        'Connecticut': 'UConn', 'Massachusetts': 'UMass', 'Massachusetts Lowell': 'UMass Lowell',
-        'Maryland Baltimore County': 'UMBC', 'Virginia Commonwealth': 'VCU',
-        'Central Florida': 'UCF', 'Southern Methodist': 'SMU', 'Southern California': 'USC',
-        'Louisiana State': 'LSU', 'Brigham Young': 'BYU', 'Texas Christian': 'TCU',
-        'North Carolina State': 'NC State', 'N.C. State': 'NC State',
-        'Miami FL': 'Miami', 'Miami (Ohio)': 'Miami OH',
-        'UMass Lowell': 'UMass Lowell', 'UNLV': 'UNLV', 'USC': 'USC', 'UT Arlington': 'UT Arlington',
-        'UT Martin': 'UT Martin', 'UTEP': 'UTEP', 'UTSA': 'UTSA', 'Utah': 'Utah',
-        'Utah Tech': 'Utah Tech', 'Utah Valley': 'Utah Valley', 'VCU': 'VCU', 'VMI': 'VMI',
-        'Valparaiso': 'Valparaiso', 'Vanderbilt': 'Vanderbilt', 'Vermont': 'Vermont', 'Villanova': 'Villanova',
-        'Virginia': 'Virginia', 'Virginia Tech': 'Virginia Tech', 'Wagner': 'Wagner', 'Wake Forest': 'Wake Forest',
-        'Washington': 'Washington', 'West Virginia': 'West Virginia', 'William & Mary': 'William & Mary',
-        'William and Mary': 'William & Mary',
-        'Winthrop': 'Winthrop', 'Wisconsin': 'Wisconsin', 'Wofford': 'Wofford', 'Wyoming': 'Wyoming',
-        'Xavier': 'Xavier', 'Yale': 'Yale',
-    }
-
-# Load the mapping when the module is imported
-load_team_name_mapping()
-
-def derive_abbreviation(team_name):
-    """Derive team abbreviation from full name - EXACT copy from skill"""
-    abbrev_map = {
-        'Air Force': 'AF', 'Akron': 'AKR', 'Alabama State': 'ALST', 'Middle Tennessee': 'MTSU',
-        'Michigan': 'MICH', 'Harvard': 'HARV', 'Penn State': 'PSU', 'Arizona': 'ARIZ',
-        'UConn': 'CONN', 'Chattanooga': 'UTC', 'South Carolina State': 'SCST',
-        'South Alabama': 'USA', 'Jacksonville State': 'JXST', 'Bethune-Cookman': 'BCU',
-        'Ohio': 'OHIO', 'Louisiana Tech': 'LT', 'Indiana State': 'INST', 'Hofstra': 'HOF',
-        'Temple': 'TEM', 'Tennessee Tech': 'TNTC', 'South Carolina Upstate': 'UPST',
-        'Howard': 'HOW', 'Stetson': 'STET', 'North Florida': 'UNF', 'Wofford': 'WOF',
-        'William & Mary': 'WM', 'Bowling Green': 'BGSU', 'Indiana': 'IU', 'Utah State': 'USU',
-        'St. Bonaventure': 'SBU', 'Western Michigan': 'WMU', 'UNC Wilmington': 'UNCW',
-        'North Carolina Central': 'NCC', 'Kent State': 'KENT', 'Old Dominion': 'ODU',
-        'Northern Illinois': 'NIU', 'Louisiana': 'UL', 'UL Monroe': 'ULM', 'Texas State': 'TXST',
-        'Southern Miss': 'USM', 'Southeast Missouri State': 'SEMO', 'Southern Indiana': 'USI',
-        'Loyola Chicago': 'LUC', 'Santa Clara': 'SCU', 'James Madison': 'JMU',
-        'Georgia Southern': 'GASO', 'Omaha': 'OMA', 'Portland State': 'PRST',
-        'UC Riverside': 'UCR', 'Sacramento State': 'SAC', 'Northeastern': 'NE',
-        'Northwestern': 'NU', 'Central Michigan': 'CMU', 'Liberty': 'LIB',
-        'Chicago State': 'CHST', 'Saint Francis': 'SFPA', 'Georgia State': 'GAST',
-        'Denver': 'DEN', 'Marshall': 'MRSH', 'Grand Canyon': 'GCU', 'UT Martin': 'UTM',
-        'Utah Tech': 'UTU', 'Florida Gulf Coast': 'FGCU', 'Samford': 'SAM',
-        'Youngstown State': 'YSU', 'Toledo': 'TOL', 'Valparaiso': 'VALP',
-        'Cleveland State': 'CLE', 'Villanova': 'VILL', 'La Salle': 'LAS', 'Bryant': 'BRY',
-        'Virginia Tech': 'VT', 'Bellarmine': 'BELL', 'Notre Dame': 'ND', 'VMI': 'VMI',
-        'Richmond': 'RICH', 'UMBC': 'UMBC', 'George Washington': 'GW',
-        'Eastern Washington': 'EWU', 'Central Arkansas': 'CARK', 'Loyola Maryland': 'LOM',
-        'Duquesne': 'DUQ', "Mount St. Mary's": 'MSMT', 'Maryland': 'MD',
-        'UNC Asheville': 'UNCA', 'UNC Greensboro': 'UNCG', 'Western Carolina': 'WCU',
-        'Wyoming': 'WYO', 'Sam Houston': 'SHSU', 'Maine': 'ME', 'Merrimack': 'MRMK',
-        'Dayton': 'DAY', 'Marquette': 'MARQ', 'UC Irvine': 'UCI', 'Utah Valley': 'UVU',
-        'UMass Lowell': 'UML', 'Bradley': 'BRAD', 'North Dakota': 'UND',
-        'South Dakota': 'SDAK', 'Northern Colorado': 'UNCO', 'Southern Illinois': 'SIU',
-        'Prairie View A&M': 'PVAM', 'Creighton': 'CREI', 'South Florida': 'USF',
-        'Oklahoma State': 'OKST', 'Kansas City': 'UMKC', 'TCU': 'TCU', 'Lipscomb': 'LIP',
-        'Belmont': 'BEL', 'Jackson State': 'JKST', 'Auburn': 'AUB', 'Arkansas State': 'ARST',
-        "Saint Mary's": 'SMC', 'Campbell': 'CAM', 'Weber State': 'WEB', 'Southern Utah': 'SUU',
-        'Washington State': 'WSU', 'Buffalo': 'BUF', 'Bucknell': 'BUCK',
-        'Tarleton State': 'TAR', 'Tarleton St': 'TAR', 'Sacred Heart': 'SHU',
-        'Dartmouth': 'DART', 'Wright State': 'WRST', 'Evansville': 'EVAN',
-        'Mississippi Valley State': 'MVSU', 'Mississippi Valley St': 'MVSU',
-        'Morehead State': 'MORE', 'Morehead St': 'MORE', 'Montana State': 'MTST',
-        'Montana St': 'MTST', 'Mississippi State': 'MSST', 'Mississippi St': 'MSST',
-        'Tulane': 'TULN', 'Boise State': 'BOIS', 'Georgetown': 'GTWN',
-        'Long Island University': 'LIU', 'Long Island': 'LIU', 'Oral Roberts': 'ORU',
-        'UC San Diego': 'UCSD', 'Loyola Marymount': 'LMU', 'East Tennessee State': 'ETSU',
-        'East Tennessee St': 'ETSU', 'North Carolina A&T': 'NCAT', 'Abilene Christian': 'ACU',
-        'Pacific': 'PACI', 'Queens University': 'QUC', 'Queens': 'QUC',
-        'California Baptist': 'CBU', 'Cal Baptist': 'CBU', 'Southern': 'SOU',
-        'Drexel': 'DREX', 'Florida International': 'FIU', 'Marist': 'MARI',
-        'Lamar': 'LAM', 'Delaware': 'DELA', 'Alabama': 'ALA', 'Illinois': 'ILL',
-        'North Carolina': 'UNC', 'Duke': 'DUKE', 'Kentucky': 'UK', 'Kansas': 'KU',
-        'Gonzaga': 'GONZ', 'UCLA': 'UCLA', 'USC': 'USC', 'Michigan State': 'MSU',
-        'Ohio State': 'OSU', 'Florida State': 'FSU', 'NC State': 'NCST', 'Virginia': 'UVA',
-        'Purdue': 'PUR', 'Wisconsin': 'WISC', 'Iowa': 'IOWA', 'Texas': 'TEX',
-        'Baylor': 'BAY', 'Tennessee': 'TENN', 'Arkansas': 'ARK', 'LSU': 'LSU',
-        'Florida': 'FLA', 'Georgia': 'UGA', 'Missouri': 'MIZZ', 'Missouri State': 'MOST',
-        'Missouri St': 'MOST', 'Texas A&M': 'TAMU', 'East Texas A&M': 'ETAM',
-        'Mississippi': 'MISS', 'Vanderbilt': 'VAN', 'South Carolina': 'SC',
-        'Iowa State': 'ISU', 'Kansas State': 'KSU', 'West Virginia': 'WVU',
-        'Oklahoma': 'OU', 'Texas Tech': 'TTU', 'Arizona State': 'ASU', 'Colorado': 'COLO',
-        'Utah': 'UTAH', 'Oregon': 'ORE', 'Washington': 'WASH', 'Stanford': 'STAN',
-        'California': 'CAL', 'Oregon State': 'ORST', 'Syracuse': 'SYR', 'Louisville': 'LOU',
-        'Pittsburgh': 'PITT', 'Miami': 'MIA', 'Miami (OH)': 'M-OH', 'Miami OH': 'M-OH',
-        'Boston College': 'BC', 'Clemson': 'CLEM', 'Wake Forest': 'WAKE',
-        'Georgia Tech': 'GT', 'Providence': 'PROV', 'Xavier': 'XAV', 'Butler': 'BUT',
-        'Seton Hall': 'HALL', "St. John's": 'SJU', 'St. Thomas-Minnesota': 'STMN',
-        'DePaul': 'DEP', 'BYU': 'BYU', 'Houston': 'HOU', 'Cincinnati': 'CIN',
-        'Memphis': 'MEM', 'SMU': 'SMU', 'UCF': 'UCF', 'Wichita State': 'WICH',
-        'San Diego State': 'SDSU', 'Colorado State': 'CSU', 'Fresno State': 'FRES',
-        'Nevada': 'NEV', 'New Mexico': 'UNM', 'San Jose State': 'SJSU', 'UNLV': 'UNLV',
-        'Le Moyne': 'LEM', 'Ball State': 'BALL', "Saint Joseph's": 'JOES',
-        'App State': 'APP', 'UTSA': 'UTSA', 'Tennessee State': 'TNST',
-        'William & Mary': 'W&M', 'Robert Morris': 'RMU', 'New Hampshire': 'UNH',
-        'Fairfield': 'FAIR', 'Stonehill': 'STON', 'Quinnipiac': 'QUIN', 'Yale': 'YALE',
-        'Vermont': 'UVM', 'Cornell': 'COR', 'Monmouth': 'MONM', 'Lafayette': 'LAF',
-        'Pennsylvania': 'PENN', 'Mercyhurst': 'MERC', 'Fordham': 'FORD', 'Colgate': 'COLG',
-        'Alabama A&M': 'AAMU', 'Coastal Carolina': 'CCU', 'Florida Atlantic': 'FAU',
-        'Charleston': 'CHSN', 'Charleston Southern': 'CHSO', 'Charlotte': 'CLT',
-        'North Texas': 'UNT', 'Longwood': 'LONG', 'American University': 'AMER',
-        'The Citadel': 'CIT', 'Presbyterian': 'PRES', 'San José State': 'SJSU',
-        'San Diego': 'USD', 'Long Beach State': 'LBSU', 'Cal State Bakersfield': 'CSUB',
-        'Coppin State': 'COPP', 'Norfolk State': 'NORF', 'Tulsa': 'TLSA',
-        'Rutgers': 'RUTG', 'Massachusetts': 'MASS', 'Elon': 'ELON',
-        'Central Connecticut': 'CCSU', 'Davidson': 'DAV', 'Furman': 'FUR', 'Iona': 'IONA',
-        'Binghamton': 'BING', 'High Point': 'HPU', 'Lindenwood': 'LIN',
-        'Murray State': 'MUR', 'Northern Arizona': 'NAU', 'North Alabama': 'UNA',
-        'Rhode Island': 'URI', 'Seattle U': 'SEA', 'SIU Edwardsville': 'SIUE',
-        'South Dakota State': 'SDST', 'Western Kentucky': 'WKU', 'Winthrop': 'WIN',
-        'Holy Cross': 'HC', 'Oakland': 'OAKL', 'Montana': 'MONT',
-    }
-    
-    if team_name in abbrev_map:
-        return abbrev_map[team_name]
-    
-    # Fallback
-    words = team_name.replace('University of ', '').replace('College of ', '').split()
-    if len(words) == 1:
-        return words[0][:4].upper()
-    if len(words) <= 3:
-        return ''.join(w[0] for w in words).upper()
-    return words[0][:4].upper()
-
-def flip_spread_if_needed(market, away_team, home_team, away_cover, home_cover):
-    """Flip spread to show higher cover % team's perspective - EXACT copy from skill"""
-    if not market or market == 'N/A' or not away_cover or not home_cover:
-        return 'N/A'
-    
-    if isinstance(market, str):
-        return market
-    
-    away_pct = float(away_cover.replace('%', ''))
-    home_pct = float(home_cover.replace('%', ''))
-    
-    if away_pct == home_pct:
-        return market['display']
-    
-    original_abbrev = market['original_abbrev']
-    spread_value = float(market['value'])
-    
-    is_away_higher = away_pct > home_pct
-    away_abbrev = derive_abbreviation(away_team)
-    home_abbrev = derive_abbreviation(home_team)
-    
-    def abbrev_matches(abbrev1, abbrev2):
-        a1, a2 = abbrev1.upper(), abbrev2.upper()
-        if a1 == a2:
-            return True
-        if a1.startswith(a2) or a2.startswith(a1):
-            return True
-        return False
-    
-    original_refers_to_away = abbrev_matches(original_abbrev, away_abbrev)
-    
-    if is_away_higher:
-        if original_refers_to_away:
-            return f"{away_abbrev} {spread_value:+g}"
-        else:
-            return f"{away_abbrev} {-spread_value:+g}"
-    else:
-        if not original_refers_to_away:
-            return f"{home_abbrev} {spread_value:+g}"
-        else:
-            return f"{home_abbrev} {-spread_value:+g}"
+REQUEST_SECONDS = METRICS.histogram('ncaa_request_duration_seconds', 'Request latency by endpoint', ['endpoint'])
+REQUESTS = METRICS.counter('ncaa_requests_total', 'Requests by endpoint and status code', ['endpoint', 'status'])
+STAGE_SECONDS = METRICS.histogram('ncaa_stage_duration_seconds',
+                                  'Time spent in each stage of chart requests', ['stage'])
+GAMES_PARSED = METRICS.counter('ncaa_games_parsed_total', 'Games parsed from ESPN schedules')
+UNMAPPED_TEAMS = METRICS.counter('ncaa_unmapped_teams_total', 'Teams charted without ATS data')
+XLSX_BYTES = METRICS.histogram('ncaa_xlsx_bytes', 'Size of each workbook built',
+                               buckets=(4096, 16384, 65536, 262144, 1048576, 4194304, 16777216))
+XLSX_REQUESTS = METRICS.counter('ncaa_xlsx_requests_total', 'Workbooks built or reused from an earlier build',
+                                ['result'])
+CHART_ROWS = METRICS.counter('ncaa_chart_rows_total', 'Rows of incremental chart updates, reused or recomputed',
+                             ['result'])
+LINE_RECORDS = METRICS.counter('ncaa_line_records_total', 'Line changes appended to the line history')
 
-def parse_espn_schedule_from_text(text):
-    """Parse ESPN schedule - returns spread as dictionary"""
-    lines = text.strip().split('\n')
-    format_type = detect_schedule_format(lines)
-    
-    if format_type == 'mobile':
-        return parse_mobile_format(lines)
-    else:
-        return parse_desktop_format(lines)
-
-def detect_schedule_format(lines):
-    """Detect mobile vs desktop format"""
-    for i in range(min(100, len(lines) - 2)):
-        line = lines[i].strip()
-        if line and i+1 < len(lines):
-            next_line = lines[i+1].strip()
-            if re.match(r'^\(\d+-\d+.*?\)$', next_line):
-                return 'desktop'
-            if re.match(r'^\d+-\d+$', next_line):
-                if i+2 < len(lines):
-                    if lines[i+2].strip() == '' or re.match(r'^\d+-\d+$', lines[i+3].strip() if i+3 < len(lines) else ''):
-                        return 'mobile'
-    return 'desktop'
-
-def parse_desktop_format(lines):
-    """Parse desktop format - RETURNS SPREAD AS DICT"""
-    games = []
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        if re.match(r'^\d{1,2}:\d{2}\s*[AP]M$', line):
-            time = line
-            away_team = None
-            home_team = None
-            spread = None
-            
-            j = i + 1
-            while j < min(i+40, len(lines)):
-                check_line = lines[j].strip()
-                
-                if away_team and home_team and (re.match(r'^\d{1,2}:\d{2}\s*[AP]M$', check_line) or 'Gamecast' in check_line):
-                    break
-                
-                if away_team and home_team:
-                    if check_line.startswith('Spread:'):
-                        spread_match = re.match(r'^Spread:([A-Z0-9&\-]+)\s+([-+]?\d+\.?\d*)$', check_line)
-                        if spread_match:
-                            team_abbrev = spread_match.group(1)
-                            spread_value = spread_match.group(2)
-                            spread = {
-                                'original_abbrev': team_abbrev,
-                                'value': spread_value,
-                                'display': f"{team_abbrev} {spread_value}"
-                            }
-                    j += 1
-                    continue
-                
-                if re.match(r'^\(\d+-\d+.*?(Home|Away)\)$', check_line) and not away_team and j >= 2:
-                    if j-2 >= 0 and j-1 >= 0:
-                        potential_away = lines[j-2].strip()
-                        potential_home = lines[j-1].strip()
-                        if potential_away and potential_home and not re.match(r'^\d', potential_away):
-                            away_team = potential_away
-                            home_team = potential_home
-                            j += 1
-                            continue
-                
-                if check_line and j+1 < len(lines) and not away_team:
-                    next_line = lines[j+1].strip()
-                    if re.match(r'^\(\d+-\d+.*?\)$', next_line) and not re.match(r'^\(\d+-\d+.*?(Home|Away)\)$', next_line):
-                        away_team = check_line
-                        j += 2
-                        continue
-                
-                if check_line and j+1 < len(lines) and away_team and not home_team:
-                    next_line = lines[j+1].strip()
-                    if re.match(r'^\(\d+-\d+.*?\)$', next_line) and not re.match(r'^\(\d+-\d+.*?(Home|Away)\)$', next_line):
-                        home_team = check_line
-                        j += 2
-                        continue
-                
-                j += 1
-            
-            if away_team and home_team:
-                games.append({
-                    'Away': away_team,
-                    'Home': home_team,
-                    'Time': time,
-                    'Market': spread if spread else 'N/A'
-                })
-            
-            i = j
-        else:
-            i += 1
-    
-    return games
+# Set NCAA_SERVER_TIMING=1 to add a Server-Timing header with the stage timings to every response
+SERVER_TIMING = os.environ.get('NCAA_SERVER_TIMING') == '1'
 
-def parse_mobile_format(lines):
-    """Parse mobile format - RETURNS SPREAD AS DICT"""
-    games = []
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        if re.match(r'^\d{1,2}:\d{2}\s*[AP]M$', line):
-            time = line
-            
-            if i+5 < len(lines):
-                away_team = lines[i+1].strip()
-                home_team = lines[i+3].strip()
-                
-                if away_team and home_team:
-                    spread = None
-                    j = i + 5
-                    while j < min(i+20, len(lines)):
-                        check_line = lines[j].strip()
-                        if check_line == 'Spread:' and j+1 < len(lines):
-                            spread_line = lines[j+1].strip()
-                            spread_match = re.match(r'^([A-Z0-9&\-]+)\s+([-+]?\d+\.?\d*)$', spread_line)
-                            if spread_match:
-                                team_abbrev = spread_match.group(1)
-                                spread_value = spread_match.group(2)
-                                spread = {
-                                    'original_abbrev': team_abbrev,
-                                    'value': spread_value,
-                                    'display': f"{team_abbrev} {spread_value}"
-                                }
-                            break
-                        j += 1
-                    
-                    games.append({
-                        'Away': away_team,
-                        'Home': home_team,
-                        'Time': time,
-                        'Market': spread if spread else 'N/A'
-                    })
-            
-            i += 6
-        else:
-            i += 1
-    
-    return games
+@contextmanager
+def timed_stage(name):
+    """Time a block into STAGE_SECONDS and, inside a request, the Server-Timing list"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(seconds, name)
+        if has_request_context():
+            g.setdefault('stage_timings', []).append((name, seconds))
 
-def load_ats_data_from_text(text):
-    """Parse ATS data from TeamRankings"""
-    ats_dict = {}
-    lines = text.strip().split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        match = re.match(r'^(\d+)\s+(.+?)\s+(\d+-\d+-?\d*)\s+([\d.]+%)\s+([-+]?\d+\.?\d*)$', line)
-        if match:
-            rank = match.group(1)
-            team_name = match.group(2).strip()
-            ats_record = match.group(3)
-            cover_pct = match.group(4)
-            ats_pm = float(match.group(5))
-            ats_dict[team_name] = {'rank': rank, 'record': ats_record, 'cover_pct': cover_pct, 'ats_pm': ats_pm}
-            continue
-        
-        match2 = re.match(r'^(.+?)\s+(\d+-\d+-?\d*)\s+([\d.]+%)\s+[-+]?\d+\.?\d*\s+([-+]?\d+\.?\d*)$', line)
-        if match2:
-            team_name = match2.group(1).strip()
-            ats_record = match2.group(2)
-            cover_pct = match2.group(3)
-            ats_pm = float(match2.group(4))
-            ats_dict[team_name] = {'rank': 'N/A', 'record': ats_record, 'cover_pct': cover_pct, 'ats_pm': ats_pm}
-    
-    return ats_dict
-
-def find_team_cover_pct(team_name, ats_dict, name_mapping):
-    """Find cover % with name mapping"""
-    if team_name in ats_dict:
-        return ats_dict[team_name]['cover_pct']
-    if team_name in name_mapping:
-        mapped_name = name_mapping[team_name]
-        if mapped_name in ats_dict:
-            return ats_dict[mapped_name]['cover_pct']
-    return None
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.get('request_start')
+    if start is not None:
+        seconds = time.perf_counter() - start
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_SECONDS.observe(seconds, endpoint)
+        REQUESTS.inc(endpoint, str(response.status_code))
+        if SERVER_TIMING:
+            response.headers['Server-Timing'] = server_timing_header(
+                g.get('stage_timings', []) + [('total', seconds)])
+    return response
+
+def __getattr__(name):
+    # TEAM_NAME_MAPPING is loaded on first access, so importing app doesn't read teams.json
+    if name == 'TEAM_NAME_MAPPING':
+        return team_name_mapping()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# TeamRankings' ATS trends table and the same table filtered by venue, recency and role (see blend)
+register_ats_source(AtsSource('overall', 'All games', iter_ats_records))
+register_ats_source(AtsSource('home', 'Home games', iter_ats_records))
+register_ats_source(AtsSource('away', 'Away games', iter_ats_records))
+register_ats_source(AtsSource('last10', 'Last 10 games', iter_ats_records))
+register_ats_source(AtsSource('favorite', 'As favorite', iter_ats_records))
+register_ats_source(AtsSource('underdog', 'As underdog', iter_ats_records))
+
+# Bump when parser output changes so stale on-disk cache entries are ignored
+PARSE_CACHE_VERSION = 1
+
+# Parsed inputs keyed by content hash - set NCAA_PARSE_CACHE_DIR to share them on disk
+SCHEDULE_CACHE = LRUCache('schedule', max_entries=64, ttl_seconds=6 * 3600,
+                          disk_dir=os.environ.get('NCAA_PARSE_CACHE_DIR'))
+ATS_CACHE = LRUCache('ats', max_entries=32, ttl_seconds=6 * 3600,
+                     disk_dir=os.environ.get('NCAA_PARSE_CACHE_DIR'))
+
+def input_digest(source, max_chars=None):
+    """SHA-256 of the normalized input (stripped lines), or None for unseekable streams.
+
+    The parsers only ever see stripped lines, so two pastes that differ only
+    in indentation, trailing spaces or surrounding blank lines share a key.
+    Seekable streams are rewound so they can still be parsed afterwards.
+    """
+    if not isinstance(source, str):
+        if not (hasattr(source, 'seekable') and source.seekable()):
+            return None
+        start = source.tell()
+
+    digest = hashlib.sha256(f"v{PARSE_CACHE_VERSION}\n".encode())
+    try:
+        for line in iter_text_lines(source, max_chars):
+            digest.update(line.strip().encode('utf-8', 'surrogatepass'))
+            digest.update(b'\n')
+    finally:
+        if not isinstance(source, str):
+            source.seek(start)
+    return digest.hexdigest()
+
+def parse_with_cache(cache, source, parse):
+    """Return (parsed, cache_hit) - parse(source) memoized on input_digest"""
+    key = input_digest(source, MAX_INPUT_SIZE)
+    if key is not None:
+        parsed = cache.get(key)
+        if parsed is not None:
+            return parsed, True
+    parsed = parse(source)
+    if key is not None and parsed:
+        cache.put(key, parsed)
+    return parsed, False
+
+def log_cache_lookup(cache, hit):
+    stats = cache.stats()
+    logger.info(f"Parse cache {cache.name}: {'hit' if hit else 'miss'} "
+                f"(hits={stats['hits']}, misses={stats['misses']}, evictions={stats['evictions']}, size={stats['size']})")
+
+
+# Chart score blend, 'factor.stat=weight,...' (see blend) - the form and API can pass their own
+ATS_BLEND = parse_blend(os.environ.get('NCAA_ATS_BLEND') or DEFAULT_BLEND)
+
+DEFAULT_BLEND_TERMS = parse_blend(DEFAULT_BLEND)
 
-def find_team_ats_plus_minus(team_name, ats_dict, name_mapping):
-    """Find ATS +/- with name mapping"""
-    if team_name in ats_dict:
-        return ats_dict[team_name]['ats_pm']
-    if team_name in name_mapping:
-        mapped_name = name_mapping[team_name]
-        if mapped_name in ats_dict:
-            return ats_dict[mapped_name]['ats_pm']
+# TeamFeatures per set of parsed ATS tables, matched by identity: the parse cache
+# hands back the same table objects for a repeated paste
+TEAM_FEATURES = LRUCache('features', max_entries=8, ttl_seconds=6 * 3600)
+
+def team_features(tables):
+    """TeamFeatures for {source name: parsed table}, built once per set of tables and reused after"""
+    key = tuple((name, id(table)) for name, table in tables.items())
+    cached = TEAM_FEATURES.get(key)
+    if cached is not None and all(cached[0][name] is table for name, table in tables.items()):
+        return cached[1]
+    features = TeamFeatures(tables)
+    TEAM_FEATURES.put(key, (dict(tables), features))
+    return features
+
+def slate_scores(games, resolver, tables, terms):
+    """Blended score of each game (None where no term has data for both teams), or None for the default blend.
+
+    tables maps source name -> parsed table, with the main table as
+    'overall'. Teams are matched through resolver, so every table is read
+    with the main table's TeamRankings names.
+    """
+    if terms == DEFAULT_BLEND_TERMS:
+        return None
+    games = as_games(games)
+    features = team_features(tables)
+    codes, names = pd.factorize(np.array([game.away for game in games] + [game.home for game in games], dtype=object))
+    team_rows = features.positions([resolver.resolve_name(name) for name in names])
+    away_favored = None
+    if any(BLEND_FACTORS[factor].by_line for factor, _, _ in terms):
+        team_tables = TEAM_TABLES.get()
+        away_favored = np.full(len(games), -1, dtype=np.int8)
+        for i, game in enumerate(games):
+            if game.spread is not None and game.spread.value:
+                side = team_tables.spread_side(game.spread.team, game.away, game.home)
+                if side is not None:
+                    away_favored[i] = (side == 'away') == (game.spread.value < 0)
+    scores = blend_scores(features, team_rows[codes[:len(games)]], team_rows[codes[len(games):]], terms, away_favored)
+    return [None if np.isnan(score) else float(score) for score in scores]
+
+def missing_blend_sources(terms, tables):
+    """Sources the blend reads that weren't given - their terms score nothing"""
+    return [name for name in blend_sources(terms) if name not in tables]
+
+# Export with openpyxl's write-only workbook - same output, less memory and time
+XLSX_WRITE_ONLY = True
+
+XLSX_COLUMN_WIDTHS = {'A': 25, 'B': 25, 'C': 15, 'D': 12, 'E': 12, 'F': 12, 'G': 12, 'H': 12}
+
+# Avg Conf at or above which a row is filled green or yellow, highest first
+XLSX_FILL_THRESHOLDS = (('green', 50), ('yellow', 30))
+
+def row_fill(row):
+    """'green', 'yellow' or None - the fill a chart row dict or ChartRow gets from its Avg Conf"""
+    conf_val = row_confidence(row)
+    if conf_val is not None:
+        for fill, threshold in XLSX_FILL_THRESHOLDS:
+            if conf_val >= threshold:
+                return fill
     return None
 
-def create_daily_chart(games, ats_dict, name_mapping):
-    """Create daily chart with flipped spreads and track unmapped teams"""
-    chart_rows = []
-    unmapped_teams = set()
-    
-    for game in games:
-        away_team = game['Away']
-        home_team = game['Home']
-        
-        away_cover = find_team_cover_pct(away_team, ats_dict, name_mapping)
-        home_cover = find_team_cover_pct(home_team, ats_dict, name_mapping)
-        away_ats_pm = find_team_ats_plus_minus(away_team, ats_dict, name_mapping)
-        home_ats_pm = find_team_ats_plus_minus(home_team, ats_dict, name_mapping)
-        
-        # Track unmapped teams
-        if not away_cover:
-            unmapped_teams.add(away_team)
-        if not home_cover:
-            unmapped_teams.add(home_team)
-        
-        avg_conf = ''
-        play_team_ats = ''
-        if away_cover and home_cover:
-            away_pct = float(away_cover.replace('%', ''))
-            home_pct = float(home_cover.replace('%', ''))
-            avg_conf = abs(away_pct - home_pct)
-            avg_conf = f"{avg_conf:.1f}"
-            
-            if away_pct > home_pct and away_ats_pm is not None:
-                play_team_ats = f"+{away_ats_pm:.1f}" if away_ats_pm >= 0 else f"{away_ats_pm:.1f}"
-            elif home_pct > away_pct and home_ats_pm is not None:
-                play_team_ats = f"+{home_ats_pm:.1f}" if home_ats_pm >= 0 else f"{home_ats_pm:.1f}"
-            elif away_pct == home_pct:
-                play_team_ats = "-"
-        
-        adjusted_market = flip_spread_if_needed(game['Market'], away_team, home_team, away_cover, home_cover)
-        
-        chart_rows.append({
-            'Away': away_team,
-            'Home': home_team,
-            'Market': adjusted_market,
-            'A Cover %': away_cover if away_cover else '',
-            'H Cover %': home_cover if home_cover else '',
-            'Avg Conf': avg_conf,
-            'ATS +/-': play_team_ats,
-            'Time': game['Time']
-        })
-    
-    return chart_rows, list(unmapped_teams)
+def create_xlsx_file(chart_rows, filename, write_only=False):
+    """Create XLSX with color coding from row dicts or ChartRows"""
+    if write_only:
+        return create_xlsx_file_write_only(chart_rows, filename)
 
-def create_xlsx_file(chart_rows, filename):
-    """Create XLSX with color coding"""
     wb = Workbook()
     ws = wb.active
     ws.title = "Daily Chart"
     
-    headers = ['Away', 'Home', 'Market', 'A Cover %', 'H Cover %', 'Avg Conf', 'ATS +/-', 'Time']
+    headers = CHART_COLUMNS
     ws.append(headers)
     
     for cell in ws[1]:
@@ -590,9 +271,7 @@ def create_xlsx_file(chart_rows, filename):
         cell.border = bold_border
     
     for row_data in chart_rows:
-        row_values = [row_data['Away'], row_data['Home'], row_data['Market'], 
-                     row_data['A Cover %'], row_data['H Cover %'], 
-                     row_data['Avg Conf'], row_data['ATS +/-'], row_data['Time']]
+        row_values = [row_data[column] for column in CHART_COLUMNS]
         ws.append(row_values)
         
         current_row = ws.max_row
@@ -602,91 +281,422 @@ def create_xlsx_file(chart_rows, filename):
             cell.border = bold_border
             cell.alignment = Alignment(horizontal='center', vertical='center')
         
-        if row_data['Avg Conf']:
-            try:
-                conf_val = float(row_data['Avg Conf'])
-                fill_color = None
-                
-                if conf_val >= 50:
-                    fill_color = green_fill
-                elif conf_val >= 30:
-                    fill_color = yellow_fill
-                
-                if fill_color:
-                    for col_num in range(1, 9):
-                        ws.cell(current_row, col_num).fill = fill_color
-            except ValueError:
-                pass
+        fill_color = {'green': green_fill, 'yellow': yellow_fill}.get(row_fill(row_data))
+        if fill_color:
+            for col_num in range(1, 9):
+                ws.cell(current_row, col_num).fill = fill_color
     
-    ws.column_dimensions['A'].width = 25
-    ws.column_dimensions['B'].width = 25
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 12
-    ws.column_dimensions['E'].width = 12
-    ws.column_dimensions['F'].width = 12
-    ws.column_dimensions['G'].width = 12
-    ws.column_dimensions['H'].width = 12
+    for column, width in XLSX_COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
     
     wb.save(filename)
 
+def create_xlsx_file_write_only(chart_rows, filename):
+    """Create the same color-coded XLSX as create_xlsx_file using a write-only workbook.
+
+    Rows are streamed to disk as they are appended and every style object is
+    created once and shared, so cost stays flat per cell on large charts.
+    """
+    wb = Workbook(write_only=True)
+    write_chart_sheet(wb, "Daily Chart", chart_rows)
+    wb.save(filename)
+
+def write_chart_sheet(wb, title, chart_rows):
+    """Append a color-coded chart sheet to a write-only workbook"""
+    ws = wb.create_sheet(title)
+    for column, width in XLSX_COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+
+    header_font = Font(bold=True)
+    centered = Alignment(horizontal='center', vertical='center')
+    bold_border = Border(left=Side(style='medium'), right=Side(style='medium'), top=Side(style='medium'), bottom=Side(style='medium'))
+    green_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
+    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+    fills = {'green': green_fill, 'yellow': yellow_fill}
+
+    header = []
+    for column in CHART_COLUMNS:
+        cell = WriteOnlyCell(ws, value=column)
+        cell.font = header_font
+        cell.alignment = centered
+        cell.border = bold_border
+        header.append(cell)
+    ws.append(header)
+
+    for row_data in chart_rows:
+        fill_color = fills.get(row_fill(row_data))
+
+        row = []
+        for column in CHART_COLUMNS:
+            cell = WriteOnlyCell(ws, value=row_data[column])
+            cell.border = bold_border
+            cell.alignment = centered
+            if fill_color:
+                cell.fill = fill_color
+            row.append(cell)
+        ws.append(row)
+
+@lru_cache(maxsize=1)
+def chart_sheet_template():
+    """ChartSheetTemplate cut from a sample workbook made by create_xlsx_file_write_only"""
+    fills = ('yellow', 'green')
+    sample_rows = [dict.fromkeys(CHART_COLUMNS, '')]
+    for fill in fills:
+        threshold = dict(XLSX_FILL_THRESHOLDS)[fill]
+        sample_rows.append({**dict.fromkeys(CHART_COLUMNS, ''), 'Avg Conf': f"{threshold:.1f}"})
+    buffer = io.BytesIO()
+    create_xlsx_file_write_only(sample_rows, buffer)
+    return ChartSheetTemplate.from_workbook(buffer.getvalue(), fills)
+
 # Ensure static directory exists
 os.makedirs('static', exist_ok=True)
 
-def cleanup_old_files(directory='static', hours=24):
-    """Delete files older than specified hours"""
+# Bump when the workbook layout or styling changes so old artifacts aren't reused
+XLSX_FORMAT_VERSION = 1
+
+def chart_digest(chart_rows):
+    """Content hash of the chart rows, used to name and reuse XLSX artifacts"""
+    digest = hashlib.sha256(f"xlsx-v{XLSX_FORMAT_VERSION}\n".encode())
+    for row in chart_rows:
+        digest.update(json.dumps([row[column] for column in CHART_COLUMNS]).encode())
+        digest.update(b'\n')
+    return digest.hexdigest()[:20]
+
+# Where generated workbooks live: 'disk' (static/) or 'memory' (XLSX_STORE, streamed on download)
+XLSX_STORAGE = os.environ.get('NCAA_XLSX_STORAGE', 'disk')
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Workbooks held in memory when XLSX_STORAGE is 'memory' - bounded by count, bytes and age
+XLSX_STORE = LRUCache('xlsx', max_entries=256, ttl_seconds=3600, max_bytes=64 * 1024 * 1024)
+
+def xlsx_filename(chart_rows):
+    return f'daily_chart_{chart_digest(chart_rows)}.xlsx'
+
+def build_xlsx_bytes(chart_rows):
+    """Build the chart workbook in memory and return its bytes"""
+    buffer = io.BytesIO()
+    create_xlsx_file(chart_rows, buffer, write_only=XLSX_WRITE_ONLY)
+    return buffer.getvalue()
+
+def get_or_create_xlsx(chart_rows, directory='static', storage=None, build=None):
+    """Return (filename, created) for the chart's workbook, building it only if missing.
+
+    Files are named by chart_digest, so identical charts share one artifact
+    and concurrent requests can't collide. On disk a reused file has its
+    mtime refreshed and is re-registered with ARTIFACT_SWEEPER so it is kept
+    around; in memory mode the bytes go to XLSX_STORE and nothing is written
+    to disk. build, if given, returns the workbook bytes in place of
+    build_xlsx_bytes (SlateChart.build_workbook patches them from cached rows).
+    """
+    build = build or (lambda: build_xlsx_bytes(chart_rows))
+    storage = storage or XLSX_STORAGE
+    filename = xlsx_filename(chart_rows)
+    if storage == 'memory':
+        if XLSX_STORE.get(filename) is not None:
+            XLSX_REQUESTS.inc('reused')
+            return filename, False
+        data = build()
+        XLSX_STORE.put(filename, data)
+        XLSX_REQUESTS.inc('built')
+        XLSX_BYTES.observe(len(data))
+        return filename, True
+
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+            ARTIFACT_SWEEPER.track(path)
+            XLSX_REQUESTS.inc('reused')
+            return filename, False
+        except OSError:
+            pass  # Swept between the check and the touch - rebuild it
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
     try:
-        now = datetime.now()
-        deleted_count = 0
-        for filename in os.listdir(directory):
-            if filename.endswith('.xlsx'):
-                filepath = os.path.join(directory, filename)
-                file_modified = datetime.fromtimestamp(os.path.getmtime(filepath))
-                if (now - file_modified).total_seconds() > hours * 3600:
-                    os.remove(filepath)
-                    deleted_count += 1
-        if deleted_count > 0:
-            logger.info(f"Cleanup: deleted {deleted_count} old file(s)")
-    except Exception as e:
-        logger.error(f"Error during file cleanup: {e}")
+        with open(tmp_path, 'wb') as f:
+            f.write(build())
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    ARTIFACT_SWEEPER.track(path, size=size)
+    XLSX_REQUESTS.inc('built')
+    XLSX_BYTES.observe(size)
+    return filename, True
+
+# Generated workbooks in static/ are deleted in the background after 24 hours,
+# or oldest-first once they take up more than 512MB
+ARTIFACT_SWEEPER = ArtifactSweeper('static', max_age_seconds=24 * 3600,
+                                   max_total_bytes=512 * 1024 * 1024, logger=logger)
+
+# Started by the first request each server process handles, whatever the endpoint (the thread doesn't
+# survive a fork). Importing app - the ingest CLI, spawned batch workers - never starts it.
+app.before_request(ARTIFACT_SWEEPER.ensure_started)
+
+CHART_STORE = ChartStore(STORE_PATH) if STORE_PATH else None
+
+def latest_stored_snapshot():
+    """Return (snapshot_date, ats_dict) for the newest saved TeamRankings table, or None"""
+    if CHART_STORE is None:
+        return None
+    try:
+        return CHART_STORE.latest_ats_snapshot()
+    except sqlite3.Error as e:
+        logger.error(f"Store read failed: {e}")
+        return None
+
+def save_to_store(slate_date, games, chart_rows, ats_dict=None):
+    """Record the slate, and a freshly pasted ATS table, in CHART_STORE - failures are logged, not raised.
+
+    Only the rows that differ from the stored slate are rewritten (see ChartStore.save_slate).
+    """
+    if CHART_STORE is None:
+        return
+    try:
+        if ats_dict is not None:
+            CHART_STORE.save_ats_snapshot(slate_date, ats_dict)
+        CHART_STORE.save_slate(slate_date, games, chart_rows)
+    except sqlite3.Error as e:
+        logger.error(f"Store write failed: {e}")
+
+LINE_HISTORY = LineHistory(LINE_HISTORY_PATH) if LINE_HISTORY_PATH else None
+
+def record_lines(slate_date, games):
+    """Append the slate's changed lines to LINE_HISTORY - failures are logged, not raised"""
+    if LINE_HISTORY is None:
+        return
+    try:
+        LINE_RECORDS.inc(amount=LINE_HISTORY.append(slate_date, games))
+    except (OSError, ValueError) as e:
+        logger.error(f"Line history write failed: {e}")
+
+# Keep each worker's last chart of each slate so a re-pasted schedule only recomputes the games that changed
+INCREMENTAL_CHARTS = os.environ.get('NCAA_INCREMENTAL_CHARTS', '1') == '1'
+
+# The latest SlateChart of each slate (see slate_identity), per worker
+SLATE_CHARTS = LRUCache('slate', max_entries=8, ttl_seconds=18 * 3600)
+
+def slate_identity(slate_date, games):
+    """SLATE_CHARTS key: the date and its set of matchups, so different pastes of one day don't diff against each other"""
+    return slate_date, frozenset((game.away, game.home) for game in as_games(games))
+
+def slate_keys(games):
+    """(away, home, time) of each Game - a repeated key gets an occurrence number so every game has its own"""
+    seen = {}
+    keys = []
+    for game in games:
+        key = (game.away, game.home, game.time)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keys.append(key + (count,) if count else key)
+    return keys
+
+class SlateChart:
+    """A charted slate kept between pastes, with what changed since the one before.
+
+    rows maps each game's key (see slate_keys) to its ChartRow and values to
+    its row dict, in slate order. changes maps the key of every row whose
+    display differs from the previous paste to the previous row dict, or
+    None for a new game; removed lists keys the previous paste had and this
+    one doesn't. Sheet XML for the workbook is rendered per row on first use
+    and handed on with unchanged rows, so patched workbooks only render the
+    rows that moved.
+    """
+
+    def __init__(self, rows, values, tables, resolver, fragments, changes, removed):
+        self.rows = rows
+        self.values = values
+        self.tables = tables
+        self.resolver = resolver
+        self.fragments = fragments
+        self.changes = changes
+        self.removed = removed
+
+    def chart_rows(self):
+        return list(self.values.values())
+
+    def row_changes(self):
+        """Per chart row, None or (status, previous Market) with status 'new' or 'moved'"""
+        changes = self.changes
+        return [None if key not in changes else
+                ('new', None) if changes[key] is None else ('moved', changes[key]['Market'])
+                for key in self.values]
+
+    def change_counts(self):
+        """(moved, new, removed) row counts against the previous paste"""
+        moved = sum(1 for change in self.changes.values() if change is not None)
+        return moved, len(self.changes) - moved, len(self.removed)
+
+    def fragment(self, key):
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            values = self.values[key]
+            fragment = self.fragments[key] = chart_sheet_template().render_row(
+                [values[column] for column in CHART_COLUMNS], row_fill(values))
+        return fragment
+
+    def build_workbook(self):
+        """Workbook bytes from the rows' sheet XML, rendering only rows without a cached fragment"""
+        return chart_sheet_template().build([self.fragment(key) for key in self.values])
+
+def update_slate_chart(previous, games, resolver, scores=None):
+    """Chart games as a SlateChart, reusing rows of previous (a SlateChart or None) whose inputs are unchanged.
+
+    A row is reused when its game, both teams' ATS records, its blended
+    score (see slate_scores) and the team tables are the same as last time;
+    every other row is recomputed. Returns (slate, unmapped_teams).
+    """
+    tables = TEAM_TABLES.get()
+    games = as_games(games)
+    old_rows = previous.rows if previous is not None else {}
+    old_values = previous.values if previous is not None else {}
+    old_fragments = previous.fragments if previous is not None else {}
+    reusable = previous is not None and previous.tables is tables
+
+    rows, values, fragments, changes = {}, {}, {}, {}
+    unmapped_teams = {}
+    for key, game, score in zip(slate_keys(games), games, scores if scores is not None else repeat(None)):
+        away_ats = resolver.record(game.away)
+        home_ats = resolver.record(game.home)
+        if away_ats is None:
+            unmapped_teams[game.away] = None
+        if home_ats is None:
+            unmapped_teams[game.home] = None
+
+        old = old_rows.get(key)
+        if (reusable and old is not None and old.game == game and old.away_ats == away_ats
+                and old.home_ats == home_ats and old.score == score):
+            rows[key] = old
+            values[key] = old_values[key]
+        else:
+            rows[key] = ChartRow(game, away_ats, home_ats, play_market(game, away_ats, home_ats, score), score)
+            values[key] = rows[key].to_dict()
+            if old is None:
+                if previous is not None:
+                    changes[key] = None
+                continue
+            if values[key] != old_values[key]:
+                changes[key] = old_values[key]
+                continue
+            values[key] = old_values[key]
+        if key in old_fragments:
+            fragments[key] = old_fragments[key]
+
+    recomputed = sum(1 for key in rows if rows[key] is not old_rows.get(key))
+    CHART_ROWS.inc('reused', amount=len(rows) - recomputed)
+    CHART_ROWS.inc('recomputed', amount=recomputed)
+    removed = [key for key in old_rows if key not in rows]
+    slate = SlateChart(rows, values, tables, resolver, fragments, changes, removed)
+    return slate, list(unmapped_teams)
+
+def describe_unmapped_team(team_name, resolver):
+    """Team name plus its closest TeamRankings candidate, for the unmapped warning"""
+    suggestion = resolver.suggest(team_name)
+    if suggestion is None or suggestion[1] < FUZZY_SUGGESTION_MIN:
+        return team_name
+    tr_name, score = suggestion
+    return f"{team_name} (closest: {tr_name}, {score:.0%})"
+
+def uploaded_stream(field_name):
+    """Return the binary stream of an uploaded file, or None if no file was chosen"""
+    upload = request.files.get(field_name)
+    if upload and upload.filename:
+        return upload.stream
+    return None
+
+def extra_ats_field(name):
+    return f'teamrankings_ats_{name}'
+
+def parse_extra_ats_tables(fields):
+    """Parse the extra ATS tables (every source but 'overall') pasted in fields, a form or JSON body.
+
+    Returns ({source name: table}, names of pastes that gave no rows). Each
+    table goes through ATS_CACHE like the main one. Raises
+    InputTooLargeError, or ValueError for a field that isn't text.
+    """
+    tables, unreadable = {}, []
+    for name, source in ATS_SOURCES.items():
+        text = fields.get(extra_ats_field(name)) if name != 'overall' else None
+        if not text:
+            continue
+        if not isinstance(text, str):
+            raise ValueError(f'{extra_ats_field(name)} must be text')
+        if len(text) > MAX_INPUT_SIZE:
+            raise InputTooLargeError(f'{source.label} table exceeds {MAX_INPUT_SIZE} characters')
+        table, _ = parse_with_cache(ATS_CACHE, text, lambda text, parse=source.parse: dict(parse(text, MAX_INPUT_SIZE)))
+        if table:
+            tables[name] = table
+        else:
+            unreadable.append(name)
+    return tables, unreadable
+
+def requested_blend(value):
+    """Blend terms from a form or JSON value, ATS_BLEND when it is empty; raises ValueError"""
+    if not value:
+        return ATS_BLEND
+    if not isinstance(value, str):
+        raise ValueError('ats_blend must be text like "overall.cover=1,venue.cover=0.5"')
+    return parse_blend(value)
+
+@app.context_processor
+def blend_form_context():
+    return {'extra_ats_sources': [(extra_ats_field(name), source.label)
+                                  for name, source in ATS_SOURCES.items() if name != 'overall'],
+            'ats_blend': format_blend(ATS_BLEND), 'blend_factors': list(BLEND_FACTORS)}
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         logger.info("Chart generation request received")
         
-        # Clean up old files first
-        cleanup_old_files()
+        # Uploaded files are streamed straight into the parsers; pasted text is parsed in place
+        espn_schedule = uploaded_stream('espn_file') or request.form.get('espn_schedule', '')
+        teamrankings_ats = uploaded_stream('teamrankings_file') or request.form.get('teamrankings_ats', '')
         
-        espn_schedule = request.form.get('espn_schedule', '')
-        teamrankings_ats = request.form.get('teamrankings_ats', '')
+        # Without a TeamRankings paste, fall back to the latest table saved in the store
+        stored_snapshot = None
+        if espn_schedule and not teamrankings_ats:
+            stored_snapshot = latest_stored_snapshot()
         
         # Input validation
-        if not espn_schedule or not teamrankings_ats:
+        if not espn_schedule or not (teamrankings_ats or stored_snapshot):
             logger.warning("Request missing ESPN or TeamRankings data")
             flash('Please provide both ESPN schedule and TeamRankings ATS data', 'error')
             return redirect(url_for('index'))
         
-        # Size limits: 500KB per input (way more than needed for legitimate use)
-        MAX_INPUT_SIZE = 500000  # 500KB in bytes
-        if len(espn_schedule) > MAX_INPUT_SIZE:
+        # Pasted text is checked up front, uploads are capped while they are read
+        if isinstance(espn_schedule, str) and len(espn_schedule) > MAX_INPUT_SIZE:
             logger.warning(f"ESPN data too large: {len(espn_schedule)} characters")
             flash(f'ESPN schedule data is too large ({len(espn_schedule):,} characters). Maximum allowed is {MAX_INPUT_SIZE:,} characters.', 'error')
             return redirect(url_for('index'))
         
-        if len(teamrankings_ats) > MAX_INPUT_SIZE:
+        if isinstance(teamrankings_ats, str) and len(teamrankings_ats) > MAX_INPUT_SIZE:
             logger.warning(f"TeamRankings data too large: {len(teamrankings_ats)} characters")
             flash(f'TeamRankings ATS data is too large ({len(teamrankings_ats):,} characters). Maximum allowed is {MAX_INPUT_SIZE:,} characters.', 'error')
             return redirect(url_for('index'))
         
+        # Charts, the store and line history are keyed by the schedule's date heading, else today
+        slate_date = schedule_date(espn_schedule) or date.today().isoformat()
+        
         try:
             # Parse ESPN schedule
             try:
-                games = parse_espn_schedule_from_text(espn_schedule)
+                with timed_stage('parse_schedule'):
+                    games, cache_hit = parse_with_cache(
+                        SCHEDULE_CACHE, espn_schedule, lambda source: list(iter_espn_schedule(source, MAX_INPUT_SIZE)))
+                log_cache_lookup(SCHEDULE_CACHE, cache_hit)
+                GAMES_PARSED.inc(amount=len(games))
                 if not games:
                     logger.error("ESPN schedule parsing returned no games")
                     flash('Could not parse any games from ESPN schedule. Make sure you copied from the date through the last Gamecast button.', 'error')
                     return redirect(url_for('index'))
                 logger.info(f"Successfully parsed {len(games)} games from ESPN schedule")
+            except InputTooLargeError:
+                logger.warning("ESPN upload too large")
+                flash(f'ESPN schedule file is too large. Maximum allowed is {MAX_INPUT_SIZE:,} characters.', 'error')
+                return redirect(url_for('index'))
             except Exception as e:
                 logger.error(f"ESPN parsing error: {str(e)}")
                 flash(f'ESPN parsing error: {str(e)}. Please check your ESPN schedule format.', 'error')
@@ -694,21 +704,61 @@ def index():
             
             # Parse TeamRankings data
             try:
-                ats_dict = load_ats_data_from_text(teamrankings_ats)
-                if not ats_dict:
-                    logger.error("TeamRankings parsing returned no data")
-                    flash('Could not parse ATS data from TeamRankings. Make sure you copied the entire table.', 'error')
-                    return redirect(url_for('index'))
-                logger.info(f"Successfully parsed {len(ats_dict)} teams from TeamRankings")
+                if stored_snapshot is not None:
+                    snapshot_date, ats_dict = stored_snapshot
+                    logger.info(f"Using stored TeamRankings snapshot from {snapshot_date} ({len(ats_dict)} teams)")
+                    flash(f'No TeamRankings data provided - using the table saved on {snapshot_date}.', 'success')
+                else:
+                    with timed_stage('parse_ats'):
+                        ats_dict, cache_hit = parse_with_cache(
+                            ATS_CACHE, teamrankings_ats, lambda source: dict(iter_ats_records(source, MAX_INPUT_SIZE)))
+                    log_cache_lookup(ATS_CACHE, cache_hit)
+                    if not ats_dict:
+                        logger.error("TeamRankings parsing returned no data")
+                        flash('Could not parse ATS data from TeamRankings. Make sure you copied the entire table.', 'error')
+                        return redirect(url_for('index'))
+                    logger.info(f"Successfully parsed {len(ats_dict)} teams from TeamRankings")
+                with timed_stage('parse_sources'):
+                    extra_tables, unreadable_tables = parse_extra_ats_tables(request.form)
+            except InputTooLargeError:
+                logger.warning("TeamRankings upload too large")
+                flash(f'TeamRankings ATS file is too large. Maximum allowed is {MAX_INPUT_SIZE:,} characters.', 'error')
+                return redirect(url_for('index'))
             except Exception as e:
                 logger.error(f"TeamRankings parsing error: {str(e)}")
                 flash(f'TeamRankings parsing error: {str(e)}. Please check your ATS data format.', 'error')
                 return redirect(url_for('index'))
             
-            # Create chart and get unmapped teams
+            # Score blend - the form's, else ATS_BLEND
+            try:
+                blend_terms = requested_blend(request.form.get('ats_blend', '').strip())
+            except ValueError as e:
+                logger.warning(f"Bad blend: {e}")
+                flash(f'Blend error: {e}', 'error')
+                return redirect(url_for('index'))
+            
+            # Create chart and get unmapped teams - incrementally from this worker's last chart of the same slate if it has one
             try:
-                chart_rows, unmapped_teams = create_daily_chart(games, ats_dict, TEAM_NAME_MAPPING)
+                with timed_stage('chart'):
+                    name_mapping = team_name_mapping()
+                    slate_key = slate_identity(slate_date, games)
+                    previous = SLATE_CHARTS.get(slate_key) if INCREMENTAL_CHARTS else None
+                    # The same cached ATS table as last time keeps its resolver and parsed records
+                    same_ats = (previous is not None and previous.resolver.ats_dict is ats_dict
+                                and previous.resolver.name_mapping is name_mapping)
+                    resolver = previous.resolver if same_ats else TeamResolver(ats_dict, name_mapping)
+                    scores = slate_scores(games, resolver, {'overall': ats_dict, **extra_tables}, blend_terms)
+                    slate = None
+                    if INCREMENTAL_CHARTS:
+                        slate, unmapped_teams = update_slate_chart(previous, games, resolver, scores)
+                        SLATE_CHARTS.put(slate_key, slate)
+                        chart_rows = slate.chart_rows()
+                    else:
+                        chart_rows, unmapped_teams = create_daily_chart(games, ats_dict, name_mapping, resolver, scores)
+                UNMAPPED_TEAMS.inc(amount=len(unmapped_teams))
                 logger.info(f"Chart created with {len(chart_rows)} rows")
+                if previous is not None:
+                    logger.info("Incremental update: {} moved, {} new, {} removed".format(*slate.change_counts()))
             except Exception as e:
                 logger.error(f"Chart generation error: {str(e)}")
                 flash(f'Chart generation error: {str(e)}', 'error')
@@ -716,31 +766,71 @@ def index():
             
             # Create Excel file
             try:
-                output_filename = f'daily_chart_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-                output_path = os.path.join('static', output_filename)
-                create_xlsx_file(chart_rows, output_path)
-                logger.info(f"Excel file created: {output_filename}")
+                with timed_stage('xlsx'):
+                    output_filename, created = get_or_create_xlsx(
+                        chart_rows, build=slate.build_workbook if slate is not None else None)
+                if created:
+                    logger.info(f"Excel file created: {output_filename}")
+                else:
+                    logger.info(f"Excel file reused: {output_filename}")
             except Exception as e:
                 logger.error(f"File creation error: {str(e)}")
                 flash(f'File creation error: {str(e)}', 'error')
                 return redirect(url_for('index'))
             
+            # Keep the slate, and the TeamRankings table if it was pasted, for later requests and other workers
+            with timed_stage('store'):
+                save_to_store(slate_date, games, chart_rows,
+                              ats_dict if stored_snapshot is None and not same_ats else None)
+            with timed_stage('lines'):
+                record_lines(slate_date, games)
+            
             # Show success message
             flash(f'Successfully generated chart with {len(chart_rows)} games!', 'success')
+            if previous is not None:
+                flash('Since the last paste: {} game(s) moved, {} new, {} removed - '
+                      'changed rows are marked.'.format(*slate.change_counts()), 'success')
             logger.info(f"Chart generation successful - {len(chart_rows)} games, {len(ats_dict)} teams tracked")
             
+            # Report the blend when it isn't the plain cover % gap, and tables it needed but didn't get
+            if scores is not None:
+                logger.info(f"Chart scored with blend {format_blend(blend_terms)} "
+                            f"(extra tables: {', '.join(extra_tables) or 'none'})")
+                flash(f'Scored with blend {format_blend(blend_terms)}.', 'success')
+                missing = missing_blend_sources(blend_terms, {'overall': ats_dict, **extra_tables})
+                if missing:
+                    labels = ', '.join(ATS_SOURCES[name].label for name in missing)
+                    flash(f'Note: The blend reads tables that weren\'t pasted ({labels}) - those terms were skipped.', 'error')
+            if unreadable_tables:
+                labels = ', '.join(ATS_SOURCES[name].label for name in unreadable_tables)
+                logger.warning(f"Extra ATS tables with no rows: {labels}")
+                flash(f'Warning: Could not parse ATS rows from the {labels} table(s) - they were left out.', 'error')
+            
+            # Report teams matched only by name similarity so they can be checked
+            if resolver.fuzzy_matches:
+                matched_list = ', '.join(f"{team} -> {tr_name} ({score:.0%})"
+                                         for team, (tr_name, score) in sorted(resolver.fuzzy_matches.items()))
+                logger.warning(f"Fuzzy-matched teams ({len(resolver.fuzzy_matches)}): {matched_list}")
+                flash(f'Note: Matched {len(resolver.fuzzy_matches)} team(s) by name similarity: {matched_list}', 'error')
+            
             # Warn about unmapped teams
             if unmapped_teams:
-                teams_list = ', '.join(sorted(unmapped_teams))
+                teams_list = ', '.join(describe_unmapped_team(team, resolver) for team in sorted(unmapped_teams))
                 logger.warning(f"Unmapped teams ({len(unmapped_teams)}): {teams_list}")
                 flash(f'Warning: Could not find ATS data for {len(unmapped_teams)} team(s): {teams_list}', 'error')
             
-            return render_template('index.html', 
-                                 chart_rows=chart_rows, 
-                                 download_file=output_filename, 
-                                 games_count=len(games), 
-                                 teams_count=len(ats_dict),
-                                 unmapped_teams=unmapped_teams)
+            # In memory mode the rows ride along with the download form so any worker can serve it
+            download_payload = json.dumps(chart_rows) if XLSX_STORAGE == 'memory' else None
+            
+            with timed_stage('render'):
+                return render_template('index.html', 
+                                     chart_rows=chart_rows, 
+                                     download_file=output_filename, 
+                                     download_payload=download_payload, 
+                                     games_count=len(games), 
+                                     teams_count=len(ats_dict),
+                                     unmapped_teams=unmapped_teams,
+                                     row_changes=slate.row_changes() if previous is not None else None)
         
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
@@ -749,10 +839,456 @@ def index():
     
     return render_template('index.html')
 
-@app.route('/download/<filename>')
+def chart_rows_from_payload(payload):
+    """Decode chart rows posted back by the download form, or None if malformed"""
+    if not payload or len(payload) > MAX_INPUT_SIZE:
+        return None
+    try:
+        rows = json.loads(payload)
+    except ValueError:
+        return None
+    if not isinstance(rows, list):
+        return None
+    for row in rows:
+        if not isinstance(row, dict) or not all(isinstance(row.get(column), str) for column in CHART_COLUMNS):
+            return None
+    return rows
+
+@app.route('/download/<filename>', methods=['GET', 'POST'])
 def download(filename):
-    """Download generated file"""
-    return send_file(os.path.join('static', filename), as_attachment=True)
+    """Download generated file.
+
+    In memory mode the workbook is streamed from XLSX_STORE. The download
+    form also posts the chart rows back, so a worker that never built this
+    chart (or already evicted it) can rebuild it - the rows must hash to the
+    requested filename.
+    """
+    data = XLSX_STORE.get(filename)
+    if data is None and request.method == 'POST':
+        chart_rows = chart_rows_from_payload(request.form.get('chart_rows'))
+        if chart_rows is not None and xlsx_filename(chart_rows) == filename:
+            data = build_xlsx_bytes(chart_rows)
+            XLSX_STORE.put(filename, data)
+            XLSX_REQUESTS.inc('built')
+            XLSX_BYTES.observe(len(data))
+            logger.info(f"Excel file rebuilt for download: {filename}")
+    if data is not None:
+        return send_file(io.BytesIO(data), mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=filename)
+
+    path = os.path.abspath(os.path.join('static', filename))
+    if not os.path.exists(path):
+        logger.warning(f"Download requested for missing file: {filename}")
+        flash('That chart has expired. Please generate it again.', 'error')
+        return redirect(url_for('index'))
+    return send_file(path, as_attachment=True)
+
+API_CHART_FORMATS = ('json', 'xlsx')
+
+@app.route('/api/chart', methods=['POST'])
+def api_chart():
+    """Chart rows and unmapped teams as JSON, without rendering the page or building a workbook.
+
+    Takes espn_schedule and teamrankings_ats as JSON fields, form fields or
+    uploads (espn_file/teamrankings_file). Without ATS data the latest stored
+    snapshot is used. format=xlsx returns the workbook instead, built only
+    then and kept in XLSX_STORE for repeat requests. Extra ATS tables
+    (teamrankings_ats_home, _away, _last10, _favorite, _underdog) and
+    ats_blend feed the blended score (see blend).
+    """
+    if request.is_json:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({'error': 'JSON body must be an object'}), 400
+        fields = body
+        espn_schedule = body.get('espn_schedule') or ''
+        teamrankings_ats = body.get('teamrankings_ats') or ''
+        if not isinstance(espn_schedule, str) or not isinstance(teamrankings_ats, str):
+            return jsonify({'error': 'espn_schedule and teamrankings_ats must be text'}), 400
+        output_format = body.get('format') or request.args.get('format', 'json')
+    else:
+        espn_schedule = uploaded_stream('espn_file') or request.form.get('espn_schedule', '')
+        teamrankings_ats = uploaded_stream('teamrankings_file') or request.form.get('teamrankings_ats', '')
+        output_format = request.form.get('format') or request.args.get('format', 'json')
+        fields = request.form
+    if output_format not in API_CHART_FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(API_CHART_FORMATS)}'}), 400
+
+    stored_snapshot = None
+    if espn_schedule and not teamrankings_ats:
+        stored_snapshot = latest_stored_snapshot()
+    if not espn_schedule or not (teamrankings_ats or stored_snapshot):
+        return jsonify({'error': 'espn_schedule and teamrankings_ats are required'}), 400
+
+    try:
+        for source in (espn_schedule, teamrankings_ats):
+            if isinstance(source, str) and len(source) > MAX_INPUT_SIZE:
+                raise InputTooLargeError(f'input exceeds {MAX_INPUT_SIZE} characters')
+        with timed_stage('parse_schedule'):
+            games, cache_hit = parse_with_cache(
+                SCHEDULE_CACHE, espn_schedule, lambda source: list(iter_espn_schedule(source, MAX_INPUT_SIZE)))
+        log_cache_lookup(SCHEDULE_CACHE, cache_hit)
+        GAMES_PARSED.inc(amount=len(games))
+        if stored_snapshot is not None:
+            snapshot_date, ats_dict = stored_snapshot
+        else:
+            snapshot_date = None
+            with timed_stage('parse_ats'):
+                ats_dict, cache_hit = parse_with_cache(
+                    ATS_CACHE, teamrankings_ats, lambda source: dict(iter_ats_records(source, MAX_INPUT_SIZE)))
+            log_cache_lookup(ATS_CACHE, cache_hit)
+    except InputTooLargeError:
+        return jsonify({'error': f'each input is limited to {MAX_INPUT_SIZE:,} characters'}), 413
+    if not games:
+        return jsonify({'error': 'could not parse any games from the ESPN schedule'}), 422
+    if not ats_dict:
+        return jsonify({'error': 'could not parse ATS data from TeamRankings'}), 422
+    try:
+        with timed_stage('parse_sources'):
+            extra_tables, _ = parse_extra_ats_tables(fields)
+        blend_terms = requested_blend(fields.get('ats_blend'))
+    except InputTooLargeError:
+        return jsonify({'error': f'each input is limited to {MAX_INPUT_SIZE:,} characters'}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    tables = {'overall': ats_dict, **extra_tables}
+
+    with timed_stage('chart'):
+        name_mapping = team_name_mapping()
+        resolver = TeamResolver(ats_dict, name_mapping)
+        scores = slate_scores(games, resolver, tables, blend_terms)
+        chart_rows, unmapped_teams = create_daily_chart(games, ats_dict, name_mapping, resolver, scores)
+    UNMAPPED_TEAMS.inc(amount=len(unmapped_teams))
+    logger.info(f"API chart built - {len(chart_rows)} games, {len(ats_dict)} teams, format {output_format}")
+
+    if output_format == 'xlsx':
+        filename = xlsx_filename(chart_rows)
+        data = XLSX_STORE.get(filename)
+        if data is None:
+            with timed_stage('xlsx'):
+                data = build_xlsx_bytes(chart_rows)
+            XLSX_STORE.put(filename, data)
+            XLSX_REQUESTS.inc('built')
+            XLSX_BYTES.observe(len(data))
+        else:
+            XLSX_REQUESTS.inc('reused')
+        return send_file(io.BytesIO(data), mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=filename)
+
+    return jsonify({
+        'games': len(games),
+        'teams': len(ats_dict),
+        'ats_snapshot_date': snapshot_date,
+        'ats_tables': {name: len(table) for name, table in tables.items()},
+        'blend': format_blend(blend_terms),
+        'blend_tables_missing': missing_blend_sources(blend_terms, tables),
+        'chart_rows': chart_rows,
+        'unmapped_teams': sorted(unmapped_teams),
+        'fuzzy_matches': {team: {'team': tr_name, 'score': round(score, 3)}
+                          for team, (tr_name, score) in sorted(resolver.fuzzy_matches.items())},
+    })
+
+def requested_slate_date(default=None):
+    """The date query argument as an ISO date (default: default, else today), or None if it isn't one"""
+    try:
+        return date.fromisoformat(request.args.get('date') or default or date.today().isoformat()).isoformat()
+    except ValueError:
+        return None
+
+@app.route('/api/lines')
+def api_lines():
+    """Opening and current line of every game on a date (?date=YYYY-MM-DD, default the latest slate recorded).
+
+    move is the points the line moved toward the team of the current line,
+    or null when the favorite changed and the sides can't be told apart.
+    """
+    if LINE_HISTORY is None:
+        return jsonify({'error': 'line history is disabled'}), 503
+    slate_date = requested_slate_date(LINE_HISTORY.latest_slate())
+    if slate_date is None:
+        return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+    return jsonify({'date': slate_date, 'games': slate_moves(LINE_HISTORY, slate_date, TEAM_TABLES.get().spread_side)})
+
+@app.route('/api/lines/game')
+def api_line_history():
+    """Every line recorded for one game, oldest first (?date=&away=&home=&time=, as charted)"""
+    if LINE_HISTORY is None:
+        return jsonify({'error': 'line history is disabled'}), 503
+    slate_date = requested_slate_date()
+    if slate_date is None:
+        return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+    away, home, game_time = (request.args.get(name, '') for name in ('away', 'home', 'time'))
+    if not (away and home and game_time):
+        return jsonify({'error': 'away, home and time are required'}), 400
+    rows = LINE_HISTORY.history(slate_date, away, home, game_time)
+    if not len(rows):
+        return jsonify({'error': 'no lines recorded for that game'}), 404
+    return jsonify({'date': slate_date, 'away': away, 'home': home, 'time': game_time,
+                    'lines': [{'line': record_line(row), 'team': row['team'].decode('ascii'),
+                               'value': float(row['value']), 'seen_at': seen_text(row['seen'])} for row in rows]})
+
+# Upper bound on slates in one /api/charts/batch request
+BATCH_MAX_SLATES = 31
+
+# Worker processes for batch charts - one per CPU core unless NCAA_BATCH_WORKERS is set
+BATCH_MAX_WORKERS = int(os.environ.get('NCAA_BATCH_WORKERS', 0)) or os.cpu_count() or 1
+
+BATCH_FORMATS = ('zip', 'xlsx')
+
+# Characters kept in slate names used for zip entries and sheet titles
+BATCH_NAME_RE = re.compile(r'[^A-Za-z0-9 ._-]+')
+
+_batch_executor = None
+_batch_executor_pid = None
+_batch_executor_lock = threading.Lock()
+
+def get_batch_executor():
+    """Process pool for batch charts, created on first use in each server process.
+
+    Workers are spawned rather than forked so they never inherit the sweeper
+    thread or a held lock from the server process.
+    """
+    global _batch_executor, _batch_executor_pid
+    with _batch_executor_lock:
+        if _batch_executor is None or _batch_executor_pid != os.getpid():
+            _batch_executor = ProcessPoolExecutor(max_workers=BATCH_MAX_WORKERS,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+            _batch_executor_pid = os.getpid()
+        return _batch_executor
+
+def reset_batch_executor():
+    """Drop a broken pool so the next batch starts a fresh one"""
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is not None:
+            _batch_executor.shutdown(wait=False, cancel_futures=True)
+        _batch_executor = None
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+def build_slate(slate, build_xlsx=True):
+    """Parse, chart and export one batch slate - runs in a pool worker.
+
+    Returns a plain dict so it pickles back cheaply; failures are reported
+    in 'error' instead of raised so one bad slate doesn't sink the batch.
+    """
+    result = {'name': slate['name'], 'games': 0, 'teams': 0, 'chart_rows': [], 'unmapped_teams': [],
+              'xlsx': None, 'timings_ms': {}, 'error': None}
+    timings = result['timings_ms']
+    start = time.perf_counter()
+    try:
+        stage = time.perf_counter()
+        games, _ = parse_with_cache(SCHEDULE_CACHE, slate['espn_schedule'],
+                                    lambda source: list(iter_espn_schedule(source, MAX_INPUT_SIZE)))
+        ats_dict, _ = parse_with_cache(ATS_CACHE, slate['teamrankings_ats'],
+                                       lambda source: dict(iter_ats_records(source, MAX_INPUT_SIZE)))
+        timings['parse'] = elapsed_ms(stage)
+        result['games'] = len(games)
+        result['teams'] = len(ats_dict)
+        if not games:
+            raise ValueError('could not parse any games from the ESPN schedule')
+        if not ats_dict:
+            raise ValueError('could not parse ATS data from TeamRankings')
+
+        stage = time.perf_counter()
+        chart_rows, unmapped_teams = create_daily_chart(games, ats_dict, team_name_mapping())
+        timings['chart'] = elapsed_ms(stage)
+        result['chart_rows'] = chart_rows
+        result['unmapped_teams'] = sorted(unmapped_teams)
+
+        if build_xlsx:
+            stage = time.perf_counter()
+            result['xlsx'] = build_xlsx_bytes(chart_rows)
+            timings['xlsx'] = elapsed_ms(stage)
+    except Exception as e:
+        result['error'] = str(e)
+    timings['total'] = elapsed_ms(start)
+    return result
+
+def run_batch(slates, build_xlsx=True):
+    """Build every slate, in the process pool when there is more than one"""
+    if len(slates) == 1 or BATCH_MAX_WORKERS == 1:
+        return [build_slate(slate, build_xlsx) for slate in slates]
+    try:
+        return list(get_batch_executor().map(build_slate, slates, repeat(build_xlsx)))
+    except BrokenProcessPool as e:
+        logger.error(f"Batch process pool failed, building in-process: {e}")
+        reset_batch_executor()
+        return [build_slate(slate, build_xlsx) for slate in slates]
+
+def create_batch_workbook(results, filename):
+    """One write-only workbook with a chart sheet per successful slate"""
+    wb = Workbook(write_only=True)
+    for result in results:
+        if result['error'] is None:
+            write_chart_sheet(wb, result['name'], result['chart_rows'])
+    wb.save(filename)
+
+def unique_slate_names(names):
+    """Clean slate names and make them unique, short enough for sheet titles"""
+    seen = set()
+    cleaned = []
+    for i, name in enumerate(names, 1):
+        base = BATCH_NAME_RE.sub('', name or '').strip()[:26] or f'Slate {i}'
+        candidate, n = base, 2
+        while candidate.lower() in seen:
+            candidate = f'{base} ({n})'
+            n += 1
+        seen.add(candidate.lower())
+        cleaned.append(candidate)
+    return cleaned
+
+def read_text_field(value):
+    """Return pasted text or an uploaded file's text, capped at MAX_INPUT_SIZE"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        if len(value) > MAX_INPUT_SIZE:
+            raise InputTooLargeError(f'input exceeds {MAX_INPUT_SIZE} characters')
+        return value
+    return '\n'.join(iter_text_lines(value.stream, MAX_INPUT_SIZE))
+
+def batch_slates_from_request():
+    """Collect (name, schedule, ATS) slates from a JSON body or a multipart form.
+
+    JSON: {"slates": [{"name", "espn_schedule", "teamrankings_ats"}, ...]}, with an
+    optional top-level "teamrankings_ats" used by slates that don't carry their own.
+    Multipart: repeated espn_file uploads or espn_schedule fields, paired in order
+    with teamrankings_file/teamrankings_ats (a single ATS table is shared by all),
+    and optional repeated name fields. Raises ValueError for malformed requests.
+    """
+    if request.is_json:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get('slates'), list):
+            raise ValueError('JSON body must be an object with a "slates" list')
+        shared_ats = body.get('teamrankings_ats')
+        entries = []
+        for slate in body['slates']:
+            if not isinstance(slate, dict):
+                raise ValueError('each slate must be an object')
+            entries.append((slate.get('name'), slate.get('espn_schedule'), slate.get('teamrankings_ats', shared_ats)))
+        if any(not isinstance(value, str) for _, schedule, ats in entries for value in (schedule, ats)):
+            raise ValueError('each slate needs espn_schedule and teamrankings_ats text')
+        output_format = body.get('format') or request.args.get('format', 'zip')
+    else:
+        schedules = ([upload for upload in request.files.getlist('espn_file') if upload.filename]
+                     or request.form.getlist('espn_schedule'))
+        ats_tables = ([upload for upload in request.files.getlist('teamrankings_file') if upload.filename]
+                      or request.form.getlist('teamrankings_ats'))
+        if len(ats_tables) == 1:
+            ats_tables = [read_text_field(ats_tables[0])] * len(schedules)  # An upload can only be read once
+        if not schedules or len(ats_tables) != len(schedules):
+            raise ValueError('provide one TeamRankings table, or one per ESPN schedule')
+        names = request.form.getlist('name')
+        entries = []
+        for i, schedule in enumerate(schedules):
+            name = names[i] if i < len(names) else getattr(schedule, 'filename', None)
+            entries.append((os.path.splitext(name)[0] if name else None, schedule, ats_tables[i]))
+        output_format = request.form.get('format') or request.args.get('format', 'zip')
+
+    if not entries:
+        raise ValueError('no slates provided')
+    if len(entries) > BATCH_MAX_SLATES:
+        raise ValueError(f'at most {BATCH_MAX_SLATES} slates per batch')
+    if output_format not in BATCH_FORMATS:
+        raise ValueError(f'format must be one of: {", ".join(BATCH_FORMATS)}')
+
+    names = unique_slate_names([name if isinstance(name, str) else None for name, _, _ in entries])
+    slates = [{'name': name, 'espn_schedule': read_text_field(schedule), 'teamrankings_ats': read_text_field(ats)}
+              for name, (_, schedule, ats) in zip(names, entries)]
+    return slates, output_format
+
+def record_batch_metrics(results):
+    """Feed the stage timings and counts measured in the pool workers into METRICS"""
+    for result in results:
+        for stage, ms in result['timings_ms'].items():
+            if stage != 'total':
+                STAGE_SECONDS.observe(ms / 1000, f'batch_{stage}')
+        GAMES_PARSED.inc(amount=result['games'])
+        UNMAPPED_TEAMS.inc(amount=len(result['unmapped_teams']))
+        if result['xlsx'] is not None:
+            XLSX_REQUESTS.inc('built')
+            XLSX_BYTES.observe(len(result['xlsx']))
+
+@app.route('/api/charts/batch', methods=['POST'])
+def charts_batch():
+    """Build charts for several slates at once, in parallel worker processes.
+
+    Returns a zip with one workbook per slate plus summary.json (format=zip,
+    the default), or a single workbook with a sheet per slate (format=xlsx).
+    Per-slate stage timings are in the X-Slate-Timings header either way.
+    """
+    start = time.perf_counter()
+    try:
+        slates, output_format = batch_slates_from_request()
+    except InputTooLargeError:
+        return jsonify({'error': f'each input is limited to {MAX_INPUT_SIZE:,} characters'}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    logger.info(f"Batch chart request received - {len(slates)} slate(s), format {output_format}")
+
+    results = run_batch(slates, build_xlsx=output_format == 'zip')
+    record_batch_metrics(results)
+    summary = [{key: result[key] for key in ('name', 'games', 'teams', 'unmapped_teams', 'timings_ms', 'error')}
+               for result in results]
+    failed = [result['name'] for result in results if result['error'] is not None]
+    if failed:
+        logger.warning(f"Batch slates failed ({len(failed)}): {', '.join(failed)}")
+    if len(failed) == len(results):
+        return jsonify({'error': 'no slate could be charted', 'slates': summary}), 422
+
+    buffer = io.BytesIO()
+    if output_format == 'xlsx':
+        create_batch_workbook(results, buffer)
+        mimetype, download_name = XLSX_MIMETYPE, 'daily_charts_batch.xlsx'
+    else:
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for result in results:
+                if result['error'] is None:
+                    archive.writestr(f"{result['name']}.xlsx", result['xlsx'])
+            archive.writestr('summary.json', json.dumps(summary, indent=2))
+        mimetype, download_name = 'application/zip', 'daily_charts_batch.zip'
+    buffer.seek(0)
+
+    logger.info(f"Batch charts built - {len(results) - len(failed)}/{len(results)} slate(s), "
+                f"{sum(result['games'] for result in results)} games in {elapsed_ms(start):.0f} ms")
+    response = send_file(buffer, mimetype=mimetype, as_attachment=True, download_name=download_name)
+    response.headers['X-Slate-Timings'] = json.dumps(
+        [{'name': result['name'], **result['timings_ms']} for result in results], separators=(',', ':'))
+    return response
+
+@METRICS.collector
+def cache_metrics():
+    """Parse cache and workbook store counters, read from LRUCache.stats() at scrape time"""
+    stats = [(cache.name, cache.stats()) for cache in (SCHEDULE_CACHE, ATS_CACHE, XLSX_STORE, SLATE_CHARTS, TEAM_FEATURES)]
+    yield ('ncaa_cache_hits_total', 'counter', 'Cache lookups answered from the cache',
+           [({'cache': name}, s['hits']) for name, s in stats])
+    yield ('ncaa_cache_misses_total', 'counter', 'Cache lookups that missed',
+           [({'cache': name}, s['misses']) for name, s in stats])
+    yield ('ncaa_cache_evictions_total', 'counter', 'Entries evicted or expired',
+           [({'cache': name}, s['evictions']) for name, s in stats])
+    yield ('ncaa_cache_entries', 'gauge', 'Entries held in memory', [({'cache': name}, s['size']) for name, s in stats])
+    yield ('ncaa_cache_bytes', 'gauge', 'Bytes held by size-bounded caches',
+           [({'cache': name}, s['bytes']) for name, s in stats])
+
+@METRICS.collector
+def sweeper_metrics():
+    """Background cleanup of static/, read from ArtifactSweeper.stats() at scrape time"""
+    stats = ARTIFACT_SWEEPER.stats()
+    yield ('ncaa_artifacts_swept_files_total', 'counter', 'Generated workbooks deleted by the sweeper',
+           [({}, stats['swept_files'])])
+    yield ('ncaa_artifacts_swept_bytes_total', 'counter', 'Bytes of generated workbooks deleted by the sweeper',
+           [({}, stats['swept_bytes'])])
+    yield ('ncaa_artifacts_files', 'gauge', 'Generated workbooks in static/ at the last scan', [({}, stats['tracked_files'])])
+    yield ('ncaa_artifacts_bytes', 'gauge', 'Bytes of generated workbooks in static/ at the last scan',
+           [({}, stats['tracked_bytes'])])
+
+@app.route('/metrics')
+def metrics():
+    """Counters and histograms for this worker process in the Prometheus text format"""
+    return METRICS.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['ingest']:
+        from ingest import main
+        sys.exit(main(sys.argv[2:]))
     app.run(debug=True)
@@ -0,0 +1,165 @@
+"""ASGI front end for the Flask app, for serving with uvicorn or hypercorn.
+
+    uvicorn asgi:application --port 8000 [--workers 2]
+    hypercorn asgi:application --bind 127.0.0.1:8000
+
+Every route of app.py (the form, downloads and the JSON APIs) is served
+unchanged. The request body is read on the event loop before the Flask
+app runs, and the response is sent back on the event loop after it
+returns, so a slow upload or download costs an idle coroutine rather than
+a worker. Only the parsing, charting and workbook work runs in a thread
+pool of ASGI_THREADS threads, which caps CPU work per process.
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app, logger
+
+# Threads that run Flask requests (parsing, charting, openpyxl) - one per CPU core unless NCAA_ASGI_THREADS is set
+ASGI_THREADS = int(os.environ.get('NCAA_ASGI_THREADS', 0)) or os.cpu_count() or 1
+
+# Largest request body accepted - room for a full /api/charts/batch request
+ASGI_MAX_BODY_BYTES = int(os.environ.get('NCAA_ASGI_MAX_BODY', 40 * 1024 * 1024))
+
+# Response bodies are sent in chunks of this size
+ASGI_SEND_CHUNK = 64 * 1024
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix='asgi-wsgi')
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+async def read_body(receive, limit):
+    """Collect the whole request body from the client"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientDisconnected()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            raise BodyTooLarge()
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its buffered body (PEP 3333).
+
+    The body is already whole, so CONTENT_LENGTH is its length and the
+    client's Transfer-Encoding is dropped - Werkzeug ignores the length of
+    a request it is told is chunked.
+    """
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]) if server[1] is not None else '80',
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name not in ('CONTENT_LENGTH', 'TRANSFER_ENCODING'):
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def run_wsgi(environ):
+    """Run the Flask app on a buffered request; returns (status code, headers, body)"""
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and response:
+            raise exc_info[1].with_traceback(exc_info[2])
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        return chunks.append
+
+    result = flask_app(environ, start_response)
+    try:
+        for chunk in result:
+            if chunk:
+                chunks.append(chunk)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], b''.join(chunks)
+
+
+async def send_simple(send, status, text):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+    await send({'type': 'http.response.body', 'body': text.encode()})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            _executor.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    declared = dict(scope.get('headers', [])).get(b'content-length')
+    if declared is not None and declared.isdigit() and int(declared) > ASGI_MAX_BODY_BYTES:
+        return await send_simple(send, 413, 'Request body too large')
+    try:
+        body = await read_body(receive, ASGI_MAX_BODY_BYTES)
+    except BodyTooLarge:
+        return await send_simple(send, 413, 'Request body too large')
+    except ClientDisconnected:
+        return
+
+    loop = asyncio.get_running_loop()
+    try:
+        status, headers, content = await loop.run_in_executor(_executor, run_wsgi, build_environ(scope, body))
+    except Exception as e:
+        logger.error(f"ASGI request failed: {e}")
+        return await send_simple(send, 500, 'Internal Server Error')
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    for start in range(0, len(content), ASGI_SEND_CHUNK):
+        await send({'type': 'http.response.body', 'body': content[start:start + ASGI_SEND_CHUNK],
+                    'more_body': start + ASGI_SEND_CHUNK < len(content)})
+    if not content:
+        await send({'type': 'http.response.body', 'body': b''})
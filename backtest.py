@@ -0,0 +1,197 @@
+"""Replay archived slates through the chart engine and grade the picks against final scores.
+
+Inputs are CSV or Parquet files (Parquet needs pyarrow installed):
+
+    schedules      date, away, home, spread_team, spread[, time]
+    ATS snapshots  date, team, cover_pct, ats_pm
+    final scores   date, away, home, away_score, home_score
+
+spread_team/spread are the ESPN line as it appears on the schedule
+("Spread:DUKE -3.5" is spread_team DUKE, spread -3.5); leave them empty for
+games without a line. Each game is charted with the latest ATS snapshot
+taken on or before its date, so snapshots should be saved before tip-off.
+
+    python -m backtest schedules.csv ats.csv scores.csv [--workers 4] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from charting import TeamResolver, chart_frame, team_name_mapping
+from records import AtsTable, GameTable
+
+SCHEDULE_COLUMNS = ['date', 'away', 'home', 'spread_team', 'spread']
+ATS_COLUMNS = ['date', 'team', 'cover_pct', 'ats_pm']
+SCORE_COLUMNS = ['date', 'away', 'home', 'away_score', 'home_score']
+
+# Avg Conf buckets, split at the same 30/50 thresholds that colour the XLSX rows
+CONF_BUCKETS = [('under 30', 0, 30), ('30-50 (yellow)', 30, 50), ('50+ (green)', 50, np.inf)]
+
+# Profit on a winning 1-unit bet at -110
+WIN_PAYOUT = 100 / 110
+
+
+def load_table(path, required_columns):
+    """Read a CSV or Parquet file, checking it has the required columns"""
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        try:
+            table = pd.read_parquet(path)
+        except ImportError as e:
+            raise ValueError(f"reading {path} needs a Parquet engine such as pyarrow") from e
+    else:
+        table = pd.read_csv(path)
+    missing = [column for column in required_columns if column not in table.columns]
+    if missing:
+        raise ValueError(f"{path} is missing column(s): {', '.join(missing)}")
+    table['date'] = pd.to_datetime(table['date']).dt.normalize()
+    return table
+
+
+def snapshot_ats_table(snapshot):
+    """AtsTable of one snapshot's rows; numeric covers are shown to one decimal, as TeamRankings does"""
+    covers = snapshot['cover_pct']
+    if pd.api.types.is_numeric_dtype(covers):
+        # Chart on the rounded cover % that is displayed, like a pasted table
+        covers = covers.map('{:.1f}%'.format)
+    return AtsTable.from_columns(snapshot['team'], covers.to_numpy(dtype=object), snapshot['ats_pm'])
+
+
+def schedule_table(schedule):
+    """GameTable of schedule rows; games without both spread_team and spread have no line"""
+    times = schedule['time'].map(lambda time: '' if pd.isna(time) else str(time)) if 'time' in schedule \
+        else [''] * len(schedule)
+    return GameTable.from_columns(schedule['away'], schedule['home'], times,
+                                  schedule['spread_team'], schedule['spread'])
+
+
+# chart_frame columns replay_season adds to the schedule by default
+PICK_COLUMNS = ['avg_conf', 'play_side', 'play_spread']
+
+
+def chart_snapshot_group(games, ats_table, columns=PICK_COLUMNS):
+    """Chart every game that uses one ATS snapshot; runs in a worker when --workers > 1"""
+    name_mapping = team_name_mapping()
+    frame, _ = chart_frame(games, ats_table, name_mapping, TeamResolver(ats_table, name_mapping))
+    return frame[columns]
+
+
+def replay_season(schedules, snapshots, workers=1, columns=PICK_COLUMNS):
+    """Chart every scheduled game against its as-of ATS snapshot.
+
+    Games are grouped by the snapshot they use so each group is charted with
+    one chart_frame call. Returns the schedule with the chart_frame columns
+    added (avg_conf, play_side and play_spread by default); games before the
+    first snapshot get NaN, or '' for play_side.
+    """
+    if snapshots.empty:
+        raise ValueError('no ATS snapshots to replay against')
+    schedules = schedules.reset_index(drop=True)
+    snapshot_dates = np.sort(snapshots['date'].unique())
+    position = np.searchsorted(snapshot_dates, schedules['date'].to_numpy(), side='right') - 1
+    schedules['snapshot_date'] = pd.Series(snapshot_dates[np.maximum(position, 0)]).where(position >= 0)
+
+    groups = []
+    snapshots_by_date = dict(tuple(snapshots.groupby('date')))
+    for snapshot_date, games in schedules.groupby('snapshot_date'):
+        groups.append((games.index, schedule_table(games), snapshot_ats_table(snapshots_by_date[snapshot_date])))
+
+    if workers > 1 and len(groups) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(chart_snapshot_group, [g[1] for g in groups], [g[2] for g in groups],
+                                       repeat(columns), chunksize=max(1, len(groups) // (workers * 4))))
+    else:
+        frames = [chart_snapshot_group(games, ats_table, columns) for _, games, ats_table in groups]
+
+    for (index, _, _), frame in zip(groups, frames):
+        frame.index = index
+    picks = schedules.drop(columns='snapshot_date').join(
+        pd.concat(frames) if frames else pd.DataFrame(columns=columns, dtype=float))
+    if 'play_side' in picks:
+        picks['play_side'] = picks['play_side'].fillna('')
+    return picks
+
+
+def grade_picks(picks, scores):
+    """Grade each pick against the spread; adds result ('win', 'loss', 'push' or '') and profit.
+
+    A game is bet when it has a play side, a line and a final score. The play
+    side covers when its margin plus its line is positive.
+    """
+    scores = scores[SCORE_COLUMNS].drop_duplicates(['date', 'away', 'home'], keep='last')
+    graded = picks.merge(scores, on=['date', 'away', 'home'], how='left')
+    margin = np.where(graded['play_side'] == 'away', graded['away_score'] - graded['home_score'],
+                      graded['home_score'] - graded['away_score'])
+    ats_margin = margin + graded['play_spread'].to_numpy()
+    bet = (graded['play_side'] != '').to_numpy() & ~np.isnan(ats_margin)
+    graded['result'] = np.select([bet & (ats_margin > 0), bet & (ats_margin < 0), bet], ['win', 'loss', 'push'], '')
+    graded['profit'] = np.select([graded['result'] == 'win', graded['result'] == 'loss'], [WIN_PAYOUT, -1.0], 0.0)
+    return graded
+
+
+def summarize(graded):
+    """Win rate and ROI at -110 overall and per Avg Conf bucket"""
+    def stats(rows):
+        bets = rows[rows['result'] != '']
+        wins = int((bets['result'] == 'win').sum())
+        losses = int((bets['result'] == 'loss').sum())
+        decided = wins + losses
+        return {
+            'bets': len(bets), 'wins': wins, 'losses': losses, 'pushes': len(bets) - decided,
+            'win_rate': round(wins / decided, 4) if decided else None,
+            'units': round(float(bets['profit'].sum()), 2),
+            'roi': round(float(bets['profit'].sum()) / len(bets), 4) if len(bets) else None,
+        }
+
+    report = {'games': len(graded), 'overall': stats(graded), 'buckets': {}}
+    for label, low, high in CONF_BUCKETS:
+        report['buckets'][label] = stats(graded[(graded['avg_conf'] >= low) & (graded['avg_conf'] < high)])
+    return report
+
+
+def run_backtest(schedules_path, ats_path, scores_path, workers=1):
+    """Load the three files, replay the season and return the summary report"""
+    schedules = load_table(schedules_path, SCHEDULE_COLUMNS)
+    snapshots = load_table(ats_path, ATS_COLUMNS)
+    scores = load_table(scores_path, SCORE_COLUMNS)
+    return summarize(grade_picks(replay_season(schedules, snapshots, workers), scores))
+
+
+def format_report(report):
+    def line(label, s):
+        win_rate = f"{s['win_rate']:.1%}" if s['win_rate'] is not None else '-'
+        roi = f"{s['roi']:+.1%}" if s['roi'] is not None else '-'
+        return (f"{label:16s} {s['bets']:6d} {s['wins']:6d} {s['losses']:6d} {s['pushes']:6d} "
+                f"{win_rate:>8s} {s['units']:+9.2f} {roi:>8s}")
+
+    lines = [f"{report['games']} games (break-even win rate at -110 is {110 / 210:.1%})",
+             f"{'':16s} {'bets':>6s} {'wins':>6s} {'losses':>6s} {'pushes':>6s} {'win %':>8s} {'units':>9s} {'ROI':>8s}",
+             line('all picks', report['overall'])]
+    lines += [line(label, stats) for label, stats in report['buckets'].items()]
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('schedules')
+    parser.add_argument('ats_snapshots')
+    parser.add_argument('scores')
+    parser.add_argument('--workers', type=int, default=1, help='processes used to chart snapshot groups')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_backtest(args.schedules, args.ats_snapshots, args.scores, args.workers)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Benchmark a full-season backtest on synthetic data.
+
+Writes a season of schedules, daily ATS snapshots and final scores
+(5500 games by default) to CSV files and times backtest.run_backtest
+end to end. Exits non-zero if it takes longer than the budget.
+
+    python -m benchmarks.bench_backtest [--games 5500] [--days 150] [--workers 1] [--budget-s 10]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from app import TEAM_NAME_MAPPING, derive_abbreviation
+from backtest import format_report, run_backtest
+
+
+def synthetic_season(games, days, seed=0):
+    """Schedules, ATS snapshots and scores DataFrames for a made-up season"""
+    rng = random.Random(seed)
+    teams = sorted(TEAM_NAME_MAPPING)
+    strength = {team: rng.gauss(0, 8) for team in teams}
+    dates = pd.date_range('2025-11-03', periods=days, freq='D')
+
+    schedule, scores = [], []
+    for i in range(games):
+        date = dates[i * days // games]
+        away, home = rng.sample(teams, 2)
+        line = round((strength[away] - strength[home] - 3) * 2) / 2
+        favorite = away if line > 0 else home
+        margin = strength[away] - strength[home] - 3 + rng.gauss(0, 11)
+        home_score = rng.randint(55, 85)
+        schedule.append({'date': date, 'away': away, 'home': home, 'time': '7:00 PM',
+                         'spread_team': derive_abbreviation(favorite) if line else None,
+                         'spread': -abs(line) if line else None})
+        scores.append({'date': date, 'away': away, 'home': home,
+                       'away_score': max(40, home_score + round(margin)), 'home_score': home_score})
+
+    snapshots = []
+    tr_names = sorted(set(TEAM_NAME_MAPPING.values()))
+    cover = {team: rng.uniform(35, 65) for team in tr_names}
+    for date in dates:
+        for team in tr_names:
+            cover[team] = min(100.0, max(0.0, cover[team] + rng.gauss(0, 1.5)))
+            snapshots.append({'date': date, 'team': team, 'cover_pct': f"{cover[team]:.1f}%",
+                              'ats_pm': round(rng.gauss(0, 3), 1)})
+    return pd.DataFrame(schedule), pd.DataFrame(snapshots), pd.DataFrame(scores)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=5500)
+    parser.add_argument('--days', type=int, default=150)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--budget-s', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    schedules, snapshots, scores = synthetic_season(args.games, args.days)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, name) for name in ('schedules.csv', 'ats.csv', 'scores.csv')]
+        for table, path in zip((schedules, snapshots, scores), paths):
+            table.to_csv(path, index=False)
+        start = time.perf_counter()
+        report = run_backtest(*paths, workers=args.workers)
+        elapsed = time.perf_counter() - start
+
+    print(format_report(report))
+    print(f"{args.games} games, {len(snapshots)} snapshot rows, {args.workers} worker(s): {elapsed:.2f} s "
+          f"({args.games / elapsed:,.0f} games/s)")
+    if elapsed > args.budget_s:
+        print(f"FAIL: backtest took {elapsed:.2f} s, budget {args.budget_s} s")
+        return 1
+    print(f"OK: within {args.budget_s} s budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Benchmark every stage of chart generation on synthetic slates of 10 to 5,000 games.
+
+Times parse_espn_schedule_from_text (desktop and mobile pastes),
+load_ats_data_from_text, create_daily_chart, create_xlsx_file and the full
+form POST through Flask's test client, cold (caches emptied, workbook
+deleted) and warm (parse caches and workbook reused). Each benchmark
+reports p50/p99 latency, games per second and the tracemalloc peak of one
+extra run, as JSON so runs can be compared. With --baseline it exits
+non-zero when any p50 is more than --max-regression slower.
+
+    python -m benchmarks.bench_pipeline [--sizes 10,100,1000,5000] [--output results.json]
+    python -m benchmarks.bench_pipeline --baseline results.json [--max-regression 0.25]
+"""
+import argparse
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+os.environ.setdefault('NCAA_STORE_PATH', '')  # Keep benchmark slates out of the app's SQLite store
+
+import app as chart_app
+from app import (TEAM_NAME_MAPPING, XLSX_WRITE_ONLY, create_daily_chart, create_xlsx_file,
+                 load_ats_data_from_text, parse_espn_schedule_from_text)
+from benchmarks.corpus import espn_desktop_schedule, espn_mobile_schedule, teamrankings_ats_table
+
+DEFAULT_SIZES = '10,100,1000,5000'
+
+
+def measure(run, setup=None, min_repeat=5, max_repeat=200, min_seconds=0.5):
+    """Time run() until it has been called min_repeat times and for min_seconds (at most max_repeat).
+
+    setup() runs untimed before every call. Returns (latencies in ms, tracemalloc peak in bytes).
+    """
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_repeat and (len(latencies) < min_repeat
+                                          or time.perf_counter() - started < min_seconds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latencies, peak
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(name, games, latencies, peak):
+    p50 = statistics.median(latencies)
+    return {
+        'benchmark': name,
+        'games': games,
+        'runs': len(latencies),
+        'p50_ms': round(p50, 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'games_per_s': round(games / (p50 / 1000), 1) if games and p50 else None,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def reset_caches():
+    for cache in (chart_app.SCHEDULE_CACHE, chart_app.ATS_CACHE, chart_app.XLSX_STORE):
+        cache.clear()
+
+
+def run_suite(sizes, **measure_options):
+    """Run every benchmark at every size and return the result dicts"""
+    results = []
+    ats_text = teamrankings_ats_table()
+    ats_dict = load_ats_data_from_text(ats_text)
+    results.append(summarize('load_ats_data_from_text', None,
+                             *measure(lambda: load_ats_data_from_text(ats_text), **measure_options)))
+
+    client = chart_app.app.test_client()
+    for games in sizes:
+        desktop = espn_desktop_schedule(games)
+        mobile = espn_mobile_schedule(games)
+        parsed = parse_espn_schedule_from_text(desktop)
+        chart_rows, _ = create_daily_chart(parsed, ats_dict, TEAM_NAME_MAPPING)
+
+        results.append(summarize('parse_espn_desktop', games,
+                                 *measure(lambda: parse_espn_schedule_from_text(desktop), **measure_options)))
+        results.append(summarize('parse_espn_mobile', games,
+                                 *measure(lambda: parse_espn_schedule_from_text(mobile), **measure_options)))
+        results.append(summarize('create_daily_chart', games,
+                                 *measure(lambda: create_daily_chart(parsed, ats_dict, TEAM_NAME_MAPPING),
+                                          **measure_options)))
+        results.append(summarize('create_xlsx_file', games,
+                                 *measure(lambda: create_xlsx_file(chart_rows, io.BytesIO(), write_only=XLSX_WRITE_ONLY),
+                                          **measure_options)))
+
+        if len(desktop) > chart_app.MAX_INPUT_SIZE:
+            print(f"Skipping POST at {games} games - paste is over MAX_INPUT_SIZE", file=sys.stderr)
+            continue
+        form = {'espn_schedule': desktop, 'teamrankings_ats': ats_text}
+        workbook = os.path.join('static', chart_app.xlsx_filename(chart_rows))
+
+        def post():
+            response = client.post('/', data=form, content_type='multipart/form-data')  # As the browser sends it
+            if response.status_code != 200:
+                raise RuntimeError(f"POST / returned {response.status_code}")
+
+        def cold_start():
+            reset_caches()
+            if os.path.exists(workbook):
+                os.remove(workbook)
+
+        results.append(summarize('post_index_cold', games, *measure(post, setup=cold_start, **measure_options)))
+        results.append(summarize('post_index_warm', games, *measure(post, **measure_options)))
+    return results
+
+
+def compare(results, baseline, max_regression):
+    """Lines describing benchmarks whose p50 got more than max_regression slower than baseline"""
+    previous = {(row['benchmark'], row['games']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        before = previous.get((row['benchmark'], row['games']))
+        if before and before['p50_ms'] and row['p50_ms'] > before['p50_ms'] * (1 + max_regression):
+            regressions.append(f"{row['benchmark']} @ {row['games']} games: p50 {before['p50_ms']:.2f} ms -> "
+                               f"{row['p50_ms']:.2f} ms (+{row['p50_ms'] / before['p50_ms'] - 1:.0%})")
+    return regressions
+
+
+def format_table(results):
+    lines = [f"{'benchmark':26s} {'games':>6s} {'runs':>5s} {'p50 ms':>10s} {'p99 ms':>10s} "
+             f"{'games/s':>11s} {'peak KiB':>10s}"]
+    for row in results:
+        games_per_s = f"{row['games_per_s']:,.0f}" if row['games_per_s'] else '-'
+        lines.append(f"{row['benchmark']:26s} {row['games'] or '-':>6} {row['runs']:5d} {row['p50_ms']:10.2f} "
+                     f"{row['p99_ms']:10.2f} {games_per_s:>11s} {row['peak_kib']:10,.0f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated slate sizes in games')
+    parser.add_argument('--min-repeat', type=int, default=5)
+    parser.add_argument('--max-repeat', type=int, default=200)
+    parser.add_argument('--min-seconds', type=float, default=0.5, help='minimum time spent on each benchmark')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--json', action='store_true', help='print JSON instead of a table')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='fail when a p50 is this fraction slower than the baseline')
+    args = parser.parse_args(argv)
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError:
+        parser.error('--sizes must be comma-separated integers')
+
+    chart_app.logger.setLevel(logging.ERROR)  # Per-request INFO and unmapped-team warnings would swamp the output
+
+    # POSTs write their workbooks to static/ - keep them in a scratch directory
+    with tempfile.TemporaryDirectory() as scratch:
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        os.makedirs('static')
+        try:
+            results = run_suite(sizes, min_repeat=args.min_repeat, max_repeat=args.max_repeat,
+                                min_seconds=args.min_seconds)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'xlsx_write_only': XLSX_WRITE_ONLY,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2) if args.json else format_table(results))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Benchmark the threshold/weighting sweep on several synthetic seasons.
+
+Replays each season once into matchup arrays (see sweep.load_matchups),
+then times a grid of about 10k points. Exits non-zero over budget.
+
+    python -m benchmarks.bench_sweep [--seasons 3] [--workers N] [--budget-s 120]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_backtest import synthetic_season
+from sweep import concat_matchups, load_matchups, parse_grid_values, rank_results, run_sweep
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=3)
+    parser.add_argument('--games', type=int, default=5500, help='games per season')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--budget-s', type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    seasons = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for season in range(args.seasons):
+            paths = [os.path.join(tmp_dir, f"{season}-{name}") for name in ('schedules.csv', 'ats.csv', 'scores.csv')]
+            for table, path in zip(synthetic_season(args.games, 150, seed=season), paths):
+                table.to_csv(path, index=False)
+            seasons.append(load_matchups(*paths))
+    matchups = concat_matchups(seasons)
+    prepare_s = time.perf_counter() - start
+
+    grid = [[0.5, 1.0], parse_grid_values('0:6.25:0.25'), parse_grid_values('0:62.5:2.5'),
+            parse_grid_values('10,20,30,40,50,60,70,80,90,inf')]
+    start = time.perf_counter()
+    results = run_sweep(matchups, *grid, workers=args.workers)
+    sweep_s = time.perf_counter() - start
+
+    print(rank_results(results).head(5).to_string(index=False))
+    print(f"{len(matchups['pct_diff'])} games from {args.seasons} season(s), prepared in {prepare_s:.2f} s")
+    print(f"{len(results)} grid points in {sweep_s:.2f} s ({len(results) / sweep_s:,.0f} points/s)")
+    total = prepare_s + sweep_s
+    if total > args.budget_s:
+        print(f"FAIL: {total:.2f} s exceeds {args.budget_s} s budget")
+        return 1
+    print(f"OK: {total:.2f} s within {args.budget_s} s budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Benchmark fuzzy team matching against every Division I name.
+
+Times TrigramIndex lookups for misspelled/renamed team names and compares
+them with a linear difflib scan. Exits non-zero if p99 goes over budget.
+
+    python -m benchmarks.bench_team_matching [--queries 2000] [--budget-ms 1.0]
+"""
+import argparse
+import difflib
+import random
+import statistics
+import sys
+import time
+
+from app import TEAM_NAME_MAPPING, TeamResolver, TrigramIndex
+
+
+def perturb(name, rng):
+    """Return a plausible ESPN-style variant of a team name"""
+    choice = rng.randrange(5)
+    if choice == 0 and len(name) > 4:
+        i = rng.randrange(1, len(name) - 1)
+        return name[:i] + name[i+1:]
+    if choice == 1 and len(name) > 4:
+        i = rng.randrange(1, len(name) - 2)
+        return name[:i] + name[i+1] + name[i] + name[i+2:]
+    if choice == 2:
+        return name.replace(' ', '-')
+    if choice == 3:
+        return f"{name} ({name[:2].upper()})"
+    return name.upper() + '.'
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def time_lookups(lookup, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        lookup(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--budget-ms', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    tr_names = sorted(set(TEAM_NAME_MAPPING.values()))
+    ats_dict = {name: {'rank': 'N/A', 'record': '0-0', 'cover_pct': '50.0%', 'ats_pm': 0.0} for name in tr_names}
+    candidates = sorted(set(tr_names) | set(TEAM_NAME_MAPPING))
+    queries = [perturb(rng.choice(candidates), rng) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = TrigramIndex(candidates)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    trigram = time_lookups(index.best_match, queries)
+    # A fresh resolver per query so the per-resolver memo never hides the lookup cost
+    resolver = time_lookups(lambda q: TeamResolver(ats_dict, TEAM_NAME_MAPPING)._rank_candidates(q), queries[:200])
+    linear = time_lookups(lambda q: difflib.get_close_matches(q, candidates, n=1, cutoff=0), queries[:200])
+
+    print(f"indexed names: {len(index.names)}  queries: {len(queries)}  build: {build_ms:.2f} ms")
+    for label, samples in (('trigram index', trigram), ('difflib scan', linear)):
+        print(f"{label:14s} p50 {statistics.median(samples):.3f} ms  "
+              f"p99 {percentile(samples, 99):.3f} ms  max {max(samples):.3f} ms")
+    print(f"{'resolver+build':14s} p50 {statistics.median(resolver):.3f} ms (index built on first miss)")
+
+    p99 = percentile(trigram, 99)
+    if p99 > args.budget_ms:
+        print(f"FAIL: trigram p99 {p99:.3f} ms exceeds {args.budget_ms} ms budget")
+        return 1
+    print(f"OK: trigram p99 {p99:.3f} ms within {args.budget_ms} ms budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Benchmark the standard and write-only XLSX export modes.
+
+Builds a synthetic chart (500 games by default) and times create_xlsx_file
+in both modes, reporting median latency and tracemalloc peak memory.
+
+    python -m benchmarks.bench_xlsx_export [--games 500] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app import TEAM_NAME_MAPPING, create_xlsx_file
+
+
+def synthetic_chart(games, seed=0):
+    """Chart rows shaped like create_daily_chart output"""
+    rng = random.Random(seed)
+    teams = sorted(TEAM_NAME_MAPPING)
+    rows = []
+    for _ in range(games):
+        away, home = rng.sample(teams, 2)
+        away_pct = rng.uniform(20, 80)
+        home_pct = rng.uniform(20, 80)
+        rows.append({
+            'Away': away,
+            'Home': home,
+            'Market': f"{away[:4].upper()} {rng.choice([-1, 1]) * rng.randint(1, 20) + 0.5:+g}",
+            'A Cover %': f"{away_pct:.1f}%",
+            'H Cover %': f"{home_pct:.1f}%",
+            'Avg Conf': f"{abs(away_pct - home_pct):.1f}",
+            'ATS +/-': f"{rng.uniform(-5, 5):+.1f}",
+            'Time': f"{rng.randint(1, 11)}:{rng.choice(['00', '30'])} PM",
+        })
+    return rows
+
+
+def measure(chart_rows, path, write_only, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        create_xlsx_file(chart_rows, path, write_only=write_only)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    create_xlsx_file(chart_rows, path, write_only=write_only)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    chart_rows = synthetic_chart(args.games)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'chart.xlsx')
+        results = {
+            'standard': measure(chart_rows, path, False, args.repeat),
+            'write-only': measure(chart_rows, path, True, args.repeat),
+        }
+
+    print(f"{args.games} games, median of {args.repeat} runs")
+    for mode, (median_ms, peak, size) in results.items():
+        print(f"{mode:10s} {median_ms:8.1f} ms  peak {peak / 1024:8.0f} KiB  file {size / 1024:6.0f} KiB")
+    speedup = results['standard'][0] / results['write-only'][0]
+    print(f"write-only is {speedup:.1f}x faster")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Synthetic ESPN schedule pastes and TeamRankings ATS tables for benchmarks.
+
+Team names come from TEAM_NAME_MAPPING, spreads use derive_abbreviation, and
+the layouts follow what a browser copy of each page gives, so the text goes
+through the same parser paths as a real paste. Everything is seeded, so a
+given (games, seed) always produces the same text.
+"""
+import random
+
+from app import TEAM_NAME_MAPPING, derive_abbreviation
+
+ESPN_NETWORKS = ('ESPN', 'ESPN2', 'ESPNU', 'ESPN+', 'SECN', 'ACCN', 'FS1', 'CBSSN', 'BTN')
+
+
+def matchups(games, seed=0):
+    """(time, away, home, spread team or None, spread) for games made-up games"""
+    rng = random.Random(seed)
+    teams = sorted(TEAM_NAME_MAPPING)
+    slate = []
+    for _ in range(games):
+        away, home = rng.sample(teams, 2)
+        game_time = f"{rng.randint(11, 12) if rng.random() < 0.1 else rng.randint(1, 10)}:{rng.choice(['00', '30'])} PM"
+        if rng.random() < 0.9:
+            favorite = rng.choice((away, home))
+            slate.append((game_time, away, home, favorite, f"-{rng.randint(1, 20)}.5"))
+        else:
+            slate.append((game_time, away, home, None, None))
+    return slate
+
+
+def record(rng):
+    return f"{rng.randint(0, 25)}-{rng.randint(0, 25)}"
+
+
+def espn_desktop_schedule(games, seed=0):
+    """Desktop ESPN schedule paste: one item per line, (W-L) records and Spread:ABBR -x.5.
+
+    Ticket links are left out so 5,000 games stay under MAX_INPUT_SIZE.
+    """
+    rng = random.Random(seed)
+    lines = ['Thursday, January 1, 2026', '', 'MATCHUP', 'TIME', 'TV', 'TICKETS', 'ODDS BY']
+    for game_time, away, home, favorite, spread in matchups(games, seed):
+        lines += [game_time, rng.choice(ESPN_NETWORKS)]
+        if rng.random() < 0.8:
+            lines += [away, f"({record(rng)})", home, f"({record(rng)})"]
+        else:
+            lines += [away, home, f"({record(rng)}, {rng.randint(0, 9)}-{rng.randint(0, 9)} Home)"]
+        if favorite:
+            lines.append(f"Spread:{derive_abbreviation(favorite)} {spread}")
+        lines += [f"O/U:{rng.randint(125, 165)}.5", 'Gamecast']
+    return '\n'.join(lines)
+
+
+def espn_mobile_schedule(games, seed=0):
+    """Mobile ESPN schedule paste: bare W-L records and the spread on the line after Spread:"""
+    rng = random.Random(seed)
+    lines = ['Thursday, January 1, 2026', '']
+    for game_time, away, home, favorite, spread in matchups(games, seed):
+        lines += [game_time, away, record(rng), home, record(rng), rng.choice(ESPN_NETWORKS)]
+        if favorite:
+            lines += ['Spread:', f"{derive_abbreviation(favorite)} {spread}"]
+        lines += ['O/U:', f"{rng.randint(125, 165)}.5", '']
+    return '\n'.join(lines)
+
+
+def teamrankings_ats_table(seed=0, missing=0.02):
+    """TeamRankings ATS table paste covering every mapped team but a missing fraction.
+
+    Most rows are ranked (rank, team, record, cover %, ATS +/-); a few are the
+    unranked layout with MOV before ATS +/-. Cells are tab-separated, as a
+    browser copy of the table gives them.
+    """
+    rng = random.Random(seed)
+    teams = sorted(set(TEAM_NAME_MAPPING.values()))
+    teams = [team for team in teams if rng.random() >= missing]
+    rng.shuffle(teams)
+    lines = ['Rank\tTeam\tATS Record\tCover %\tMOV\tATS +/-']
+    for rank, team in enumerate(teams, 1):
+        wins, losses, pushes = rng.randint(2, 20), rng.randint(2, 20), rng.randint(0, 2)
+        ats_record = f"{wins}-{losses}-{pushes}" if pushes else f"{wins}-{losses}"
+        cover_pct = f"{100 * wins / (wins + losses + pushes):.1f}%"
+        if rng.random() < 0.95:
+            lines.append(f"{rank}\t{team}\t{ats_record}\t{cover_pct}\t{rng.uniform(-8, 8):+.1f}")
+        else:
+            lines.append(f"{team}\t{ats_record}\t{cover_pct}\t{rng.uniform(-15, 15):+.1f}\t{rng.uniform(-8, 8):+.1f}")
+    return '\n'.join(lines)
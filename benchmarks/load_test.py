@@ -0,0 +1,108 @@
+"""Load test: whether slow clients hold up everyone else on a running server.
+
+Opens --slow-clients connections that trickle a chart request body over
+--slow-seconds (like a phone uploading a big paste), and meanwhile sends
+--requests ordinary POST /api/chart requests, --concurrency at a time. The
+default of 64 slow clients is more than any sync gunicorn worker count or
+ASGI_THREADS here. Under sync gunicorn each slow upload holds a worker, so
+the ordinary requests wait out --slow-seconds behind them. Under the ASGI
+front end (asgi.py) the slow bodies are read on the event loop and hold no
+thread, so the ordinary requests finish in their usual time.
+
+    gunicorn -w 2 -b 127.0.0.1:8000 app:app
+    uvicorn asgi:application --port 8001
+    python -m benchmarks.load_test --url http://127.0.0.1:8000
+    python -m benchmarks.load_test --url http://127.0.0.1:8001
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.corpus import espn_desktop_schedule, teamrankings_ats_table
+
+
+def chart_request_body(games=40, seed=0):
+    """JSON body for /api/chart with a synthetic desktop schedule and ATS table"""
+    return json.dumps({'espn_schedule': espn_desktop_schedule(games, seed),
+                       'teamrankings_ats': teamrankings_ats_table(seed)}).encode()
+
+
+async def post(host, port, path, body, trickle_seconds=0.0, pieces=20):
+    """POST body over a fresh connection, optionally spread over trickle_seconds; returns the status code"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode())
+        if trickle_seconds:
+            step = max(1, len(body) // pieces)
+            for start in range(0, len(body), step):
+                writer.write(body[start:start + step])
+                await writer.drain()
+                await asyncio.sleep(trickle_seconds / pieces)
+        else:
+            writer.write(body)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1]) if status_line else 0
+    finally:
+        writer.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    body = chart_request_body(args.games)
+
+    slow = [asyncio.create_task(post(host, port, '/api/chart', body, args.slow_seconds))
+            for _ in range(args.slow_clients)]
+    await asyncio.sleep(0.2)  # Let the slow uploads connect first
+
+    latencies, statuses = [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def timed_request():
+        async with semaphore:
+            start = time.perf_counter()
+            statuses.append(await post(host, port, '/api/chart', body))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    slow_statuses = await asyncio.gather(*slow, return_exceptions=True)
+    return latencies, statuses, elapsed, slow_statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--slow-clients', type=int, default=64)
+    parser.add_argument('--slow-seconds', type=float, default=5.0)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--games', type=int, default=40, help='games in each chart request')
+    args = parser.parse_args(argv)
+
+    latencies, statuses, elapsed, slow_statuses = asyncio.run(run(args))
+    ok = sum(1 for status in statuses if status == 200)
+    slow_ok = sum(1 for status in slow_statuses if status == 200)
+    print(f"{args.url}: {args.slow_clients} slow uploads over {args.slow_seconds:.0f} s "
+          f"({slow_ok} completed), {args.requests} requests at concurrency {args.concurrency}")
+    print(f"ok {ok}/{len(statuses)}  throughput {len(statuses) / elapsed:.1f} req/s  "
+          f"p50 {statistics.median(latencies):.0f} ms  p99 {percentile(latencies, 99):.0f} ms  "
+          f"max {max(latencies):.0f} ms")
+    return 0 if ok == len(statuses) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Extra ATS tables blended into the chart score.
+
+TeamRankings publishes its ATS table for all games and filtered to home
+games, away games, the last 10 games, and games as favorite or underdog.
+Each pasteable table is an AtsSource, registered by name. The tables parsed
+for one paste become a TeamFeatures array - cover % and ATS +/- of every
+team in every table - built once and shared by every game and request that
+charts against the same tables.
+
+A blend is a list of weighted terms 'factor.stat=weight'. The factor says
+which table each side of a game is scored from (BLEND_FACTORS), the stat is
+'cover' or 'ats_pm'. A slate is scored in one pass of array operations as
+
+    score = sum(weight * (away value - home value)) * total weight / weight of the terms with data
+
+so a term missing for a game drops out without shrinking the score. The
+default, 'overall.cover=1', is the chart's usual cover % gap.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from records import AtsRecord
+
+
+@dataclass(frozen=True)
+class AtsSource:
+    """A pasteable ATS table: its name, form label, and parse(source, max_chars) -> (team, record dict) pairs"""
+
+    name: str
+    label: str
+    parse: Callable
+
+
+# Every registered AtsSource by name, in registration order
+ATS_SOURCES = {}
+
+
+def register_ats_source(source):
+    """Add (or replace) a pasteable table; 'overall' is the main TeamRankings table"""
+    ATS_SOURCES[source.name] = source
+    return source
+
+
+@dataclass(frozen=True)
+class BlendFactor:
+    """Which source each side of a game is scored from.
+
+    With by_line, away is the source for the side the line favors and home
+    the source for the other side, so the factor only scores games whose
+    favorite can be told.
+    """
+
+    name: str
+    away: str
+    home: str
+    by_line: bool = False
+
+
+BLEND_FACTORS = {factor.name: factor for factor in (
+    BlendFactor('overall', 'overall', 'overall'),
+    BlendFactor('venue', 'away', 'home'),
+    BlendFactor('recent', 'last10', 'last10'),
+    BlendFactor('role', 'favorite', 'underdog', by_line=True),
+)}
+
+BLEND_STATS = ('cover', 'ats_pm')
+
+# The plain chart: higher cover % plays, Avg Conf is the gap
+DEFAULT_BLEND = 'overall.cover=1'
+
+
+def parse_blend(spec):
+    """Blend terms ((factor, stat, weight), ...) from 'factor.stat=weight,...'; raises ValueError.
+
+    Zero weights are dropped; at least one term must be left.
+    """
+    terms = []
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        factor, _, stat = name.strip().partition('.')
+        if factor not in BLEND_FACTORS or stat not in BLEND_STATS:
+            raise ValueError(f"unknown blend term {name.strip()!r} - use factor.stat with factor one of "
+                             f"{', '.join(BLEND_FACTORS)} and stat one of {', '.join(BLEND_STATS)}")
+        try:
+            weight = float(weight)
+        except ValueError:
+            raise ValueError(f"blend term {name.strip()!r} needs a numeric weight") from None
+        if not np.isfinite(weight):
+            raise ValueError(f"blend term {name.strip()!r} needs a finite weight")
+        if weight:
+            terms.append((factor, stat, weight))
+    if not terms:
+        raise ValueError('a blend needs at least one term with a non-zero weight')
+    return tuple(terms)
+
+
+def format_blend(terms):
+    return ','.join(f"{factor}.{stat}={weight:g}" for factor, stat, weight in terms)
+
+
+def blend_sources(terms):
+    """Names of the sources a blend reads, in BLEND_FACTORS order"""
+    factors = {factor for factor, _, _ in terms}
+    return list(dict.fromkeys(source for factor in BLEND_FACTORS.values() if factor.name in factors
+                              for source in (factor.away, factor.home)))
+
+
+class TeamFeatures:
+    """Cover % and ATS +/- of every team in a set of ATS tables, as one float array.
+
+    tables maps source name -> parsed table (team -> record dict or
+    AtsRecord). values has a row per team and a column per (source, stat);
+    a team missing from a table, or a record without that stat, is NaN. One
+    extra all-NaN row at the end is what positions() gives an unknown team.
+    """
+
+    __slots__ = ('sources', 'teams', 'columns', 'values', '_index')
+
+    def __init__(self, tables):
+        self.sources = list(tables)
+        self.teams = list(dict.fromkeys(team for table in tables.values() for team in table))
+        self._index = {team: i for i, team in enumerate(self.teams)}
+        self.columns = {(source, stat): 2 * i + j for i, source in enumerate(self.sources)
+                        for j, stat in enumerate(BLEND_STATS)}
+        values = np.full((len(self.teams) + 1, len(self.columns)), np.nan)
+        for i, table in enumerate(tables.values()):
+            for team, record in table.items():
+                if isinstance(record, AtsRecord):
+                    cover, ats_pm = record.cover_pct, record.ats_pm
+                else:
+                    cover = float(record['cover_pct'].rstrip('%')) if record.get('cover_pct') else None
+                    ats_pm = record.get('ats_pm')
+                row = self._index[team]
+                if cover is not None:
+                    values[row, 2 * i] = cover
+                if ats_pm is not None:
+                    values[row, 2 * i + 1] = ats_pm
+        self.values = values
+
+    def positions(self, teams):
+        """Row of each team name (TeamRankings spelling), -1 (the NaN row) for unknown names and None"""
+        return np.array([self._index.get(team, -1) if team is not None else -1 for team in teams], dtype=np.intp)
+
+    def column(self, source, stat):
+        """One stat of one source for every row - all NaN if that table wasn't given"""
+        column = self.columns.get((source, stat))
+        return self.values[:, column] if column is not None else np.full(len(self.values), np.nan)
+
+
+def blend_scores(features, away_rows, home_rows, terms, away_favored=None):
+    """Away-minus-home blended score of each game; NaN where no term has both teams' values.
+
+    away_rows and home_rows are TeamFeatures.positions of each game's
+    teams. away_favored (1 away, 0 home, -1 unknown per game) is needed by
+    by_line factors; without it they score nothing.
+    """
+    count = len(away_rows)
+    total = np.zeros(count)
+    weight = np.zeros(count)
+    for factor_name, stat, term_weight in terms:
+        factor = BLEND_FACTORS[factor_name]
+        away_column = features.column(factor.away, stat)
+        home_column = features.column(factor.home, stat)
+        if factor.by_line:
+            if away_favored is None:
+                continue
+            away_value = np.where(away_favored == 1, away_column[away_rows], home_column[away_rows])
+            home_value = np.where(away_favored == 0, away_column[home_rows], home_column[home_rows])
+            known = away_favored >= 0
+            away_value[~known] = np.nan
+        else:
+            away_value = away_column[away_rows]
+            home_value = home_column[home_rows]
+        diff = away_value - home_value
+        has_data = ~np.isnan(diff)
+        total[has_data] += term_weight * diff[has_data]
+        weight[has_data] += abs(term_weight)
+    full_weight = sum(abs(term_weight) for _, _, term_weight in terms)
+    scores = np.full(count, np.nan)
+    scored = weight > 0
+    scores[scored] = total[scored] * (full_weight / weight[scored])
+    return scores
@@ -0,0 +1,120 @@
+"""In-process LRU caches with TTL eviction and optional on-disk storage"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry TTL.
+
+    Entries beyond max_entries (or, with max_bytes set, beyond that many
+    bytes as measured by sizeof) are evicted least recently used first, and
+    entries older than ttl_seconds are treated as missing. With disk_dir set,
+    values are also written there as JSON so other workers (and restarts)
+    can reuse them; disk entries expire by file modification time.
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, name, max_entries=64, ttl_seconds=6 * 3600, disk_dir=None,
+                 max_bytes=None, sizeof=len):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._discard(key)
+                self.evictions += 1
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value, now)
+        return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries if full"""
+        with self._lock:
+            self._store(key, value, time.monotonic())
+        self._write_disk(key, value)
+
+    def stats(self):
+        """Counters for logging - hits, misses, evictions and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries), 'bytes': self.total_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _store(self, key, value, stored_at):
+        if key in self._entries:
+            self._discard(key)
+        self._entries[key] = (stored_at, value)
+        if self.max_bytes is not None:
+            self.total_bytes += self.sizeof(value)
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._entries) > 1):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _discard(self, key):
+        _, value = self._entries.pop(key)
+        if self.max_bytes is not None:
+            self.total_bytes -= self.sizeof(value)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{self.name}-{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
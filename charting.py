@@ -0,0 +1,420 @@
+"""Team name resolution, spread flipping and the daily chart, shared by the app, ingest and the backtest"""
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import chain, repeat
+
+import numpy as np
+import pandas as pd
+
+from records import CHART_COLUMNS, NO_MARKET, AtsRecord, AtsTable, ChartRow, Game, GameTable, as_games
+from teams import TEAMS_FILE, TEAMS_RELOAD_INTERVAL, TeamTablesLoader
+
+logger = logging.getLogger('ncaa_ats_app')
+
+# ESPN -> TeamRankings names and spread abbreviations live in teams.json, read on first use
+# and re-read when the file changes (see teams.TeamTablesLoader)
+TEAM_TABLES = TeamTablesLoader(TEAMS_FILE, TEAMS_RELOAD_INTERVAL, logger=logger)
+
+
+def team_name_mapping():
+    """The current ESPN -> TeamRankings name mapping (read-only)"""
+    return TEAM_TABLES.get().name_mapping
+
+
+def derive_abbreviation(team_name):
+    """Derive team abbreviation from full name - table lookup, else built from the name"""
+    return TEAM_TABLES.get().abbreviation(team_name)
+
+
+def play_market(game, away_ats, home_ats, score=None):
+    """Market for a chart row - the spread flipped to the side with the edge.
+
+    The edge is the blended score when one is given (see blend), else the
+    cover % gap. 'N/A' unless both teams have ATS records; markets without a
+    spread show as they are. Ties, and spreads whose team can't be told (see
+    TeamTables.spread_side), keep the spread as ESPN listed it.
+    """
+    if away_ats is None or home_ats is None:
+        return NO_MARKET
+    spread = game.spread
+    if spread is None:
+        return game.market_text
+    edge = score if score is not None else away_ats.cover_pct - home_ats.cover_pct
+    if edge == 0:
+        return spread.display
+    side = TEAM_TABLES.get().spread_side(spread.team, game.away, game.home)
+    if side is None:
+        logger.warning(f"Can't tell which team '{spread.display}' is for in {game.away} @ {game.home} - "
+                       f"showing the line unflipped")
+        return spread.display
+
+    if edge > 0:
+        return f"{derive_abbreviation(game.away)} {(spread.value if side == 'away' else -spread.value):+g}"
+    return f"{derive_abbreviation(game.home)} {(spread.value if side == 'home' else -spread.value):+g}"
+
+
+def flip_spread_if_needed(market, away_team, home_team, away_cover, home_cover):
+    """Flip spread to show higher cover % team's perspective - play_market for a parser Market and cover strings"""
+    game = Game.from_dict({'Away': away_team, 'Home': home_team, 'Time': '', 'Market': market})
+    return play_market(game, AtsRecord.from_dict(away_team, {'cover_pct': away_cover}),
+                       AtsRecord.from_dict(home_team, {'cover_pct': home_cover}))
+
+
+# Whole-word abbreviations folded together when normalizing team names
+TEAM_NAME_WORD_FOLDS = {'state': 'st', 'saint': 'st'}
+
+
+@lru_cache(maxsize=4096)
+def normalize_team_name(team_name):
+    """Normalized lookup key - casefolded, accents/periods/apostrophes dropped, State/Saint -> St"""
+    name = unicodedata.normalize('NFKD', team_name)
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    name = name.casefold().replace('.', '').replace("'", '').replace('\u2019', '')
+    return ' '.join(TEAM_NAME_WORD_FOLDS.get(word, word) for word in name.split())
+
+
+NON_ALNUM_RE = re.compile(r'[^0-9a-z]+')
+
+
+def name_trigrams(team_name):
+    """Character trigrams of the normalized name, padded so word starts count"""
+    cleaned = NON_ALNUM_RE.sub(' ', normalize_team_name(team_name)).strip()
+    if not cleaned:
+        return frozenset()
+    padded = f"  {cleaned} "
+    return frozenset(padded[i:i+3] for i in range(len(padded) - 2))
+
+
+def team_name_words(team_name):
+    return NON_ALNUM_RE.sub(' ', normalize_team_name(team_name)).split()
+
+
+def _words_match(word, other):
+    if word == other:
+        return True
+    if min(len(word), len(other)) >= 3 and (word.startswith(other) or other.startswith(word)):
+        return True
+    if min(len(word), len(other)) >= 4:
+        grams = name_trigrams(word)
+        other_grams = name_trigrams(other)
+        return 2 * len(grams & other_grams) / (len(grams) + len(other_grams)) >= 0.6
+    return False
+
+
+def team_words_compatible(team_name, candidate):
+    """True when every word of each name matches a word of the other.
+
+    Guards fuzzy matches against dropped qualifiers - "San Diego State" is
+    close to "San Diego" by trigrams but is a different team.
+    """
+    words = team_name_words(team_name)
+    candidate_words = team_name_words(candidate)
+    return (all(any(_words_match(w, c) for c in candidate_words) for w in words)
+            and all(any(_words_match(c, w) for w in words) for c in candidate_words))
+
+
+class TrigramIndex:
+    """Character-trigram inverted index for fuzzy team name lookups.
+
+    Similarity is the Dice coefficient of the two trigram sets. A query only
+    touches the posting lists of its own trigrams, so a lookup costs a few
+    hundred counter increments rather than a scan of every indexed name.
+    """
+
+    def __init__(self, names):
+        self.names = []
+        self._sizes = []
+        self._postings = {}
+        for name in dict.fromkeys(names):
+            grams = name_trigrams(name)
+            if not grams:
+                continue
+            idx = len(self.names)
+            self.names.append(name)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+    def matches(self, team_name, limit=3):
+        """Return up to `limit` (indexed name, score) pairs, best first"""
+        grams = name_trigrams(team_name)
+        if not grams:
+            return []
+        shared = {}
+        for gram in grams:
+            for idx in self._postings.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        query_size = len(grams)
+        scored = [(2 * count / (query_size + self._sizes[idx]), idx) for idx, count in shared.items()]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.names[idx], score) for score, idx in scored[:limit]]
+
+    def best_match(self, team_name):
+        """Return the closest (indexed name, score), or None if nothing shares a trigram"""
+        found = self.matches(team_name, limit=1)
+        return found[0] if found else None
+
+
+# Minimum trigram similarity for an unmapped team to be matched automatically
+FUZZY_MATCH_THRESHOLD = 0.8
+# Minimum similarity for a candidate to be offered as a hint in the unmapped warning
+FUZZY_SUGGESTION_MIN = 0.5
+
+
+class TeamResolver:
+    """Resolve ESPN team names to TeamRankings ATS records.
+
+    Built once per ats_dict. Tries the exact name, the name mapping, then a
+    normalized key (see normalize_team_name); names that still miss fall
+    back to a trigram fuzzy match, kept in fuzzy_matches for reporting.
+    """
+
+    def __init__(self, ats_dict, name_mapping, fuzzy_threshold=FUZZY_MATCH_THRESHOLD):
+        self.ats_dict = ats_dict
+        self.name_mapping = name_mapping
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_matches = {}
+        self._fuzzy_index = None
+        self._suggestions = {}
+        self._records = {}
+        self._normalized = {}
+        ambiguous = set()
+        for tr_name in ats_dict:
+            key = normalize_team_name(tr_name)
+            if self._normalized.get(key, tr_name) != tr_name:
+                ambiguous.add(key)
+            self._normalized[key] = tr_name
+        for key in ambiguous:
+            del self._normalized[key]
+
+        self._exact = {}
+        for espn_name, tr_name in name_mapping.items():
+            if tr_name not in ats_dict:
+                tr_name = self._normalized.get(normalize_team_name(tr_name))
+            if tr_name is not None:
+                self._exact[espn_name] = tr_name
+                self._normalized.setdefault(normalize_team_name(espn_name), tr_name)
+        for tr_name in ats_dict:
+            self._exact[tr_name] = tr_name
+
+    def resolve_name(self, team_name):
+        """Return the TeamRankings name for team_name, or None if it can't be found"""
+        tr_name = self._exact.get(team_name)
+        if tr_name is None:
+            tr_name = self._normalized.get(normalize_team_name(team_name))
+        if tr_name is None and self.fuzzy_threshold is not None:
+            tr_name = self._fuzzy_resolve(team_name)
+        return tr_name
+
+    def suggest(self, team_name):
+        """Return the closest (TeamRankings name, score) for an unresolved team, or None"""
+        if team_name not in self._suggestions:
+            self._suggestions[team_name] = self._rank_candidates(team_name)
+        candidates = self._suggestions[team_name]
+        return candidates[0][:2] if candidates else None
+
+    def _rank_candidates(self, team_name):
+        if self._fuzzy_index is None:
+            self._fuzzy_index = TrigramIndex(chain(self.ats_dict, self.name_mapping.values(), self.name_mapping))
+        ranked = {}
+        for name, score in self._fuzzy_index.matches(team_name, limit=5):
+            tr_name = self._exact.get(name) or self._normalized.get(normalize_team_name(name))
+            if tr_name is not None and tr_name not in ranked:
+                ranked[tr_name] = (score, name)
+        return [(tr_name, score, name) for tr_name, (score, name) in ranked.items()]
+
+    def _fuzzy_resolve(self, team_name):
+        if team_name in self.fuzzy_matches:
+            return self.fuzzy_matches[team_name][0]
+        self.suggest(team_name)
+        candidates = self._suggestions[team_name]
+        if not candidates or candidates[0][1] < self.fuzzy_threshold:
+            return None
+        if len(candidates) > 1 and candidates[1][1] == candidates[0][1]:
+            return None
+        tr_name, score, matched_name = candidates[0]
+        if not team_words_compatible(team_name, matched_name):
+            return None
+        self.fuzzy_matches[team_name] = (tr_name, score)
+        return tr_name
+
+    def resolve(self, team_name):
+        """Return the full ATS record for team_name, or None if it can't be found"""
+        tr_name = self.resolve_name(team_name)
+        return self.ats_dict[tr_name] if tr_name is not None else None
+
+    def record(self, team_name):
+        """Return team_name's AtsRecord, or None if it can't be found or has no cover %.
+
+        Records are parsed from the ATS dict once per resolver and kept.
+        """
+        if team_name in self._records:
+            return self._records[team_name]
+        tr_name = self.resolve_name(team_name)
+        record = self.ats_dict[tr_name] if tr_name is not None else None
+        if record is not None and not isinstance(record, AtsRecord):
+            record = AtsRecord.from_dict(tr_name, record)
+        self._records[team_name] = record
+        return record
+
+
+# Slates with at least this many games are charted by the columnar engine (chart_frame);
+# below it building the DataFrames costs more than the per-row loop
+CHART_COLUMNAR_MIN_GAMES = 500
+
+
+def chart_records(games, ats_dict, name_mapping, resolver=None, scores=None):
+    """Chart games (Games or parser dicts) as ChartRows; returns (rows, unmapped_teams).
+
+    Teams are looked up with resolver.record, so each one's ATS record is
+    parsed once however many games it plays in. scores, one per game (None
+    for the cover % gap), come from slate_scores.
+    """
+    if resolver is None:
+        resolver = TeamResolver(ats_dict, name_mapping)
+    games = as_games(games)
+    chart_rows = []
+    unmapped_teams = {}
+    for game, score in zip(games, scores if scores is not None else repeat(None, len(games))):
+        away_ats = resolver.record(game.away)
+        home_ats = resolver.record(game.home)
+        if away_ats is None:
+            unmapped_teams[game.away] = None
+        if home_ats is None:
+            unmapped_teams[game.home] = None
+        chart_rows.append(ChartRow(game, away_ats, home_ats, play_market(game, away_ats, home_ats, score), score))
+    return chart_rows, list(unmapped_teams)
+
+
+def create_daily_chart(games, ats_dict, name_mapping, resolver=None, scores=None):
+    """Create daily chart with flipped spreads and track unmapped teams"""
+    if len(games) >= CHART_COLUMNAR_MIN_GAMES:
+        return create_daily_chart_columnar(games, ats_dict, name_mapping, resolver, scores)
+    chart_rows, unmapped_teams = chart_records(games, ats_dict, name_mapping, resolver, scores)
+    return [row.to_dict() for row in chart_rows], unmapped_teams
+
+
+# Numeric columns chart_frame adds next to the CHART_COLUMNS display strings
+CHART_FRAME_NUMERIC = ['away_pct', 'home_pct', 'away_ats_pm', 'home_ats_pm', 'away_spread',
+                       'avg_conf', 'play_side', 'play_ats_pm', 'play_spread']
+
+
+def chart_frame(games, ats_dict, name_mapping, resolver=None, scores=None):
+    """Columnar create_daily_chart - one DataFrame row per game.
+
+    games may be a GameTable and ats_dict an AtsTable (the backtest builds
+    both straight from its columns); lists of games and ATS dicts are
+    converted first. Each distinct team name is resolved once to a row of the
+    AtsTable, then cover %, Avg Conf, the play side's ATS +/- and the flipped
+    market are computed as array operations. Besides the CHART_COLUMNS
+    strings the frame keeps the numbers behind them (CHART_FRAME_NUMERIC)
+    for season backtests; play_side is 'away', 'home' or '' for ties and
+    unmapped games, and away_spread is the line from the away team's side
+    whatever the pick (NaN when the line's team can't be told). Games with a
+    blended score (see slate_scores) are picked and rated by it instead of
+    the cover % gap. Returns (frame, unmapped_teams).
+    """
+    if resolver is None:
+        resolver = TeamResolver(ats_dict, name_mapping)
+    table = games if isinstance(games, GameTable) else GameTable.from_games(games)
+    ats = AtsTable.from_dict(ats_dict)
+    count = len(table)
+
+    # Resolve each distinct team once to its AtsTable row (-1, the sentinel, when it has no data)
+    codes, names = pd.factorize(np.concatenate([table.away, table.home]))
+    team_rows = ats.positions([resolver.resolve_name(name) for name in names])
+    team_tables = TEAM_TABLES.get()
+    abbrevs = np.array([team_tables.abbreviation(name) for name in names], dtype=str)
+    away_team, home_team = codes[:count], codes[count:]
+    away_row = team_rows[away_team]
+    home_row = team_rows[home_team]
+
+    away_mapped = away_row >= 0
+    home_mapped = home_row >= 0
+    mapped = away_mapped & home_mapped
+    away_pct = np.where(mapped, ats.cover_pct[away_row], np.nan)
+    home_pct = np.where(mapped, ats.cover_pct[home_row], np.nan)
+    edge = away_pct - home_pct
+    if scores is not None:
+        scores = np.asarray(scores, dtype=float)
+        edge = np.where(mapped & ~np.isnan(scores), scores, edge)
+    away_higher = edge > 0
+    home_higher = edge < 0
+    tied = mapped & (edge == 0)
+    avg_conf = np.abs(edge)
+
+    away_pm = ats.ats_pm[away_row]
+    home_pm = ats.ats_pm[home_row]
+    play_ats_pm = np.where(away_higher, away_pm, np.where(home_higher, home_pm, np.nan))
+    has_play_pm = (away_higher & ~np.isnan(away_pm)) | (home_higher & ~np.isnan(home_pm))
+    play_side = np.where(away_higher, 'away', np.where(home_higher, 'home', ''))
+
+    ats_text = np.full(count, '', dtype=object)
+    ats_text[has_play_pm] = np.char.add(np.where(play_ats_pm[has_play_pm] >= 0, '+', ''),
+                                        np.char.mod('%.1f', play_ats_pm[has_play_pm]))
+    ats_text[tied] = '-'
+    conf_text = np.full(count, '', dtype=object)
+    conf_text[mapped] = np.char.mod('%.1f', avg_conf[mapped])
+
+    # Spread markets are flipped to the play side: the line keeps its sign when
+    # it already refers to that team and is negated otherwise. Lines whose team
+    # can't be told are shown unflipped and have no away_spread.
+    is_spread = table.has_spread
+    spread = table.spread_value
+    side = np.full(count, '', dtype=object)
+    for i in np.flatnonzero(is_spread):
+        side[i] = team_tables.spread_side(table.spread_team[i], table.away[i], table.home[i]) or ''
+    resolved = side != ''
+    away_abbrev = abbrevs[away_team]
+    home_abbrev = abbrevs[home_team]
+    away_spread = np.where(resolved, np.where(side == 'away', spread, -spread), np.nan)
+    play_spread = np.where(away_higher, away_spread, -away_spread)
+    flipped = resolved & mapped & ~tied
+    play_spread[~flipped] = np.nan
+
+    unresolved = is_spread & mapped & ~tied & ~resolved
+    if unresolved.any():
+        logger.warning(f"Can't tell which team {unresolved.sum()} lines are for - showing them unflipped: "
+                       f"{', '.join(table.spread_display()[unresolved][:10])}")
+
+    market_text = np.where(mapped & ~is_spread, table.market_text, NO_MARKET)
+    unflipped = is_spread & mapped & ~flipped
+    market_text[unflipped] = table.spread_display()[unflipped]
+    market_text[flipped] = np.char.add(np.char.add(np.where(away_higher, away_abbrev, home_abbrev)[flipped], ' '),
+                                       np.char.mod('%+g', play_spread[flipped]))
+
+    frame = pd.DataFrame({
+        'Away': table.away,
+        'Home': table.home,
+        'Market': market_text,
+        'A Cover %': ats.cover_text[away_row],
+        'H Cover %': ats.cover_text[home_row],
+        'Avg Conf': conf_text,
+        'ATS +/-': ats_text,
+        'Time': table.time,
+        'away_pct': away_pct,
+        'home_pct': home_pct,
+        'away_ats_pm': np.where(mapped, away_pm, np.nan),
+        'home_ats_pm': np.where(mapped, home_pm, np.nan),
+        'away_spread': away_spread,
+        'avg_conf': avg_conf,
+        'play_side': play_side,
+        'play_ats_pm': np.where(has_play_pm, play_ats_pm, np.nan),
+        'play_spread': play_spread,
+    })
+    unmapped_teams = [name for name, row in zip(names, team_rows) if row < 0]
+    return frame, unmapped_teams
+
+
+def chart_rows_from_frame(frame):
+    """Convert a chart_frame back to create_daily_chart's list of row dicts"""
+    columns = [[str(value) for value in frame[column].tolist()] for column in CHART_COLUMNS]
+    return [dict(zip(CHART_COLUMNS, values)) for values in zip(*columns)]
+
+
+def create_daily_chart_columnar(games, ats_dict, name_mapping, resolver=None, scores=None):
+    """Same result as create_daily_chart, computed with chart_frame"""
+    frame, unmapped_teams = chart_frame(games, ats_dict, name_mapping, resolver, scores)
+    return chart_rows_from_frame(frame), unmapped_teams
@@ -0,0 +1,310 @@
+"""Bulk-load saved ESPN schedule and TeamRankings ATS pages from a directory.
+
+Every .html/.htm/.txt file under the directory is read in a process pool,
+HTML is flattened to the text a browser copy would give, and the text goes
+through the same parsers as the web form. A file is a schedule if games
+parse out of it and an ATS table if TeamRankings rows do.
+
+Each file is dated by a YYYY-MM-DD (or YYYYMMDD) in its name, else by the
+ESPN date heading inside it, else by --date or its modification time.
+Results go to the SQLite store (default), where every schedule date is also
+charted against the latest ATS snapshot on or before it, or to Parquet/CSV
+files laid out for backtest.py. The lines of every schedule file, timed by
+its modification time, are also appended to the line history (--lines).
+
+    python -m ingest saved_pages/ [--store PATH | --parquet DIR | --csv DIR] [--lines DIR] [--workers N]
+
+It imports the parsers and chart code, not the web app, so it runs without
+Flask (python -m app ingest still works and forwards here).
+"""
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from html.parser import HTMLParser
+
+import pandas as pd
+
+from charting import create_daily_chart, logger, team_name_mapping
+from linehistory import LINE_HISTORY_PATH, LineHistory
+from parsing import MAX_INPUT_SIZE, InputTooLargeError, iter_ats_records, iter_espn_schedule, schedule_date
+from store import STORE_PATH, ChartStore
+
+INGEST_SUFFIXES = ('.html', '.htm', '.txt')
+
+# Saved pages bigger than this are skipped (the extracted text is still capped at MAX_INPUT_SIZE)
+INGEST_MAX_FILE_BYTES = 20 * 1024 * 1024
+
+FILENAME_DATE_RE = re.compile(r'(\d{4})-?(\d{2})-?(\d{2})')
+
+# Elements that start a new line when a page is flattened to text
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd', 'div', 'dl', 'dt',
+              'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol',
+              'p', 'section', 'table', 'tbody', 'thead', 'tfoot', 'tr', 'ul'}
+
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'svg', 'template', 'head'}
+
+
+class PageTextExtractor(HTMLParser):
+    """Flatten HTML to lines of text roughly as a browser copy would.
+
+    Block elements end the current line and inline elements run together.
+    Table cells are joined with cell_separator - a tab keeps a TeamRankings
+    row on one line, a newline gives the one-item-per-line ESPN layout.
+    """
+
+    def __init__(self, cell_separator='\t'):
+        super().__init__(convert_charrefs=True)
+        self.cell_separator = cell_separator
+        self.lines = []
+        self._parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in ('td', 'th'):
+            if self.cell_separator == '\n':
+                self._end_line()
+            else:
+                self._parts.append(self.cell_separator)
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._parts.append(data)
+
+    def _end_line(self):
+        line = ' '.join(''.join(self._parts).split())
+        if line:
+            self.lines.append(line)
+        self._parts = []
+
+    def text(self):
+        self._end_line()
+        return '\n'.join(self.lines)
+
+
+def html_to_text(markup, cell_separator='\t'):
+    extractor = PageTextExtractor(cell_separator)
+    extractor.feed(markup)
+    extractor.close()
+    return extractor.text()
+
+
+def looks_like_html(path, content):
+    return path.lower().endswith(('.html', '.htm')) or '<html' in content[:2048].lower()
+
+
+def page_date(path, text):
+    """ISO date for a saved page from its file name or ESPN date heading, or None"""
+    match = FILENAME_DATE_RE.search(os.path.basename(path))
+    if match:
+        try:
+            return date(*(int(part) for part in match.groups())).isoformat()
+        except ValueError:
+            pass
+    return schedule_date(text)
+
+
+def ingest_file(path):
+    """Parse one saved page - runs in a pool worker.
+
+    Returns a dict with kind ('schedule', 'ats' or None), date, and the parsed
+    games or ATS records, or an error message.
+    """
+    result = {'path': path, 'kind': None, 'date': None, 'games': [], 'ats': {}, 'error': None}
+    try:
+        if os.path.getsize(path) > INGEST_MAX_FILE_BYTES:
+            raise InputTooLargeError(f'file is over {INGEST_MAX_FILE_BYTES:,} bytes')
+        with open(path, encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        if looks_like_html(path, content):
+            schedule_text = html_to_text(content, cell_separator='\n')
+            ats_text = html_to_text(content, cell_separator='\t')
+        else:
+            schedule_text = ats_text = content
+        result['date'] = page_date(path, schedule_text)
+        games = list(iter_espn_schedule(schedule_text, MAX_INPUT_SIZE))
+        if games:
+            result['kind'], result['games'] = 'schedule', games
+        else:
+            ats = dict(iter_ats_records(ats_text, MAX_INPUT_SIZE))
+            if ats:
+                result['kind'], result['ats'] = 'ats', ats
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+    return result
+
+
+def find_pages(directory):
+    """Saved page paths under directory, sorted so later files win for the same date"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(INGEST_SUFFIXES))
+    return sorted(paths)
+
+
+def result_date(result, default_date=None):
+    """The date a parsed file counts for: its own, else default_date, else its modification day"""
+    slate_date = result['date'] or default_date
+    if slate_date is None:
+        slate_date = date.fromtimestamp(os.path.getmtime(result['path'])).isoformat()
+    return slate_date
+
+
+def collect_results(results, default_date=None):
+    """Group parsed files by date: ({date: games}, {date: ats_dict}, skipped paths with reasons).
+
+    A game (away, home) in several files of one date - snapshots of the same
+    slate - is kept once, as the later file has it.
+    """
+    schedules, snapshots, skipped = {}, {}, []
+    for result in results:
+        if result['error']:
+            skipped.append((result['path'], result['error']))
+            continue
+        if result['kind'] is None:
+            skipped.append((result['path'], 'no ESPN games or TeamRankings rows found'))
+            continue
+        slate_date = result_date(result, default_date)
+        if result['kind'] == 'schedule':
+            day = schedules.setdefault(slate_date, {})
+            day.update(((game['Away'], game['Home']), game) for game in result['games'])
+        else:
+            snapshots.setdefault(slate_date, {}).update(result['ats'])
+    schedules = {slate_date: list(games.values()) for slate_date, games in schedules.items()}
+    return schedules, snapshots, skipped
+
+
+def write_store(store, schedules, snapshots):
+    """Save snapshots and games, then chart each schedule date; returns the number of charts built"""
+    for snapshot_date, ats_dict in sorted(snapshots.items()):
+        store.save_ats_snapshot(snapshot_date, ats_dict)
+    name_mapping = team_name_mapping()
+    charts = 0
+    for slate_date, games in sorted(schedules.items()):
+        store.save_games(slate_date, games)
+        snapshot = store.latest_ats_snapshot(on_or_before=slate_date)
+        if snapshot is not None:
+            chart_rows, _ = create_daily_chart(games, snapshot[1], name_mapping)
+            store.save_chart(slate_date, chart_rows)
+            charts += 1
+    return charts
+
+
+def write_line_history(history, results, default_date=None):
+    """Append every schedule file's lines, stamped with the file's modification time, oldest file first.
+
+    Unlike the store, which keeps one slate per date, each saved snapshot of
+    a day counts here. Returns the number of line records written.
+    """
+    pages = sorted((os.path.getmtime(result['path']), result) for result in results
+                   if result['kind'] == 'schedule' and not result['error'])
+    return sum(history.append(result_date(result, default_date), result['games'], seen=mtime)
+               for mtime, result in pages)
+
+
+def results_frames(schedules, snapshots):
+    """Games and ATS snapshot DataFrames in the column layout backtest.py reads"""
+    games = [{'date': slate_date, 'away': game['Away'], 'home': game['Home'], 'time': game['Time'],
+              'spread_team': game['Market']['original_abbrev'] if isinstance(game['Market'], dict) else None,
+              'spread': float(game['Market']['value']) if isinstance(game['Market'], dict) else None}
+             for slate_date, day in sorted(schedules.items()) for game in day]
+    ats = [{'date': snapshot_date, 'team': team, 'rank': record['rank'], 'record': record['record'],
+            'cover_pct': record['cover_pct'], 'ats_pm': record['ats_pm']}
+           for snapshot_date, ats_dict in sorted(snapshots.items()) for team, record in ats_dict.items()]
+    return (pd.DataFrame(games, columns=['date', 'away', 'home', 'spread_team', 'spread', 'time']),
+            pd.DataFrame(ats, columns=['date', 'team', 'rank', 'record', 'cover_pct', 'ats_pm']))
+
+
+def write_files(directory, schedules, snapshots, file_format):
+    """Write schedules and ats_snapshots tables as Parquet or CSV; returns the paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, frame in zip(('schedules', 'ats_snapshots'), results_frames(schedules, snapshots)):
+        path = os.path.join(directory, f'{name}.{file_format}')
+        if file_format == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def configure_logging():
+    """Log to the console in the app's format, unless the app already set its handlers up"""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ingest', description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--store', default=STORE_PATH or os.path.join('data', 'ncaa_ats.sqlite3'),
+                        help='SQLite store to write to (default: the app store)')
+    output.add_argument('--parquet', metavar='DIR', help='write schedules.parquet and ats_snapshots.parquet here')
+    output.add_argument('--csv', metavar='DIR', help='write schedules.csv and ats_snapshots.csv here')
+    parser.add_argument('--date', help='date (YYYY-MM-DD) for files that carry none')
+    parser.add_argument('--lines', default=LINE_HISTORY_PATH, metavar='DIR',
+                        help="line history to append every schedule's lines to ('' to skip, default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=None, help='processes to parse with (default: CPU count)')
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f'{args.directory} is not a directory')
+    paths = find_pages(args.directory)
+    workers = args.workers or os.cpu_count() or 1
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(ingest_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+    else:
+        results = [ingest_file(path) for path in paths]
+
+    schedules, snapshots, skipped = collect_results(results, args.date)
+    for path, reason in skipped:
+        logger.warning(f"Ingest skipped {path}: {reason}")
+    summary = (f"Ingested {len(paths) - len(skipped)}/{len(paths)} file(s): "
+               f"{sum(len(games) for games in schedules.values())} games on {len(schedules)} date(s), "
+               f"{len(snapshots)} ATS snapshot(s)")
+
+    try:
+        if args.parquet or args.csv:
+            file_format = 'parquet' if args.parquet else 'csv'
+            written = write_files(args.parquet or args.csv, schedules, snapshots, file_format)
+            logger.info(f"{summary} - wrote {', '.join(written)}")
+        else:
+            charts = write_store(ChartStore(args.store), schedules, snapshots)
+            logger.info(f"{summary} - saved to {args.store}, {charts} chart(s) built")
+        if args.lines:
+            lines = write_line_history(LineHistory(args.lines), results, args.date)
+            logger.info(f"{lines} line change(s) appended to {args.lines}")
+    except ImportError:
+        parser.error('writing Parquet needs pyarrow installed')
+    except (OSError, sqlite3.Error) as e:
+        parser.error(str(e))
+    return 0 if paths and len(skipped) < len(paths) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Append-only history of every ESPN line seen for each game, kept in a memory-mapped NumPy file
+
+    python -m linehistory [DIR] [--date YYYY-MM-DD]    opening vs current line of each game on a slate date
+"""
+import argparse
+import fcntl
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from teams import TEAMS_FILE, TeamTables
+
+# One line observation: game id (a row of games.tsv), unix time seen, spread value and the abbreviation it was quoted for
+LINE_DTYPE = np.dtype([('game', '<u4'), ('seen', '<u4'), ('value', '<f4'), ('team', 'S8')])
+
+LINES_FILE = 'lines.bin'
+GAMES_FILE = 'games.tsv'
+
+# Directory of the append-only line history shared by every worker - set NCAA_LINE_HISTORY_PATH='' to disable
+LINE_HISTORY_PATH = os.environ.get('NCAA_LINE_HISTORY_PATH', os.path.join('data', 'lines'))
+
+
+def game_key(slate_date, away, home, game_time):
+    """(slate date, away, home, time) with whitespace collapsed, so it fits on one games.tsv line"""
+    return tuple(' '.join(str(part).split()) for part in (slate_date, away, home, game_time))
+
+
+def line_text(team, value):
+    return f"{team} {value:g}"
+
+
+def line_move(opening_team, opening_value, team, value, spread_side):
+    """Points a line moved toward team since it opened as opening_team opening_value, or None.
+
+    spread_side(abbrev) says which side of the game an abbreviation is
+    ('away', 'home' or None). A line that opened on the other team counts
+    with its sign flipped; if either side can't be told there is no move.
+    """
+    if opening_team != team:
+        opening_side, side = spread_side(opening_team), spread_side(team)
+        if opening_side is None or side is None:
+            return None
+        if opening_side != side:
+            opening_value = -opening_value
+    return round(opening_value - value, 2)
+
+
+class LineHistory:
+    """Line observations for every game, appended to two files in a directory.
+
+    games.tsv numbers the games: one 'slate date, away, home, time' line per
+    game, its id being its line number. lines.bin is a packed array of
+    LINE_DTYPE records, read through np.memmap, so a season of snapshots
+    costs 20 bytes per line change. append() only writes lines that differ
+    from the last one recorded for their game, under an exclusive flock so
+    workers can share the directory. Queries go through an index of record
+    positions sorted by game, built on first use; records appended later
+    are merged into it rather than re-sorting the whole file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lines_path = os.path.join(directory, LINES_FILE)
+        self.games_path = os.path.join(directory, GAMES_FILE)
+        self._lock = threading.Lock()
+        self._keys = []
+        self._ids = {}
+        self._slates = {}
+        self._games_read = 0
+        self._lines = np.empty(0, LINE_DTYPE)
+        self._order = None
+        self._sorted_games = None
+
+    def __len__(self):
+        with self._lock:
+            self._sync()
+            return len(self._lines)
+
+    def _sync(self):
+        """Pick up records and games other processes appended (caller holds self._lock)"""
+        # Records are counted before games are read: a game is always written before its records
+        try:
+            count = os.path.getsize(self.lines_path) // LINE_DTYPE.itemsize
+        except FileNotFoundError:
+            count = 0
+        try:
+            games_size = os.path.getsize(self.games_path)
+        except FileNotFoundError:
+            games_size = 0
+        if games_size > self._games_read:
+            with open(self.games_path, 'rb') as f:
+                f.seek(self._games_read)
+                data = f.read(games_size - self._games_read)
+            data = data[:data.rfind(b'\n') + 1]
+            for line in data.decode('utf-8').splitlines():
+                key = tuple(line.split('\t'))
+                self._ids[key] = len(self._keys)
+                self._slates.setdefault(key[0], []).append(len(self._keys))
+                self._keys.append(key)
+            self._games_read += len(data)
+        if count != len(self._lines):
+            indexed = len(self._lines)
+            self._lines = np.memmap(self.lines_path, LINE_DTYPE, mode='r', shape=(count,)) if count else np.empty(0, LINE_DTYPE)
+            if self._order is not None and count > indexed:
+                self._merge_index(indexed)
+            else:
+                self._order = None
+
+    def _merge_index(self, start):
+        """Merge the positions of records from start on into the index, after earlier records of their game"""
+        games = np.asarray(self._lines['game'][start:])
+        order = np.argsort(games, kind='stable')
+        new_games = games[order]
+        at = np.searchsorted(self._sorted_games, new_games, 'right')
+        self._order = np.insert(self._order, at, order + start)
+        self._sorted_games = np.insert(self._sorted_games, at, new_games)
+
+    def _game_bounds(self, game_ids):
+        """(start, end) positions of each game's records in self._order, building the index if needed"""
+        if self._order is None:
+            games = np.asarray(self._lines['game'])
+            self._order = np.argsort(games, kind='stable')
+            self._sorted_games = games[self._order]
+        game_ids = np.asarray(game_ids, dtype=LINE_DTYPE['game'])
+        return (np.searchsorted(self._sorted_games, game_ids, 'left'),
+                np.searchsorted(self._sorted_games, game_ids, 'right'))
+
+    def append(self, slate_date, games, seen=None):
+        """Record the lines of parsed games (dicts with a Market) seen at unix time seen (default now).
+
+        Games without a spread and lines unchanged since their game's last
+        record are skipped. Returns the number of records written.
+        """
+        seen = int(time.time() if seen is None else seen)
+        latest_lines = {}
+        for game in games:
+            market = game['Market']
+            if isinstance(market, dict):
+                key = game_key(slate_date, game['Away'], game['Home'], game['Time'])
+                latest_lines[key] = (market['original_abbrev'].encode('ascii', 'replace')[:LINE_DTYPE['team'].itemsize],
+                                     np.float32(market['value']))
+        if not latest_lines:
+            return 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(self.lines_path, 'ab') as lines_file:
+            fcntl.flock(lines_file, fcntl.LOCK_EX)  # Released when the file closes
+            self._sync()
+            known = [(key, self._ids[key]) for key in latest_lines if key in self._ids]
+            last = {}
+            if known and len(self._lines):
+                starts, ends = self._game_bounds([game_id for _, game_id in known])
+                for (key, _), start, end in zip(known, starts, ends):
+                    if end > start:
+                        row = self._lines[self._order[end - 1]]
+                        last[key] = (row['team'], row['value'])
+
+            new_keys = []
+            records = []
+            for key, line in latest_lines.items():
+                if last.get(key) == line:
+                    continue
+                game_id = self._ids.get(key)
+                if game_id is None:
+                    game_id = len(self._keys) + len(new_keys)
+                    new_keys.append(key)
+                records.append((game_id, seen, line[1], line[0]))
+            # Drop a torn game line or record left by a crashed writer before appending whole ones
+            if new_keys:
+                with open(self.games_path, 'ab') as games_file:
+                    os.ftruncate(games_file.fileno(), self._games_read)
+                    games_file.write(''.join('\t'.join(key) + '\n' for key in new_keys).encode('utf-8'))
+            if records:
+                os.ftruncate(lines_file.fileno(), len(self._lines) * LINE_DTYPE.itemsize)
+                lines_file.write(np.array(records, dtype=LINE_DTYPE).tobytes())
+                lines_file.flush()
+            self._sync()
+        return len(records)
+
+    def latest_slate(self):
+        """The latest slate date with a recorded game, or None"""
+        with self._lock:
+            self._sync()
+            return max(self._slates, default=None)
+
+    def history(self, slate_date, away, home, game_time):
+        """Every line recorded for one game, as LINE_DTYPE records oldest first (empty if none)"""
+        with self._lock:
+            self._sync()
+            game_id = self._ids.get(game_key(slate_date, away, home, game_time))
+            if game_id is None or not len(self._lines):
+                return np.empty(0, LINE_DTYPE)
+            starts, ends = self._game_bounds([game_id])
+            rows = self._lines[self._order[starts[0]:ends[0]]]
+        return rows[np.argsort(rows['seen'], kind='stable')]
+
+    def slate(self, slate_date):
+        """(away, home, time, records oldest first) for every game of slate_date with lines, in first-seen order"""
+        with self._lock:
+            self._sync()
+            game_ids = self._slates.get(slate_date, [])
+            if not game_ids or not len(self._lines):
+                return []
+            starts, ends = self._game_bounds(game_ids)
+            games = [(self._keys[game_id][1:], self._lines[self._order[start:end]])
+                     for game_id, start, end in zip(game_ids, starts, ends) if end > start]
+        return [(*key, rows[np.argsort(rows['seen'], kind='stable')]) for key, rows in games]
+
+
+def seen_text(seen):
+    return datetime.fromtimestamp(int(seen), timezone.utc).isoformat(timespec='seconds')
+
+
+def record_line(row):
+    return line_text(row['team'].decode('ascii'), float(row['value']))
+
+
+def slate_moves(history, slate_date, spread_side):
+    """Opening vs current line of every game of slate_date with lines, as JSON-ready dicts.
+
+    move is how many points the line moved toward the current line's team
+    (None when the favorite changed and a side can't be told);
+    spread_side(abbrev, away, home) is TeamTables.spread_side.
+    """
+    moves = []
+    for away, home, game_time, rows in history.slate(slate_date):
+        opening, current = rows[0], rows[-1]
+        move = line_move(opening['team'].decode('ascii'), float(opening['value']),
+                         current['team'].decode('ascii'), float(current['value']),
+                         lambda abbrev: spread_side(abbrev, away, home))
+        moves.append({'away': away, 'home': home, 'time': game_time,
+                      'opening': record_line(opening), 'opened_at': seen_text(opening['seen']),
+                      'current': record_line(current), 'updated_at': seen_text(current['seen']),
+                      'move': move, 'changes': len(rows) - 1})
+    return moves
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?', default=os.path.join('data', 'lines'),
+                        help='line history directory (default: %(default)s)')
+    parser.add_argument('--date', help='slate date (default: the latest recorded, else today)')
+    parser.add_argument('--teams', default=TEAMS_FILE, help='teams file for telling spread sides apart (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    try:
+        tables = TeamTables.from_file(args.teams)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    history = LineHistory(args.directory)
+    args.date = args.date or history.latest_slate() or date.today().isoformat()
+    moves = slate_moves(history, args.date, tables.spread_side)
+    print(f"{args.directory}: {len(history):,} line records, {len(moves)} game(s) on {args.date}")
+    for game in moves:
+        move = f"{game['move']:+g}" if game['move'] is not None else '?'
+        print(f"  {game['away']} @ {game['home']} {game['time']}: opened {game['opening']} ({game['opened_at']}), "
+              f"now {game['current']} ({game['updated_at']}), moved {move} over {game['changes']} change(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
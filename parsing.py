@@ -0,0 +1,347 @@
+"""ESPN schedule and TeamRankings ATS table parsers, shared by the app, ingest and the benchmarks.
+
+Every parser streams: input arrives as a string or a text/binary stream and
+is read one line at a time (iter_text_lines), so a 500KB upload is never
+split into a list.
+"""
+import io
+import re
+from collections import deque
+from datetime import datetime
+from itertools import chain, islice
+
+
+# Size limits: 500KB per input (way more than needed for legitimate use)
+MAX_INPUT_SIZE = 500000  # 500KB in bytes
+
+
+class InputTooLargeError(ValueError):
+    """Raised when a streamed input grows past MAX_INPUT_SIZE"""
+
+
+def iter_text_lines(source, max_chars=None):
+    """Yield lines from a string or file-like object without building a list.
+
+    Strings are sliced one line at a time, text streams are iterated and
+    binary streams (uploads, request.stream) are decoded as UTF-8 on the fly.
+    Leading and trailing blank lines are dropped, which matches
+    text.strip().split('\n') once each line is stripped.
+    """
+    if isinstance(source, str):
+        raw_lines = _iter_string_lines(source)
+    elif isinstance(source, io.TextIOBase):
+        raw_lines = source
+    else:
+        raw_lines = _iter_binary_lines(source)
+
+    seen_content = False
+    pending_blanks = 0
+    total_chars = 0
+    for line in raw_lines:
+        if max_chars is not None:
+            total_chars += len(line)
+            if total_chars > max_chars:
+                raise InputTooLargeError(f"input exceeds {max_chars:,} characters")
+        line = line.rstrip('\n')
+        if not line.strip():
+            if seen_content:
+                pending_blanks += 1
+            continue
+        seen_content = True
+        for _ in range(pending_blanks):
+            yield ''
+        pending_blanks = 0
+        yield line
+
+
+def _iter_string_lines(text):
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end + 1]
+        start = end + 1
+
+
+def _iter_binary_lines(stream):
+    wrapper = io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='\n')
+    try:
+        yield from wrapper
+    finally:
+        # Leave the underlying stream open for its owner (e.g. werkzeug)
+        if not wrapper.closed:
+            wrapper.detach()
+
+
+# Enough lines for detect_schedule_format to give the same answer as on the full paste
+SCHEDULE_PEEK_LINES = 103
+
+
+def iter_espn_schedule(source, max_chars=None):
+    """Yield ESPN games from a string or stream, detecting the format from a bounded peek"""
+    lines = iter_text_lines(source, max_chars)
+    peek = list(islice(lines, SCHEDULE_PEEK_LINES))
+    lines = chain(peek, lines)
+
+    if detect_schedule_format(peek) == 'mobile':
+        yield from iter_mobile_games(lines)
+    else:
+        yield from iter_desktop_games(classify_schedule_line(line) for line in lines)
+
+
+# The date heading ESPN puts above each day's games, e.g. "Thursday, January 1, 2026"
+ESPN_DATE_RE = re.compile(r'^(?:[A-Z][a-z]+day, )?([A-Z][a-z]+ \d{1,2}, \d{4})$')
+
+# Lines, and characters of an upload, at the top of a schedule searched for its date heading
+SCHEDULE_DATE_LINES = 20
+SCHEDULE_DATE_CHARS = 4096
+
+
+def schedule_date(source):
+    """ISO date of the ESPN date heading at the top of a schedule (string or seekable stream), or None"""
+    if not isinstance(source, str):
+        if not (hasattr(source, 'seekable') and source.seekable()):
+            return None
+        start = source.tell()
+        head = source.read(SCHEDULE_DATE_CHARS)
+        source.seek(start)
+        source = head.decode('utf-8', errors='replace') if isinstance(head, bytes) else head
+    for line in islice(iter_text_lines(source), SCHEDULE_DATE_LINES):
+        match = ESPN_DATE_RE.match(line.strip())
+        if match:
+            try:
+                return datetime.strptime(match.group(1), '%B %d, %Y').date().isoformat()
+            except ValueError:
+                pass
+    return None
+
+
+def parse_espn_schedule_from_text(text):
+    """Parse ESPN schedule - returns spread as dictionary"""
+    return list(iter_espn_schedule(text))
+
+
+MOBILE_RECORD_RE = re.compile(r'^\d+-\d+$')
+
+
+def detect_schedule_format(lines):
+    """Detect mobile vs desktop format"""
+    for i in range(min(100, len(lines) - 2)):
+        line = lines[i].strip()
+        if line and i+1 < len(lines):
+            next_line = lines[i+1].strip()
+            if RECORD_RE.match(next_line):
+                return 'desktop'
+            if MOBILE_RECORD_RE.match(next_line):
+                if i+2 < len(lines):
+                    if lines[i+2].strip() == '' or MOBILE_RECORD_RE.match(lines[i+3].strip() if i+3 < len(lines) else ''):
+                        return 'mobile'
+    return 'desktop'
+
+
+# Desktop schedule line tags - each line is classified exactly once
+TIME, RECORD, HOME_AWAY_RECORD, SPREAD, GAMECAST, TEXT, BLANK = range(7)
+
+TIME_RE = re.compile(r'^\d{1,2}:\d{2}\s*[AP]M$')
+RECORD_RE = re.compile(r'^\(\d+-\d+.*?\)$')
+HOME_AWAY_RECORD_RE = re.compile(r'^\(\d+-\d+.*?(Home|Away)\)$')
+DESKTOP_SPREAD_RE = re.compile(r'^Spread:([A-Z0-9&\-]+)\s+([-+]?\d+\.?\d*)$')
+
+# How many lines after a game time to search for its teams and spread
+DESKTOP_GAME_WINDOW = 40
+
+
+def make_spread(team_abbrev, spread_value):
+    """Build the Market dict shared by the desktop and mobile parsers"""
+    return {
+        'original_abbrev': team_abbrev,
+        'value': spread_value,
+        'display': f"{team_abbrev} {spread_value}"
+    }
+
+
+def classify_schedule_line(raw_line):
+    """Tag one desktop schedule line - returns (tag, stripped line, spread or None)"""
+    line = raw_line.strip()
+    if not line:
+        return BLANK, line, None
+    if TIME_RE.match(line):
+        return TIME, line, None
+    if line[0] == '(' and RECORD_RE.match(line):
+        if HOME_AWAY_RECORD_RE.match(line):
+            return HOME_AWAY_RECORD, line, None
+        return RECORD, line, None
+    if line.startswith('Spread:'):
+        spread_match = DESKTOP_SPREAD_RE.match(line)
+        if spread_match:
+            return SPREAD, line, make_spread(spread_match.group(1), spread_match.group(2))
+    # Any other line mentioning Gamecast closes a game, malformed Spread: lines included
+    if 'Gamecast' in line:
+        return GAMECAST, line, None
+    return TEXT, line, None
+
+
+def iter_desktop_games(tokens):
+    """Assemble games from classified desktop lines in a single pass.
+
+    After a TIME line the next DESKTOP_GAME_WINDOW lines are searched for the
+    teams: either a name followed by a plain (W-L) record line for each side,
+    or two names directly above a (W-L, X-Y Home/Away) line. Once both teams
+    are known, Spread lines are collected until the next TIME or Gamecast line.
+    Only the two previous lines and one line of lookahead are kept.
+    """
+    tokens = iter(tokens)
+    prev = deque(maxlen=2)
+    cur = next(tokens, None)
+    nxt = next(tokens, None)
+    pos = 0
+
+    time = away_team = home_team = spread = None
+    window_end = None
+
+    while cur is not None:
+        tag, line, line_spread = cur
+
+        if window_end is not None:
+            if pos >= window_end or (away_team and home_team and (
+                    tag in (TIME, GAMECAST)
+                    or (tag in (RECORD, HOME_AWAY_RECORD) and 'Gamecast' in line))):
+                # Game window closed - the current line is re-examined as a possible anchor
+                if away_team and home_team:
+                    yield {
+                        'Away': away_team,
+                        'Home': home_team,
+                        'Time': time,
+                        'Market': spread if spread else 'N/A'
+                    }
+                window_end = None
+                continue
+
+            step = 1
+            if away_team and home_team:
+                if tag == SPREAD:
+                    spread = line_spread
+            elif tag == HOME_AWAY_RECORD and not away_team and pos >= 2 \
+                    and prev[0][1] and prev[1][1] and not prev[0][1][0].isdecimal():
+                away_team = prev[0][1]
+                home_team = prev[1][1]
+            elif line and nxt is not None and nxt[0] == RECORD:
+                if not away_team:
+                    away_team = line
+                else:
+                    home_team = line
+                step = 2
+        else:
+            step = 1
+            if tag == TIME:
+                time = line
+                away_team = home_team = spread = None
+                window_end = pos + DESKTOP_GAME_WINDOW
+
+        for _ in range(step):
+            prev.append(cur)
+            cur = nxt
+            nxt = next(tokens, None) if cur is not None else None
+            pos += 1
+
+    if window_end is not None and away_team and home_team:
+        yield {
+            'Away': away_team,
+            'Home': home_team,
+            'Time': time,
+            'Market': spread if spread else 'N/A'
+        }
+
+
+def parse_desktop_format(lines):
+    """Parse desktop format - RETURNS SPREAD AS DICT"""
+    return list(iter_desktop_games(classify_schedule_line(line) for line in lines))
+
+
+MOBILE_SPREAD_RE = re.compile(r'^([A-Z0-9&\-]+)\s+([-+]?\d+\.?\d*)$')
+
+# A mobile game block (time, teams, records) plus the lines searched for its spread
+MOBILE_GAME_WINDOW = 21
+
+
+def iter_mobile_games(lines):
+    """Yield games from mobile format lines, buffering one game window at a time"""
+    lines = (line.strip() for line in lines)
+    buf = deque()
+
+    while True:
+        buf.extend(islice(lines, MOBILE_GAME_WINDOW - len(buf)))
+        if not buf:
+            return
+
+        if TIME_RE.match(buf[0]):
+            time = buf[0]
+
+            if len(buf) > 5:
+                away_team = buf[1]
+                home_team = buf[3]
+
+                if away_team and home_team:
+                    spread = None
+                    j = 5
+                    while j < min(20, len(buf)):
+                        if buf[j] == 'Spread:' and j+1 < len(buf):
+                            spread_match = MOBILE_SPREAD_RE.match(buf[j+1])
+                            if spread_match:
+                                spread = make_spread(spread_match.group(1), spread_match.group(2))
+                            break
+                        j += 1
+
+                    yield {
+                        'Away': away_team,
+                        'Home': home_team,
+                        'Time': time,
+                        'Market': spread if spread else 'N/A'
+                    }
+
+            for _ in range(min(6, len(buf))):
+                buf.popleft()
+        else:
+            buf.popleft()
+
+
+def parse_mobile_format(lines):
+    """Parse mobile format - RETURNS SPREAD AS DICT"""
+    return list(iter_mobile_games(lines))
+
+
+ATS_RANKED_RE = re.compile(r'^(\d+)\s+(.+?)\s+(\d+-\d+-?\d*)\s+([\d.]+%)\s+([-+]?\d+\.?\d*)$')
+ATS_UNRANKED_RE = re.compile(r'^(.+?)\s+(\d+-\d+-?\d*)\s+([\d.]+%)\s+[-+]?\d+\.?\d*\s+([-+]?\d+\.?\d*)$')
+
+
+def iter_ats_records(source, max_chars=None):
+    """Yield (team_name, ATS record) pairs from a TeamRankings string or stream"""
+    for line in iter_text_lines(source, max_chars):
+        line = line.strip()
+        if not line:
+            continue
+        
+        match = ATS_RANKED_RE.match(line)
+        if match:
+            rank = match.group(1)
+            team_name = match.group(2).strip()
+            ats_record = match.group(3)
+            cover_pct = match.group(4)
+            ats_pm = float(match.group(5))
+            yield team_name, {'rank': rank, 'record': ats_record, 'cover_pct': cover_pct, 'ats_pm': ats_pm}
+            continue
+        
+        match2 = ATS_UNRANKED_RE.match(line)
+        if match2:
+            team_name = match2.group(1).strip()
+            ats_record = match2.group(2)
+            cover_pct = match2.group(3)
+            ats_pm = float(match2.group(4))
+            yield team_name, {'rank': 'N/A', 'record': ats_record, 'cover_pct': cover_pct, 'ats_pm': ats_pm}
+
+
+def load_ats_data_from_text(text):
+    """Parse ATS data from TeamRankings"""
+    return dict(iter_ats_records(text))
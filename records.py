@@ -0,0 +1,390 @@
+"""Typed game, spread, ATS and chart records, and column tables for large slates.
+
+The parsers, caches, store and JSON API pass plain dicts of strings around;
+the chart code works on these records instead. Numbers are parsed once, when
+a record is built, and ChartRow formats them back into exactly the strings
+the template, XLSX writer and store have always used. Records are shared
+once built (TeamResolver keeps its AtsRecords), so treat them as read-only;
+they are slots dataclasses rather than frozen ones because frozen __init__
+costs a microsecond per object on large slates.
+"""
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+
+# Market text for games without a line
+NO_MARKET = 'N/A'
+
+# Chart columns in display order, as keys of the row dicts
+CHART_COLUMNS = ['Away', 'Home', 'Market', 'A Cover %', 'H Cover %', 'Avg Conf', 'ATS +/-', 'Time']
+
+
+@dataclass(slots=True)
+class Spread:
+    """An ESPN line: the abbreviation it was quoted for, its value, and the value as ESPN wrote it"""
+
+    team: str
+    value: float
+    text: str
+
+    @classmethod
+    def from_market(cls, market):
+        """Spread for a parser Market dict, or None for 'N/A' and other non-spread markets"""
+        if not isinstance(market, dict) or not market:
+            return None
+        return cls(market['original_abbrev'], float(market['value']), market['value'])
+
+    @property
+    def display(self):
+        return f"{self.team} {self.text}"
+
+    def to_market(self):
+        """The Market dict the parsers produce (see make_spread)"""
+        return {'original_abbrev': self.team, 'value': self.text, 'display': self.display}
+
+
+@dataclass(slots=True)
+class Game:
+    """One scheduled game; market_text is what to show when there is no spread"""
+
+    away: str
+    home: str
+    time: str
+    spread: Spread | None = None
+    market_text: str = NO_MARKET
+
+    @classmethod
+    def from_dict(cls, game):
+        """Game for a parser dict ({'Away', 'Home', 'Time', 'Market'})"""
+        market = game['Market']
+        spread = Spread.from_market(market)
+        market_text = market if spread is None and isinstance(market, str) and market else NO_MARKET
+        return cls(game['Away'], game['Home'], game['Time'], spread, market_text)
+
+    def to_dict(self):
+        return {'Away': self.away, 'Home': self.home, 'Time': self.time,
+                'Market': self.spread.to_market() if self.spread is not None else self.market_text}
+
+
+def as_games(games):
+    """List of Games from Games or parser dicts"""
+    return [game if isinstance(game, Game) else Game.from_dict(game) for game in games]
+
+
+# TeamRankings ATS record: wins-losses, optionally -pushes
+ATS_RECORD_RE = re.compile(r'(\d+)-(\d+)(?:-(\d+))?')
+
+
+def parse_ats_record(text):
+    """(wins, losses, pushes) from a TeamRankings 'W-L' or 'W-L-P' record; zeros if unreadable"""
+    match = ATS_RECORD_RE.fullmatch(text) if text else None
+    if match is None:
+        return 0, 0, 0
+    wins, losses, pushes = match.groups()
+    return int(wins), int(losses), int(pushes) if pushes else 0
+
+
+@dataclass(slots=True)
+class AtsRecord:
+    """One team's TeamRankings ATS line with its numbers parsed.
+
+    cover_text keeps the cover % exactly as TeamRankings printed it, since
+    that is what the chart shows. rank is None for unranked teams.
+    """
+
+    team: str
+    cover_pct: float
+    cover_text: str
+    ats_pm: float | None = None
+    rank: int | None = None
+    wins: int = 0
+    losses: int = 0
+    pushes: int = 0
+
+    @classmethod
+    def from_dict(cls, team, record):
+        """AtsRecord for a load_ats_data_from_text entry, or None when it has no cover %"""
+        cover_text = record.get('cover_pct')
+        if not cover_text:
+            return None
+        rank = record.get('rank')
+        ats_pm = record.get('ats_pm')
+        return cls(team, float(cover_text.replace('%', '')), cover_text,
+                   None if ats_pm is None else float(ats_pm),
+                   int(rank) if isinstance(rank, str) and rank.isdigit() else None,
+                   *parse_ats_record(record.get('record')))
+
+    @property
+    def record(self):
+        if not (self.wins or self.losses or self.pushes):
+            return ''
+        return f"{self.wins}-{self.losses}-{self.pushes}" if self.pushes else f"{self.wins}-{self.losses}"
+
+    def to_dict(self):
+        """The dict load_ats_data_from_text produces for this team"""
+        return {'rank': str(self.rank) if self.rank is not None else 'N/A', 'record': self.record,
+                'cover_pct': self.cover_text, 'ats_pm': self.ats_pm}
+
+
+def format_ats_pm(ats_pm):
+    return f"+{ats_pm:.1f}" if ats_pm >= 0 else f"{ats_pm:.1f}"
+
+
+@dataclass(slots=True)
+class ChartRow:
+    """One chart line: the game, both teams' ATS records (None if unmapped) and the flipped market.
+
+    score is the game's away-minus-home blended score (see blend), or None
+    to score it by the cover % gap. row[column] gives the display string for
+    any CHART_COLUMNS name, so ChartRows render in the template and XLSX
+    writers like the row dicts do.
+    """
+
+    game: Game
+    away_ats: AtsRecord | None
+    home_ats: AtsRecord | None
+    market: str
+    score: float | None = None
+
+    @property
+    def mapped(self):
+        return self.away_ats is not None and self.home_ats is not None
+
+    @property
+    def edge(self):
+        """Away minus home - the score, else the cover % gap - or None when either team is unmapped"""
+        if not self.mapped:
+            return None
+        return self.score if self.score is not None else self.away_ats.cover_pct - self.home_ats.cover_pct
+
+    @property
+    def avg_conf(self):
+        """Size of the edge, or None when either team is unmapped"""
+        edge = self.edge
+        return abs(edge) if edge is not None else None
+
+    @property
+    def play_side(self):
+        """'away' or 'home' for the side the edge favors, '' for a tie, None when unmapped"""
+        edge = self.edge
+        if edge is None:
+            return None
+        if edge > 0:
+            return 'away'
+        if edge < 0:
+            return 'home'
+        return ''
+
+    @property
+    def play_ats_pm(self):
+        side = self.play_side
+        if side == 'away':
+            return self.away_ats.ats_pm
+        if side == 'home':
+            return self.home_ats.ats_pm
+        return None
+
+    def avg_conf_text(self):
+        avg_conf = self.avg_conf
+        return f"{avg_conf:.1f}" if avg_conf is not None else ''
+
+    def ats_text(self):
+        """The play side's ATS +/-: '-' for a tie, '' when unmapped or it has none"""
+        edge = self.edge
+        if edge is None:
+            return ''
+        if edge == 0:
+            return '-'
+        ats_pm = self.away_ats.ats_pm if edge > 0 else self.home_ats.ats_pm
+        return format_ats_pm(ats_pm) if ats_pm is not None else ''
+
+    def to_dict(self):
+        """The CHART_COLUMNS dict create_daily_chart returns"""
+        return {
+            'Away': self.game.away,
+            'Home': self.game.home,
+            'Market': self.market,
+            'A Cover %': self.away_ats.cover_text if self.away_ats is not None else '',
+            'H Cover %': self.home_ats.cover_text if self.home_ats is not None else '',
+            'Avg Conf': self.avg_conf_text(),
+            'ATS +/-': self.ats_text(),
+            'Time': self.game.time,
+        }
+
+    def __getitem__(self, column):
+        return CHART_ROW_VALUES[column](self)
+
+
+# Display string of each chart column for a ChartRow, in CHART_COLUMNS order
+CHART_ROW_VALUES = {
+    'Away': lambda row: row.game.away,
+    'Home': lambda row: row.game.home,
+    'Market': lambda row: row.market,
+    'A Cover %': lambda row: row.away_ats.cover_text if row.away_ats is not None else '',
+    'H Cover %': lambda row: row.home_ats.cover_text if row.home_ats is not None else '',
+    'Avg Conf': ChartRow.avg_conf_text,
+    'ATS +/-': ChartRow.ats_text,
+    'Time': lambda row: row.game.time,
+}
+
+
+def row_confidence(row):
+    """Avg Conf of a ChartRow or row dict as a float, or None if it has none"""
+    if isinstance(row, ChartRow):
+        return row.avg_conf
+    try:
+        return float(row['Avg Conf']) if row['Avg Conf'] else None
+    except ValueError:
+        return None
+
+
+def game_row(game):
+    """(away, home, time, spread team, spread value, spread text, market text) of a Game or parser dict"""
+    if isinstance(game, Game):
+        spread = game.spread
+        if spread is None:
+            return game.away, game.home, game.time, '', np.nan, '', game.market_text
+        return game.away, game.home, game.time, spread.team, spread.value, spread.text, game.market_text
+    market = game['Market']
+    if isinstance(market, dict) and market:
+        return game['Away'], game['Home'], game['Time'], market['original_abbrev'], float(market['value']), \
+            market['value'], NO_MARKET
+    return game['Away'], game['Home'], game['Time'], '', np.nan, '', \
+        market if isinstance(market, str) and market else NO_MARKET
+
+
+class GameTable:
+    """A slate as columns: one NumPy array per Game field.
+
+    spread_value is NaN and spread_team '' for games without a line. Used by
+    the columnar chart engine, and built straight from DataFrame columns by
+    the backtest so no per-game dicts are made.
+    """
+
+    __slots__ = ('away', 'home', 'time', 'spread_team', 'spread_value', 'spread_text', 'market_text')
+
+    def __init__(self, away, home, time, spread_team, spread_value, spread_text, market_text):
+        self.away = np.asarray(away, dtype=object)
+        self.home = np.asarray(home, dtype=object)
+        self.time = np.asarray(time, dtype=object)
+        self.spread_team = np.asarray(spread_team, dtype=object)
+        self.spread_value = np.asarray(spread_value, dtype=float)
+        self.spread_text = np.asarray(spread_text, dtype=object)
+        self.market_text = np.asarray(market_text, dtype=object)
+
+    @classmethod
+    def from_games(cls, games):
+        """Table from Games or parser dicts - dicts go straight into the columns"""
+        rows = [game_row(game) for game in games]
+        if not rows:
+            return cls([], [], [], [], [], [], [])
+        return cls(*zip(*rows))
+
+    @classmethod
+    def from_columns(cls, away, home, time, spread_team, spread_value):
+        """Table from schedule columns; a game has a line when it has both a team and a value"""
+        spread_value = np.asarray(spread_value, dtype=float)
+        spread_team = ['' if not isinstance(team, str) else team for team in spread_team]
+        has_line = np.array([bool(team) for team in spread_team], dtype=bool) & ~np.isnan(spread_value)
+        return cls(away, home, time, np.where(has_line, spread_team, ''), np.where(has_line, spread_value, np.nan),
+                   [f"{value:g}" if line else '' for value, line in zip(spread_value, has_line)],
+                   np.full(len(spread_value), NO_MARKET, dtype=object))
+
+    @property
+    def has_spread(self):
+        return ~np.isnan(self.spread_value)
+
+    def spread_display(self):
+        """Each line as ESPN shows it ('DUKE -3.5'), '' where there is none"""
+        return np.array([f"{team} {text}" if line else ''
+                         for team, text, line in zip(self.spread_team, self.spread_text, self.has_spread)], dtype=object)
+
+    def __len__(self):
+        return len(self.away)
+
+    def __getitem__(self, i):
+        spread = Spread(self.spread_team[i], float(self.spread_value[i]), self.spread_text[i]) \
+            if not np.isnan(self.spread_value[i]) else None
+        return Game(self.away[i], self.home[i], self.time[i], spread, self.market_text[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class AtsTable(Mapping):
+    """An ATS table as columns, usable as a read-only team -> AtsRecord mapping.
+
+    Only teams with a cover % are kept (a later duplicate replaces an
+    earlier one). Every column has one extra sentinel entry at the end - NaN
+    numbers, empty text - so the -1 that positions() gives for a missing team
+    indexes "no data" without any masking.
+    """
+
+    __slots__ = ('teams', '_index', 'cover_pct', 'cover_text', 'ats_pm', 'rank', 'wins', 'losses', 'pushes')
+
+    def __init__(self, teams, cover_pct, cover_text, ats_pm, rank=None, wins=None, losses=None, pushes=None):
+        count = len(teams)
+        self.teams = list(teams)
+        self._index = {team: i for i, team in enumerate(self.teams)}
+        self.cover_pct = np.append(np.asarray(cover_pct, dtype=float), np.nan)
+        self.cover_text = np.append(np.asarray(cover_text, dtype=object), '')
+        self.ats_pm = np.append(np.asarray(ats_pm, dtype=float), np.nan)
+        zeros = np.zeros(count, dtype=np.int32)
+        self.rank = np.append(np.asarray(rank if rank is not None else zeros, dtype=np.int32), 0)
+        self.wins = np.append(np.asarray(wins if wins is not None else zeros, dtype=np.int32), 0)
+        self.losses = np.append(np.asarray(losses if losses is not None else zeros, dtype=np.int32), 0)
+        self.pushes = np.append(np.asarray(pushes if pushes is not None else zeros, dtype=np.int32), 0)
+
+    @classmethod
+    def from_records(cls, records):
+        records = list({record.team: record for record in records}.values())
+        return cls([record.team for record in records], [record.cover_pct for record in records],
+                   [record.cover_text for record in records],
+                   [np.nan if record.ats_pm is None else record.ats_pm for record in records],
+                   [record.rank or 0 for record in records], [record.wins for record in records],
+                   [record.losses for record in records], [record.pushes for record in records])
+
+    @classmethod
+    def from_dict(cls, ats_dict):
+        """Table from a load_ats_data_from_text dict, or the table itself if given one"""
+        if isinstance(ats_dict, AtsTable):
+            return ats_dict
+        records = (AtsRecord.from_dict(team, record) for team, record in ats_dict.items())
+        return cls.from_records(record for record in records if record is not None)
+
+    @classmethod
+    def from_columns(cls, teams, cover_pct, ats_pm):
+        """Table from snapshot columns; cover_pct may be numbers (61.5) or strings ('61.5%')"""
+        teams = list(teams)
+        if np.asarray(cover_pct).dtype.kind in 'fiu':
+            cover_pct = np.asarray(cover_pct, dtype=float)
+            cover_text = [f"{pct:.1f}%" for pct in cover_pct]
+        else:
+            cover_text = ['' if not isinstance(cover, str) else cover for cover in cover_pct]
+            cover_pct = np.array([float(cover.replace('%', '')) if cover else np.nan for cover in cover_text])
+        keep = sorted({team: i for i, team in enumerate(teams) if not np.isnan(cover_pct[i])}.values())
+        ats_pm = np.asarray(ats_pm, dtype=float)
+        return cls([teams[i] for i in keep], cover_pct[keep], [cover_text[i] for i in keep], ats_pm[keep])
+
+    def positions(self, teams):
+        """Row of each team (None or unknown teams give -1, the sentinel row)"""
+        index = self._index
+        return np.array([index.get(team, -1) for team in teams], dtype=np.intp)
+
+    def __getitem__(self, team):
+        i = self._index[team]
+        ats_pm = self.ats_pm[i]
+        return AtsRecord(team, float(self.cover_pct[i]), self.cover_text[i],
+                         None if np.isnan(ats_pm) else float(ats_pm), int(self.rank[i]) or None,
+                         int(self.wins[i]), int(self.losses[i]), int(self.pushes[i]))
+
+    def __contains__(self, team):
+        return team in self._index
+
+    def __iter__(self):
+        return iter(self.teams)
+
+    def __len__(self):
+        return len(self.teams)
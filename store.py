@@ -0,0 +1,211 @@
+"""SQLite store for ATS snapshots, parsed games and chart rows shared by every worker"""
+import os
+import sqlite3
+import threading
+
+# SQLite file shared by every worker for ATS snapshots, games and charts - set NCAA_STORE_PATH='' to disable
+STORE_PATH = os.environ.get('NCAA_STORE_PATH', os.path.join('data', 'ncaa_ats.sqlite3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ats_snapshots (
+    snapshot_date TEXT NOT NULL,
+    team TEXT NOT NULL,
+    rank TEXT,
+    record TEXT,
+    cover_pct TEXT NOT NULL,
+    ats_pm REAL,
+    PRIMARY KEY (snapshot_date, team)
+);
+CREATE INDEX IF NOT EXISTS ats_snapshots_team ON ats_snapshots (team, snapshot_date);
+
+CREATE TABLE IF NOT EXISTS games (
+    slate_date TEXT NOT NULL,
+    away TEXT NOT NULL,
+    home TEXT NOT NULL,
+    game_time TEXT NOT NULL,
+    spread_team TEXT,
+    spread TEXT,
+    market TEXT,
+    PRIMARY KEY (slate_date, away, home, game_time)
+);
+CREATE INDEX IF NOT EXISTS games_away ON games (away, slate_date);
+CREATE INDEX IF NOT EXISTS games_home ON games (home, slate_date);
+
+CREATE TABLE IF NOT EXISTS chart_rows (
+    slate_date TEXT NOT NULL,
+    away TEXT NOT NULL,
+    home TEXT NOT NULL,
+    game_time TEXT NOT NULL,
+    market TEXT,
+    away_cover TEXT,
+    home_cover TEXT,
+    avg_conf TEXT,
+    ats_pm TEXT,
+    PRIMARY KEY (slate_date, away, home, game_time)
+);
+CREATE INDEX IF NOT EXISTS chart_rows_away ON chart_rows (away, slate_date);
+CREATE INDEX IF NOT EXISTS chart_rows_home ON chart_rows (home, slate_date);
+"""
+
+# chart_rows columns in CHART_COLUMNS order, for converting rows back to chart dicts
+CHART_ROW_FIELDS = [('Away', 'away'), ('Home', 'home'), ('Market', 'market'), ('A Cover %', 'away_cover'),
+                    ('H Cover %', 'home_cover'), ('Avg Conf', 'avg_conf'), ('ATS +/-', 'ats_pm'),
+                    ('Time', 'game_time')]
+
+
+def market_columns(market):
+    """(spread_team, spread, market) columns of a game's Market"""
+    if isinstance(market, dict):
+        return market['original_abbrev'], market['value'], market['display']
+    return None, None, market
+
+
+class ChartStore:
+    """ATS snapshots, games and chart rows keyed by date, in one SQLite file.
+
+    The database runs in WAL mode so gunicorn workers can read while another
+    writes. Each thread of each process gets its own connection (reopened
+    after a fork); writes replace a whole date's rows - or, in save_slate,
+    the rows that differ - in one transaction with executemany. Dates are
+    ISO 'YYYY-MM-DD' strings.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._schema_ready = False
+
+    def connection(self):
+        """This thread's connection, opened (and the schema created) on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if not self._schema_ready:
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def save_ats_snapshot(self, snapshot_date, ats_dict):
+        """Store a parsed TeamRankings table as the snapshot for snapshot_date, replacing any earlier one"""
+        rows = [(snapshot_date, team, record.get('rank'), record.get('record'), record['cover_pct'], record.get('ats_pm'))
+                for team, record in ats_dict.items()]
+        with self.connection() as conn:
+            conn.execute('DELETE FROM ats_snapshots WHERE snapshot_date = ?', (snapshot_date,))
+            conn.executemany('INSERT INTO ats_snapshots VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def ats_snapshot(self, snapshot_date):
+        """The ATS dict saved for snapshot_date, shaped like load_ats_data_from_text output"""
+        rows = self.connection().execute(
+            'SELECT team, rank, record, cover_pct, ats_pm FROM ats_snapshots WHERE snapshot_date = ? ORDER BY rowid',
+            (snapshot_date,))
+        return {row['team']: {'rank': row['rank'], 'record': row['record'], 'cover_pct': row['cover_pct'],
+                              'ats_pm': row['ats_pm']} for row in rows}
+
+    def latest_ats_snapshot(self, on_or_before=None):
+        """Return (snapshot_date, ats_dict) for the newest snapshot, optionally no later than a date, or None"""
+        if on_or_before is None:
+            row = self.connection().execute('SELECT MAX(snapshot_date) FROM ats_snapshots').fetchone()
+        else:
+            row = self.connection().execute('SELECT MAX(snapshot_date) FROM ats_snapshots WHERE snapshot_date <= ?',
+                                            (on_or_before,)).fetchone()
+        if row[0] is None:
+            return None
+        return row[0], self.ats_snapshot(row[0])
+
+    def team_ats_history(self, team):
+        """(snapshot_date, cover_pct, ats_pm) for one TeamRankings team, oldest first"""
+        rows = self.connection().execute(
+            'SELECT snapshot_date, cover_pct, ats_pm FROM ats_snapshots WHERE team = ? ORDER BY snapshot_date', (team,))
+        return [tuple(row) for row in rows]
+
+    def save_games(self, slate_date, games):
+        """Store the parsed games for slate_date, replacing that date's earlier games"""
+        rows = [(slate_date, game['Away'], game['Home'], game['Time'], *market_columns(game['Market'])) for game in games]
+        with self.connection() as conn:
+            conn.execute('DELETE FROM games WHERE slate_date = ?', (slate_date,))
+            conn.executemany('INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def save_chart(self, slate_date, chart_rows):
+        """Store the chart rows for slate_date, replacing that date's earlier chart"""
+        rows = [(slate_date, row['Away'], row['Home'], row['Time'], row['Market'], row['A Cover %'],
+                 row['H Cover %'], row['Avg Conf'], row['ATS +/-']) for row in chart_rows]
+        with self.connection() as conn:
+            conn.execute('DELETE FROM chart_rows WHERE slate_date = ?', (slate_date,))
+            conn.executemany('INSERT OR REPLACE INTO chart_rows (slate_date, away, home, game_time, market, away_cover, '
+                             'home_cover, avg_conf, ats_pm) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def save_slate(self, slate_date, games, chart_rows):
+        """Store the games and chart rows of slate_date together, replacing that date's earlier slate.
+
+        The saved slate is read inside the write transaction, so whichever
+        worker writes last wins whole. If it has the same games in the same
+        order, rows keep their place and only games and rows that differ from
+        it are rewritten; otherwise the date is replaced. Returns the number
+        of chart rows written.
+        """
+        game_rows = [(slate_date, game['Away'], game['Home'], game['Time'], *market_columns(game['Market']))
+                     for game in games]
+        chart_rows = [(slate_date, row['Away'], row['Home'], row['Time'], row['Market'], row['A Cover %'],
+                       row['H Cover %'], row['Avg Conf'], row['ATS +/-']) for row in chart_rows]
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')  # Holds the write lock from the read to the commit
+            saved_games = [tuple(row) for row in conn.execute(
+                'SELECT slate_date, away, home, game_time, spread_team, spread, market FROM games '
+                'WHERE slate_date = ? ORDER BY rowid', (slate_date,))]
+            saved_chart = [tuple(row) for row in conn.execute(
+                'SELECT slate_date, away, home, game_time, market, away_cover, home_cover, avg_conf, ats_pm '
+                'FROM chart_rows WHERE slate_date = ? ORDER BY rowid', (slate_date,))]
+            if ([row[:4] for row in saved_games] == [row[:4] for row in game_rows]
+                    and [row[:4] for row in saved_chart] == [row[:4] for row in chart_rows]):
+                game_rows = [row[4:] + row[:4] for row, saved in zip(game_rows, saved_games) if row != saved]
+                chart_rows = [row[4:] + row[:4] for row, saved in zip(chart_rows, saved_chart) if row != saved]
+                conn.executemany('UPDATE games SET spread_team = ?, spread = ?, market = ? '
+                                 'WHERE slate_date = ? AND away = ? AND home = ? AND game_time = ?', game_rows)
+                conn.executemany('UPDATE chart_rows SET market = ?, away_cover = ?, home_cover = ?, avg_conf = ?, '
+                                 'ats_pm = ? WHERE slate_date = ? AND away = ? AND home = ? AND game_time = ?',
+                                 chart_rows)
+            else:
+                conn.execute('DELETE FROM games WHERE slate_date = ?', (slate_date,))
+                conn.execute('DELETE FROM chart_rows WHERE slate_date = ?', (slate_date,))
+                conn.executemany('INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?)', game_rows)
+                conn.executemany('INSERT OR REPLACE INTO chart_rows (slate_date, away, home, game_time, market, '
+                                 'away_cover, home_cover, avg_conf, ats_pm) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                 chart_rows)
+        return len(chart_rows)
+
+    def chart(self, slate_date):
+        """Chart rows saved for slate_date, as create_daily_chart row dicts"""
+        columns = ', '.join(column for _, column in CHART_ROW_FIELDS)
+        rows = self.connection().execute(f'SELECT {columns} FROM chart_rows WHERE slate_date = ? ORDER BY rowid',
+                                         (slate_date,))
+        return [dict(zip((key for key, _ in CHART_ROW_FIELDS), row)) for row in rows]
+
+    def team_chart_rows(self, team, start_date=None, end_date=None):
+        """(slate_date, chart row) pairs for every game team played, home or away, oldest first"""
+        columns = ', '.join(column for _, column in CHART_ROW_FIELDS)
+        bounds = (start_date or '0000-00-00', end_date or '9999-99-99')
+        rows = self.connection().execute(
+            f'SELECT slate_date, {columns} FROM chart_rows WHERE away = ? AND slate_date BETWEEN ? AND ? '
+            f'UNION ALL SELECT slate_date, {columns} FROM chart_rows WHERE home = ? AND slate_date BETWEEN ? AND ? '
+            'ORDER BY slate_date', (team, *bounds, team, *bounds))
+        return [(row[0], dict(zip((key for key, _ in CHART_ROW_FIELDS), row[1:]))) for row in rows]
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
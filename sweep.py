@@ -0,0 +1,184 @@
+"""Grid search over Avg Conf thresholds and cover %/ATS +/- weightings.
+
+Each season (schedules, ATS snapshots, final scores - see backtest) is
+replayed once into flat matchup arrays. Every grid point then re-scores the
+games as
+
+    score = cover_weight * (away cover % - home cover %) + ats_weight * (away ATS +/- - home ATS +/-)
+
+picks the away team when score > 0 and the home team when it is < 0, and bets
+the games with min_conf <= |score| < max_conf. cover_weight 1, ats_weight 0 is
+the current chart, where 30 and 50 are the yellow and green cutoffs. Grid
+values are comma lists or start:stop:step ranges (stop excluded).
+
+    python -m sweep schedules.csv ats.csv scores.csv [more seasons...] \\
+        [--ats-weights 0:2.5:0.25] [--min-conf 0:60:2.5] [--max-conf 50,inf] [--top 20] [--csv out.csv]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from backtest import (ATS_COLUMNS, SCHEDULE_COLUMNS, SCORE_COLUMNS, WIN_PAYOUT,
+                      load_table, replay_season)
+
+MATCHUP_COLUMNS = ['away_pct', 'home_pct', 'away_ats_pm', 'home_ats_pm', 'away_spread']
+
+RANK_METRICS = ('roi', 'units', 'win_rate')
+
+
+def load_matchups(schedules_path, ats_path, scores_path, workers=1):
+    """Replay one season and return arrays for its games that have a line, ATS data and a score.
+
+    pct_diff and ats_pm_diff are away minus home; away_cover_margin is the
+    away team's final margin plus its line, so it is > 0 when the away side
+    covered.
+    """
+    schedules = load_table(schedules_path, SCHEDULE_COLUMNS)
+    snapshots = load_table(ats_path, ATS_COLUMNS)
+    scores = load_table(scores_path, SCORE_COLUMNS).drop_duplicates(['date', 'away', 'home'], keep='last')
+    games = replay_season(schedules, snapshots, workers, columns=MATCHUP_COLUMNS)
+    games = games.merge(scores[SCORE_COLUMNS], on=['date', 'away', 'home'], how='inner')
+
+    pct_diff = (games['away_pct'] - games['home_pct']).to_numpy()
+    ats_pm_diff = (games['away_ats_pm'] - games['home_ats_pm']).fillna(0.0).to_numpy()
+    away_cover_margin = (games['away_score'] - games['home_score'] + games['away_spread']).to_numpy(dtype=float)
+    valid = ~np.isnan(pct_diff) & ~np.isnan(away_cover_margin)
+    return {'pct_diff': pct_diff[valid], 'ats_pm_diff': ats_pm_diff[valid],
+            'away_cover_margin': away_cover_margin[valid]}
+
+
+def concat_matchups(seasons):
+    return {key: np.concatenate([season[key] for season in seasons]) for key in seasons[0]}
+
+
+def parse_grid_values(spec):
+    """Parse '1,2.5,inf' or 'start:stop:step' into a list of floats"""
+    if ':' in spec:
+        start, stop, step = (float(part) for part in spec.split(':'))
+        if step <= 0:
+            raise ValueError(f"step must be positive in {spec!r}")
+        return [float(value) for value in np.round(np.arange(start, stop, step), 10)]
+    return [float(part) for part in spec.split(',') if part.strip()]
+
+
+_matchups = None
+
+
+def _init_worker(matchups):
+    global _matchups
+    _matchups = matchups
+
+
+def evaluate_weighting(weights, bands, matchups=None):
+    """Count wins/losses/pushes for every (min_conf, max_conf) band at one weighting.
+
+    The games are sorted by confidence once, so each band is two binary
+    searches into cumulative win/loss counts.
+    """
+    matchups = matchups if matchups is not None else _matchups
+    cover_weight, ats_weight = weights
+    score = cover_weight * matchups['pct_diff'] + ats_weight * matchups['ats_pm_diff']
+    picked = score != 0
+    conf = np.abs(score[picked])
+    margin = np.where(score[picked] > 0, matchups['away_cover_margin'][picked], -matchups['away_cover_margin'][picked])
+    order = np.argsort(conf, kind='stable')
+    conf, margin = conf[order], margin[order]
+    wins_before = np.concatenate([[0], np.cumsum(margin > 0)])
+    losses_before = np.concatenate([[0], np.cumsum(margin < 0)])
+
+    low = np.searchsorted(conf, bands[:, 0], side='left')
+    high = np.searchsorted(conf, bands[:, 1], side='left')
+    high = np.maximum(high, low)
+    bets = high - low
+    wins = wins_before[high] - wins_before[low]
+    losses = losses_before[high] - losses_before[low]
+    return np.column_stack([bets, wins, losses, bets - wins - losses])
+
+
+def run_sweep(matchups, cover_weights, ats_weights, min_confs, max_confs, workers=None):
+    """Evaluate the whole grid and return one row per point.
+
+    Weightings are spread over a process pool; each worker receives the
+    matchup arrays once, through the pool initializer.
+    """
+    bands = np.array([(low, high) for low, high in product(min_confs, max_confs) if low < high], dtype=float)
+    weightings = list(product(cover_weights, ats_weights))
+    if not len(bands) or not weightings:
+        raise ValueError('the grid is empty - every min_conf must be below some max_conf')
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(weightings) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(matchups,)) as executor:
+            counts = list(executor.map(evaluate_weighting, weightings, [bands] * len(weightings),
+                                       chunksize=max(1, len(weightings) // (workers * 4))))
+    else:
+        counts = [evaluate_weighting(weights, bands, matchups) for weights in weightings]
+
+    results = pd.DataFrame({
+        'cover_weight': np.repeat([w[0] for w in weightings], len(bands)),
+        'ats_weight': np.repeat([w[1] for w in weightings], len(bands)),
+        'min_conf': np.tile(bands[:, 0], len(weightings)),
+        'max_conf': np.tile(bands[:, 1], len(weightings)),
+    })
+    results[['bets', 'wins', 'losses', 'pushes']] = np.vstack(counts)
+    decided = results['wins'] + results['losses']
+    results['win_rate'] = (results['wins'] / decided).where(decided > 0)
+    results['units'] = results['wins'] * WIN_PAYOUT - results['losses']
+    results['roi'] = (results['units'] / results['bets']).where(results['bets'] > 0)
+    return results
+
+
+def rank_results(results, metric='roi', min_bets=50):
+    """Grid points with at least min_bets bets, best first"""
+    eligible = results[results['bets'] >= min_bets]
+    return eligible.sort_values([metric, 'bets'], ascending=False, na_position='last').reset_index(drop=True)
+
+
+def format_results(rows):
+    table = rows.assign(win_rate=rows['win_rate'].map('{:.1%}'.format), roi=rows['roi'].map('{:+.1%}'.format),
+                        units=rows['units'].map('{:+.2f}'.format))
+    return table.to_string(index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='+', help='schedules, ATS snapshots and scores files, three per season')
+    parser.add_argument('--cover-weights', default='1')
+    parser.add_argument('--ats-weights', default='0:2.5:0.25')
+    parser.add_argument('--min-conf', default='0:60:2.5')
+    parser.add_argument('--max-conf', default='40,50,60,inf')
+    parser.add_argument('--rank-by', choices=RANK_METRICS, default='roi')
+    parser.add_argument('--min-bets', type=int, default=50, help='ignore grid points with fewer bets')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None, help='processes for the grid (default: CPU count)')
+    parser.add_argument('--csv', help='also write every grid point to this CSV file')
+    args = parser.parse_args(argv)
+    if len(args.files) % 3:
+        parser.error('files must come in threes: schedules, ATS snapshots, scores')
+
+    try:
+        grid = [parse_grid_values(spec) for spec in (args.cover_weights, args.ats_weights, args.min_conf, args.max_conf)]
+        seasons = [load_matchups(*args.files[i:i + 3]) for i in range(0, len(args.files), 3)]
+        matchups = concat_matchups(seasons)
+        results = run_sweep(matchups, *grid, workers=args.workers)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    baseline = run_sweep(matchups, [1.0], [0.0], [0.0, 30.0, 50.0], [np.inf], workers=1)
+    print(f"{len(matchups['pct_diff'])} gradable games, {len(results)} grid points")
+    print("\nCurrent chart (cover % only):")
+    print(format_results(baseline))
+    print(f"\nTop {args.top} by {args.rank_by} (at least {args.min_bets} bets):")
+    print(format_results(rank_results(results, args.rank_by, args.min_bets).head(args.top)))
+    if args.csv:
+        results.to_csv(args.csv, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
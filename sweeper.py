@@ -0,0 +1,163 @@
+"""Background cleanup of generated artifacts using an in-memory expiry index"""
+import heapq
+import logging
+import os
+import threading
+import time
+
+
+class ArtifactSweeper:
+    """Delete old files from a directory without scanning it on the request path.
+
+    Files are registered with track() as they are created or reused. A heap
+    ordered by registration time lets the background thread pop expired
+    files directly, and a running byte total enforces max_total_bytes by
+    deleting the oldest files first. Before every sweep the directory is
+    re-listed, so files written by other workers (or earlier processes) are
+    tracked and files deleted elsewhere are dropped: every worker's byte
+    total covers the whole directory, not just its own files.
+
+    The thread is started by ensure_started() and restarted after a fork,
+    so it works with gunicorn's --preload as well as the dev server.
+    """
+
+    def __init__(self, directory, max_age_seconds=24 * 3600, max_total_bytes=512 * 1024 * 1024,
+                 interval_seconds=300, suffix='.xlsx', logger=None):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self.interval_seconds = interval_seconds
+        self.suffix = suffix
+        self.logger = logger or logging.getLogger(__name__)
+        self.swept_files = 0
+        self.swept_bytes = 0
+        self.total_bytes = 0
+        self._heap = []
+        self._files = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def track(self, path, created_at=None, size=None):
+        """Register a created (or reused) file; a newer timestamp supersedes older entries"""
+        path = os.path.abspath(path)
+        if created_at is None:
+            created_at = time.time()
+        if size is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return
+        with self._lock:
+            self._register(path, created_at, size)
+            over_budget = self.total_bytes > self.max_total_bytes
+        if over_budget:
+            self._wake.set()
+
+    def _register(self, path, created_at, size):
+        """Record a file in the index (caller holds self._lock)"""
+        previous = self._files.get(path)
+        if previous is not None:
+            self.total_bytes -= previous[1]
+        self._files[path] = (created_at, size)
+        self.total_bytes += size
+        heapq.heappush(self._heap, (created_at, path))
+
+    def sweep(self, now=None):
+        """Delete expired files and trim to max_total_bytes; returns (files, bytes) removed"""
+        if now is None:
+            now = time.time()
+        cutoff = now - self.max_age_seconds
+        removed_files = removed_bytes = 0
+        while True:
+            with self._lock:
+                if not self._heap:
+                    break
+                created_at, path = self._heap[0]
+                current = self._files.get(path)
+                if current is None or current[0] != created_at:
+                    heapq.heappop(self._heap)  # Superseded by a later track() of the same file
+                    continue
+                if created_at > cutoff and self.total_bytes <= self.max_total_bytes:
+                    break
+                heapq.heappop(self._heap)
+                del self._files[path]
+                self.total_bytes -= current[1]
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue  # Already removed, e.g. by another worker's sweeper
+            except OSError as e:
+                self.logger.error(f"Sweeper could not delete {path}: {e}")
+                continue
+            removed_files += 1
+            removed_bytes += current[1]
+
+        if removed_files:
+            with self._lock:
+                self.swept_files += removed_files
+                self.swept_bytes += removed_bytes
+            self.logger.info(f"Cleanup: deleted {removed_files} old file(s), {removed_bytes:,} bytes "
+                             f"(total swept: {self.swept_files} files, {self.swept_bytes:,} bytes)")
+        return removed_files, removed_bytes
+
+    def stats(self):
+        """Counters for logging and metrics"""
+        with self._lock:
+            return {'tracked_files': len(self._files), 'tracked_bytes': self.total_bytes,
+                    'swept_files': self.swept_files, 'swept_bytes': self.swept_bytes}
+
+    def ensure_started(self):
+        """Start the background thread in this process if it isn't running yet"""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='artifact-sweeper', daemon=True)
+            self._thread.start()
+
+    def rescan(self):
+        """Sync the tracked files with the directory: add untracked or newer files, drop vanished ones.
+
+        Files tracked since the listing began are left alone, so a workbook
+        written (or reused) while the directory is being read keeps its entry.
+        """
+        scan_started = time.time()
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            entries = []
+        except OSError as e:
+            self.logger.error(f"Sweeper could not list {self.directory}: {e}")
+            return
+        on_disk = {}
+        for entry in entries:
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            on_disk[os.path.abspath(entry.path)] = (stat.st_mtime, stat.st_size)
+        with self._lock:
+            for path, (created_at, size) in list(self._files.items()):
+                if path not in on_disk and created_at < scan_started:
+                    del self._files[path]  # Its heap entry is skipped as superseded
+                    self.total_bytes -= size
+            for path, (mtime, size) in on_disk.items():
+                current = self._files.get(path)
+                if current is None or (current[0] < scan_started and (current[0] < mtime or current[1] != size)):
+                    self._register(path, mtime, size)
+
+    def _run(self):
+        while True:
+            try:
+                self.rescan()
+                self.sweep()
+            except Exception as e:
+                self.logger.error(f"Error during file cleanup: {e}")
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
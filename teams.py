@@ -0,0 +1,209 @@
+"""Team name mapping and spread abbreviation tables, loaded lazily from teams.json
+
+    python -m teams [teams.json]    check a teams file and list ambiguous spread abbreviations
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+# ESPN -> TeamRankings names and ESPN spread abbreviations - set NCAA_TEAMS_FILE to use another file
+TEAMS_FILE = os.environ.get('NCAA_TEAMS_FILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'teams.json')
+
+# Seconds between checks of the file for changes (0 turns hot reload off)
+TEAMS_RELOAD_INTERVAL = float(os.environ.get('NCAA_TEAMS_RELOAD_INTERVAL', 5))
+
+
+def fallback_abbreviation(team_name):
+    """Abbreviation for a team missing from the abbreviations table, built from its name"""
+    words = team_name.replace('University of ', '').replace('College of ', '').split()
+    if len(words) == 1:
+        return words[0][:4].upper()
+    if len(words) <= 3:
+        return ''.join(w[0] for w in words).upper()
+    return words[0][:4].upper()
+
+
+class TeamTables:
+    """One immutable load of the teams file.
+
+    name_mapping is ESPN name -> TeamRankings name and abbreviations the
+    explicit ESPN abbreviation table, both in file order. team_abbreviations
+    holds the abbreviation of every known ESPN name (explicit or fallback),
+    and abbreviation_teams is its reverse: upper-cased abbreviation -> the
+    ESPN names that use it, in file order.
+    """
+
+    __slots__ = ('path', 'stamp', 'name_mapping', 'abbreviations', 'team_abbreviations', 'abbreviation_teams',
+                 'abbreviation_keys', 'abbreviation_ids', 'abbreviation_conflicts')
+
+    def __init__(self, name_mapping, abbreviations, path=None, stamp=None):
+        self.path = path
+        self.stamp = stamp
+        self.name_mapping = MappingProxyType(dict(name_mapping))
+        self.abbreviations = MappingProxyType(dict(abbreviations))
+        team_abbreviations = {name: fallback_abbreviation(name) for name in self.name_mapping}
+        team_abbreviations.update(self.abbreviations)
+        self.team_abbreviations = MappingProxyType(team_abbreviations)
+        abbreviation_teams = {}
+        for name, abbrev in team_abbreviations.items():
+            abbreviation_teams.setdefault(abbrev.upper(), []).append(name)
+        self.abbreviation_teams = MappingProxyType({abbrev: tuple(names) for abbrev, names in abbreviation_teams.items()})
+        self.abbreviation_keys = MappingProxyType({name: abbrev.upper() for name, abbrev in team_abbreviations.items()})
+
+        # Spread side index: abbreviation -> every name (ESPN and TeamRankings) of the teams using it.
+        # Names sharing an abbreviation are one team unless the mapping sends them to different
+        # TeamRankings teams; those abbreviations are ambiguous and left out of the index.
+        abbreviation_ids = {}
+        abbreviation_conflicts = {}
+        for abbrev, names in self.abbreviation_teams.items():
+            tr_names = {self.name_mapping[name] for name in names if name in self.name_mapping}
+            if len(tr_names) > 1:
+                abbreviation_conflicts[abbrev] = names
+            else:
+                abbreviation_ids[abbrev] = frozenset(names) | tr_names
+        self.abbreviation_ids = MappingProxyType(abbreviation_ids)
+        self.abbreviation_conflicts = MappingProxyType(abbreviation_conflicts)
+
+    @classmethod
+    def from_file(cls, path):
+        """Read and validate a teams file; raises OSError or ValueError"""
+        stamp = file_stamp(path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        tables = {}
+        for key in ('team_name_mapping', 'abbreviations'):
+            table = data.get(key) if isinstance(data, dict) else None
+            if not isinstance(table, dict) or not all(isinstance(name, str) and isinstance(value, str) and value
+                                                      for name, value in table.items()):
+                raise ValueError(f'{path}: "{key}" must be an object of non-empty strings')
+            tables[key] = table
+        return cls(tables['team_name_mapping'], tables['abbreviations'], path, stamp)
+
+    def abbreviation(self, team_name):
+        abbrev = self.team_abbreviations.get(team_name)
+        return abbrev if abbrev is not None else fallback_abbreviation(team_name)
+
+    def teams_for_abbreviation(self, abbrev):
+        """ESPN names whose spread abbreviation is abbrev (case-insensitive), or ()"""
+        return self.abbreviation_teams.get(abbrev.upper(), ())
+
+    def spread_side(self, abbrev, away_team, home_team):
+        """Which team an ESPN spread abbreviation refers to: 'away', 'home', or None if it can't be told.
+
+        An abbreviation equal to exactly one team's is that team. Otherwise a
+        known, unambiguous abbreviation matches the team it indexes under any
+        of its names. Only abbreviations missing from the tables fall back to
+        a prefix match ('DU' for 'DUKE'), and then only when just one side
+        matches - so UNC vs UNCW or MSU vs MSST can't pick the wrong side.
+        """
+        key = abbrev.upper()
+        away_key = self.abbreviation_keys.get(away_team) or fallback_abbreviation(away_team).upper()
+        home_key = self.abbreviation_keys.get(home_team) or fallback_abbreviation(home_team).upper()
+        if key == away_key:
+            return 'away' if key != home_key else None
+        if key == home_key:
+            return 'home'
+
+        ids = self.abbreviation_ids.get(key)
+        if ids is not None:
+            away_match = away_team in ids or self.name_mapping.get(away_team) in ids
+            home_match = home_team in ids or self.name_mapping.get(home_team) in ids
+        elif key in self.abbreviation_conflicts:
+            return None
+        else:
+            away_match = away_key.startswith(key) or key.startswith(away_key)
+            home_match = home_key.startswith(key) or key.startswith(home_key)
+        if away_match != home_match:
+            return 'away' if away_match else 'home'
+        return None
+
+    def conflict_report(self):
+        """Lines describing each abbreviation shared by different teams, for logs and the CLI"""
+        return [f"{abbrev}: {', '.join(f'{name} ({self.name_mapping[name]})' if name in self.name_mapping else name for name in names)}"
+                for abbrev, names in sorted(self.abbreviation_conflicts.items())]
+
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TeamTablesLoader:
+    """Loads TeamTables on first use and swaps in a fresh copy when the file changes.
+
+    At most once every reload_interval seconds, get() compares the file's
+    mtime and size with the loaded copy. A changed file is re-read in the
+    calling thread; if it can't be read or parsed the error is logged and
+    the previous tables stay in use. Each TeamTables is immutable, so code
+    holding one keeps a consistent view across a reload.
+    """
+
+    def __init__(self, path, reload_interval=TEAMS_RELOAD_INTERVAL, logger=None):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._tables = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        tables = self._tables
+        if tables is not None and (self.reload_interval <= 0 or time.monotonic() < self._next_check):
+            return tables
+        with self._lock:
+            if self._tables is None or (self.reload_interval > 0 and time.monotonic() >= self._next_check):
+                self._refresh()
+            return self._tables
+
+    def reload(self):
+        """Re-read the file now, whether or not it looks changed"""
+        with self._lock:
+            self._refresh(force=True)
+        return self._tables
+
+    def _refresh(self, force=False):
+        self._next_check = time.monotonic() + self.reload_interval
+        try:
+            if not force and self._tables is not None and file_stamp(self.path) == self._tables.stamp:
+                return
+            tables = TeamTables.from_file(self.path)
+        except (OSError, ValueError) as e:
+            if self._tables is None:
+                raise
+            self.logger.error(f"Team tables reload failed, keeping the loaded copy: {e}")
+            return
+        if self._tables is not None:
+            self.logger.info(f"Team tables reloaded from {self.path} - {len(tables.name_mapping)} names, "
+                             f"{len(tables.abbreviations)} abbreviations")
+        if tables.abbreviation_conflicts:
+            self.logger.warning(f"{len(tables.abbreviation_conflicts)} spread abbreviations in {self.path} are shared "
+                                f"by different teams and only resolve by exact match: "
+                                f"{'; '.join(tables.conflict_report())}")
+        self._tables = tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', default=TEAMS_FILE, help='teams file to check (default: %(default)s)')
+    args = parser.parse_args(argv)
+    try:
+        tables = TeamTables.from_file(args.path)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"{args.path}: {len(tables.name_mapping)} names, {len(tables.abbreviations)} abbreviations, "
+          f"{len(tables.abbreviation_ids)} unambiguous spread abbreviations")
+    report = tables.conflict_report()
+    if report:
+        print(f"{len(report)} abbreviations shared by different teams (resolved by exact match only):")
+        print('\n'.join(f"  {line}" for line in report))
+    return 1 if report else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the app modules from the repository root and keep its stores off disk
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('NCAA_STORE_PATH', '')
+os.environ.setdefault('NCAA_LINE_HISTORY_PATH', '')
@@ -0,0 +1,67 @@
+"""The JSON chart endpoint returns the rows the page would show, or the workbook on request"""
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+import app
+from cache import LRUCache
+from store import ChartStore
+
+ATS_TABLE = '\n'.join(['Rank\tTeam\tATS Record\tCover %\tATS +/-',
+                       '1\tDuke\t14-4-2\t77.8%\t+4.0',
+                       '2\tNorth Carolina\t10-9\t52.6%\t+0.5'])
+SCHEDULE = '\n'.join(['Saturday, February 7, 2026', '', '12:00 PM', 'ESPN', 'Duke', '(15-8)', 'North Carolina',
+                      '(12-11)', 'Spread:UNC -3.5', 'O/U:141.5', 'Gamecast', '2:00 PM', 'ESPN', 'Kansas', '(1-1)',
+                      'Baylor', '(1-1)', 'Spread:BAY -1.5', 'O/U:141.5', 'Gamecast'])
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    monkeypatch.setattr(app, 'XLSX_STORE', LRUCache('xlsx', max_bytes=1 << 20))
+    return app.app.test_client()
+
+
+def test_json_rows_match_the_chart(client):
+    response = client.post('/api/chart', json={'espn_schedule': SCHEDULE, 'teamrankings_ats': ATS_TABLE})
+    assert response.status_code == 200
+    body = response.get_json()
+    games = list(app.iter_espn_schedule(SCHEDULE))
+    expected, _ = app.create_daily_chart(games, app.load_ats_data_from_text(ATS_TABLE), app.TEAM_NAME_MAPPING)
+    assert body['chart_rows'] == expected
+    assert (body['games'], body['teams'], body['ats_snapshot_date']) == (2, 2, None)
+    assert body['unmapped_teams'] == ['Baylor', 'Kansas']
+    assert body['chart_rows'][0]['Market'] == 'DUKE +3.5'
+
+
+def test_form_posts_can_ask_for_the_workbook(client):
+    response = client.post('/api/chart', data={'espn_file': (io.BytesIO(SCHEDULE.encode()), 'espn.txt'),
+                                               'teamrankings_ats': ATS_TABLE, 'format': 'xlsx'})
+    assert response.status_code == 200
+    assert load_workbook(io.BytesIO(response.data)).active['C2'].value == 'DUKE +3.5'
+    assert app.XLSX_STORE.stats()['size'] == 1
+
+
+def test_stored_snapshot_stands_in_for_a_missing_table(client, tmp_path, monkeypatch):
+    store = ChartStore(str(tmp_path / 'store.sqlite3'))
+    store.save_ats_snapshot('2026-02-06', app.load_ats_data_from_text(ATS_TABLE))
+    monkeypatch.setattr(app, 'CHART_STORE', store)
+    body = client.post('/api/chart', json={'espn_schedule': SCHEDULE}).get_json()
+    assert body['ats_snapshot_date'] == '2026-02-06' and body['teams'] == 2
+
+
+@pytest.mark.parametrize('body, status', [
+    ([], 400),
+    ({'espn_schedule': SCHEDULE}, 400),
+    ({'espn_schedule': 1, 'teamrankings_ats': ATS_TABLE}, 400),
+    ({'espn_schedule': SCHEDULE, 'teamrankings_ats': ATS_TABLE, 'format': 'csv'}, 400),
+    ({'espn_schedule': 'no games', 'teamrankings_ats': ATS_TABLE}, 422),
+    ({'espn_schedule': SCHEDULE, 'teamrankings_ats': 'no teams'}, 422),
+    ({'espn_schedule': 'x' * (app.MAX_INPUT_SIZE + 1), 'teamrankings_ats': ATS_TABLE}, 413),
+])
+def test_bad_requests_get_json_errors(client, body, status):
+    response = client.post('/api/chart', json=body)
+    assert response.status_code == status
+    assert 'error' in response.get_json()
@@ -0,0 +1,119 @@
+"""The ASGI front end serves the Flask routes, buffers bodies on the event loop and caps their size"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import asgi
+
+FORM = (b'content-type', b'application/x-www-form-urlencoded')
+CHUNKED = (b'transfer-encoding', b'chunked')
+
+
+def http_scope(method, path, headers=()):
+    return {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), *headers], 'client': ('127.0.0.1', 5000),
+            'server': ('testserver', 80)}
+
+
+def body_messages(body, chunk_size=1024):
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b'']
+    return [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+            for i, chunk in enumerate(chunks)]
+
+
+async def serve(scope, messages):
+    """Run one request through asgi.application; messages is a list or a receive() coroutine function"""
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    await asyncio.wait_for(asgi.application(scope, messages if callable(messages) else receive, send), 10)
+    return sent
+
+
+def response(sent):
+    status = next(message['status'] for message in sent if message['type'] == 'http.response.start')
+    return status, b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+
+
+def call(method, path, body=b'', headers=()):
+    """(status, body) of a request whose body arrives in 1KB chunks"""
+    return response(asyncio.run(serve(http_scope(method, path, headers), body_messages(body))))
+
+
+def test_serves_flask_routes():
+    status, body = call('GET', '/api/chart')
+    assert status == 405
+    status, body = call('POST', '/api/chart', b'format=csv&espn_schedule=x', headers=[FORM])
+    assert status == 400
+    assert b'format must be one of' in body
+
+
+def test_chunked_uploads_reach_the_app_whole():
+    status, body = call('POST', '/api/chart', b'format=csv&espn_schedule=' + b'x' * 3000, headers=[FORM, CHUNKED])
+    assert status == 400
+    assert b'format must be one of' in body
+
+
+def test_large_responses_are_sent_in_chunks(monkeypatch):
+    monkeypatch.setattr(asgi, 'ASGI_SEND_CHUNK', 1024)
+    sent = asyncio.run(serve(http_scope('GET', '/'), body_messages(b'')))
+    bodies = [message for message in sent if message['type'] == 'http.response.body']
+    assert len(bodies) > 1
+    assert [message['more_body'] for message in bodies] == [True] * (len(bodies) - 1) + [False]
+    assert b'</html>' in response(sent)[1]
+
+
+def test_declared_body_over_the_limit_is_refused(monkeypatch):
+    monkeypatch.setattr(asgi, 'ASGI_MAX_BODY_BYTES', 4096)
+    status, _ = call('POST', '/api/chart', b'espn_schedule=' + b'x' * 8192, headers=[FORM, (b'content-length', b'8206')])
+    assert status == 413
+
+
+def test_endless_chunked_body_is_read_only_up_to_the_limit(monkeypatch):
+    monkeypatch.setattr(asgi, 'ASGI_MAX_BODY_BYTES', 4096)
+    received = []
+
+    async def receive():
+        received.append(1024)
+        return {'type': 'http.request', 'body': b'x' * 1024, 'more_body': True}
+
+    assert response(asyncio.run(serve(http_scope('POST', '/api/chart', [FORM, CHUNKED]), receive)))[0] == 413
+    assert sum(received) <= 4096 + 1024
+
+
+def test_disconnect_before_the_body_ends_the_request():
+    sent = asyncio.run(serve(http_scope('POST', '/api/chart', [FORM, (b'content-length', b'1000')]),
+                             [{'type': 'http.request', 'body': b'espn_schedule=x', 'more_body': True},
+                              {'type': 'http.disconnect'}]))
+    assert sent == []
+
+
+def test_slow_upload_does_not_hold_a_thread(monkeypatch):
+    monkeypatch.setattr(asgi, '_executor', ThreadPoolExecutor(max_workers=1))
+
+    async def main():
+        release = asyncio.Event()
+        messages = body_messages(b'format=csv&espn_schedule=x', chunk_size=4)
+
+        async def trickle():
+            if len(messages) == 1:
+                await release.wait()
+            return messages.pop(0)
+
+        slow = asyncio.create_task(serve(http_scope('POST', '/api/chart', [FORM, (b'content-length', b'26')]), trickle))
+        await asyncio.sleep(0.05)
+        fast = await serve(http_scope('POST', '/api/chart', [FORM]), body_messages(b'format=csv&espn_schedule=x'))
+        assert not slow.done()
+        release.set()
+        return fast, await slow
+
+    fast, slow = asyncio.run(main())
+    assert response(fast) == response(slow)
+    assert response(fast)[0] == 400 and b'format must be one of' in response(fast)[1]
@@ -0,0 +1,65 @@
+"""The backtest charts each game against its as-of ATS snapshot and grades the pick against the spread"""
+import json
+
+import pandas as pd
+import pytest
+
+import backtest
+
+SCHEDULES = pd.DataFrame([
+    ('2025-12-31', 'Duke', 'Kansas', 'KU', -3.5),      # Before the first snapshot - no pick
+    ('2026-01-02', 'Duke', 'Kansas', 'KU', -3.5),      # Duke 60% vs 40%: Duke +3.5, loses by 2 - win
+    ('2026-01-05', 'Baylor', 'UConn', 'CONN', -10),    # UConn 80% vs 45%: UConn -10, wins by 8 - loss
+    ('2026-01-11', 'Kansas', 'Duke', 'DUKE', -4),      # Kansas 85% vs 30%: Kansas +4, loses by 4 - push
+    ('2026-01-12', 'Baylor', 'Kansas', None, None),    # No line - not bet
+], columns=backtest.SCHEDULE_COLUMNS)
+SNAPSHOTS = pd.DataFrame([
+    ('2026-01-01', 'Duke', 60.0, 2.0), ('2026-01-01', 'Kansas', 40.0, -1.0),
+    ('2026-01-01', 'Baylor', 45.0, 0.5), ('2026-01-01', 'UConn', 80.0, 3.0),
+    ('2026-01-10', 'Duke', 30.0, -2.0), ('2026-01-10', 'Kansas', 85.0, 4.0), ('2026-01-10', 'Baylor', 45.0, 0.5),
+], columns=backtest.ATS_COLUMNS)
+SCORES = pd.DataFrame([
+    ('2025-12-31', 'Duke', 'Kansas', 80, 60), ('2026-01-02', 'Duke', 'Kansas', 70, 72),
+    ('2026-01-05', 'Baylor', 'UConn', 60, 68), ('2026-01-11', 'Kansas', 'Duke', 66, 70),
+    ('2026-01-12', 'Baylor', 'Kansas', 50, 90),
+], columns=backtest.SCORE_COLUMNS)
+
+
+@pytest.fixture
+def season_files(tmp_path):
+    paths = []
+    for name, table in (('schedules', SCHEDULES), ('ats', SNAPSHOTS), ('scores', SCORES)):
+        paths.append(str(tmp_path / f'{name}.csv'))
+        table.to_csv(paths[-1], index=False)
+    return paths
+
+
+def test_picks_are_graded_against_the_spread(season_files):
+    schedules, snapshots, scores = (backtest.load_table(path, columns) for path, columns in zip(
+        season_files, (backtest.SCHEDULE_COLUMNS, backtest.ATS_COLUMNS, backtest.SCORE_COLUMNS)))
+    graded = backtest.grade_picks(backtest.replay_season(schedules, snapshots), scores)
+    assert graded['play_side'].tolist() == ['', 'away', 'home', 'away', 'home']
+    assert graded['play_spread'].tolist()[1:4] == [3.5, -10.0, 4.0]
+    assert graded['result'].tolist() == ['', 'win', 'loss', 'push', '']
+
+
+def test_report_splits_by_avg_conf_bucket(season_files):
+    report = backtest.run_backtest(*season_files)
+    assert report['games'] == 5
+    assert report['overall'] == {'bets': 3, 'wins': 1, 'losses': 1, 'pushes': 1, 'win_rate': 0.5,
+                                 'units': -0.09, 'roi': -0.0303}
+    assert [bucket['bets'] for bucket in report['buckets'].values()] == [1, 1, 1]
+    assert [bucket['wins'] for bucket in report['buckets'].values()] == [1, 0, 0]
+    assert report == backtest.run_backtest(*season_files, workers=2)
+
+
+def test_cli_prints_the_report(season_files, capsys):
+    assert backtest.main([*season_files, '--json']) == 0
+    assert json.loads(capsys.readouterr().out) == backtest.run_backtest(*season_files)
+
+
+def test_missing_columns_are_reported(tmp_path):
+    path = tmp_path / 'scores.csv'
+    SCORES.drop(columns='home_score').to_csv(path, index=False)
+    with pytest.raises(ValueError, match='home_score'):
+        backtest.load_table(str(path), backtest.SCORE_COLUMNS)
@@ -0,0 +1,82 @@
+"""The batch endpoint builds every slate in spawned worker processes, as the single-slate form would"""
+import io
+import json
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+
+import app
+
+ATS_TABLE = '\n'.join(['Rank\tTeam\tATS Record\tCover %\tATS +/-',
+                       '1\tDuke\t14-4-2\t77.8%\t+4.0',
+                       '2\tNorth Carolina\t10-9\t52.6%\t+0.5',
+                       '3\tKansas\t9-10\t47.4%\t-0.5',
+                       '4\tBaylor\t8-12\t40.0%\t-1.5'])
+
+
+def schedule(*games):
+    lines = ['Saturday, February 7, 2026', '']
+    for game_time, away, home, spread in games:
+        lines += [game_time, 'ESPN', away, '(15-8)', home, '(12-11)', f'Spread:{spread}', 'O/U:141.5', 'Gamecast']
+    return '\n'.join(lines)
+
+
+SLATES = [
+    {'name': 'Early', 'espn_schedule': schedule(('12:00 PM', 'Duke', 'North Carolina', 'DUKE -3.5'))},
+    {'name': 'Late', 'espn_schedule': schedule(('7:00 PM', 'Kansas', 'Baylor', 'BAY -1.5'),
+                                               ('9:00 PM', 'Baylor', 'Duke', 'DUKE -6.5'))},
+    {'name': 'Early', 'espn_schedule': 'nothing to see here'},
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    monkeypatch.setattr(app, 'BATCH_MAX_WORKERS', 2)
+    yield app.app.test_client()
+    app.reset_batch_executor()
+
+
+def single_slate_rows(espn_schedule):
+    games = list(app.iter_espn_schedule(espn_schedule))
+    return app.create_daily_chart(games, app.load_ats_data_from_text(ATS_TABLE), app.TEAM_NAME_MAPPING)[0]
+
+
+def test_zip_holds_a_workbook_per_slate_built_by_spawned_workers(client):
+    response = client.post('/api/charts/batch', json={'slates': SLATES, 'teamrankings_ats': ATS_TABLE})
+    assert response.status_code == 200
+    assert app._batch_executor is not None and app._batch_executor._mp_context.get_start_method() == 'spawn'
+
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    assert sorted(archive.namelist()) == ['Early.xlsx', 'Late.xlsx', 'summary.json']
+    summary = json.loads(archive.read('summary.json'))
+    assert [(slate['name'], slate['games'], slate['error']) for slate in summary] == [
+        ('Early', 1, None), ('Late', 2, None), ('Early (2)', 0, 'could not parse any games from the ESPN schedule')]
+    assert [timing['name'] for timing in json.loads(response.headers['X-Slate-Timings'])] == ['Early', 'Late',
+                                                                                            'Early (2)']
+
+    sheet = load_workbook(io.BytesIO(archive.read('Late.xlsx'))).active
+    expected = single_slate_rows(SLATES[1]['espn_schedule'])
+    assert [list(row) for row in sheet.iter_rows(min_row=2, values_only=True)] == [
+        [row[column] for column in app.CHART_COLUMNS] for row in expected]
+
+
+def test_xlsx_format_puts_each_slate_on_its_own_sheet(client):
+    response = client.post('/api/charts/batch', data={
+        'espn_schedule': [SLATES[0]['espn_schedule'], SLATES[1]['espn_schedule']], 'name': ['Early', 'Late'],
+        'teamrankings_ats': ATS_TABLE, 'format': 'xlsx'})
+    assert response.status_code == 200
+    assert load_workbook(io.BytesIO(response.data)).sheetnames == ['Early', 'Late']
+
+
+@pytest.mark.parametrize('body, status', [
+    ({'slates': 'nope'}, 400),
+    ({'slates': [{'espn_schedule': 'x'}]}, 400),
+    ({'slates': [SLATES[0]] * (app.BATCH_MAX_SLATES + 1), 'teamrankings_ats': ATS_TABLE}, 400),
+    ({'slates': [SLATES[0]], 'teamrankings_ats': ATS_TABLE, 'format': 'csv'}, 400),
+    ({'slates': [SLATES[2]], 'teamrankings_ats': ATS_TABLE}, 422),
+])
+def test_bad_batches_are_refused(client, body, status):
+    assert client.post('/api/charts/batch', json=body).status_code == status
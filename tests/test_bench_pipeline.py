@@ -0,0 +1,41 @@
+"""The benchmark corpora parse as real pastes would, and the pipeline benchmark runs and flags regressions"""
+import json
+import re
+
+from app import derive_abbreviation, iter_ats_records, iter_espn_schedule
+from benchmarks import bench_pipeline
+from benchmarks.corpus import espn_desktop_schedule, espn_mobile_schedule, matchups, teamrankings_ats_table
+
+
+def test_both_schedule_layouts_parse_to_the_same_games():
+    expected = [(game_time, away, home) for game_time, away, home, _, _ in matchups(50, seed=3)]
+    for text in (espn_desktop_schedule(50, seed=3), espn_mobile_schedule(50, seed=3)):
+        games = list(iter_espn_schedule(text))
+        assert [(game['Time'], game['Away'], game['Home']) for game in games] == expected
+
+    # Desktop lines are kept wherever the favorite's abbreviation is one the parser accepts
+    games = list(iter_espn_schedule(espn_desktop_schedule(50, seed=3)))
+    assert [isinstance(game['Market'], dict) for game in games] == [
+        favorite is not None and re.fullmatch(r'[A-Z0-9&\-]+', derive_abbreviation(favorite)) is not None
+        for _, _, _, favorite, _ in matchups(50, seed=3)]
+    assert espn_desktop_schedule(50, seed=3) == espn_desktop_schedule(50, seed=3)
+
+
+def test_ats_table_parses_every_row():
+    text = teamrankings_ats_table(seed=1)
+    assert len(dict(iter_ats_records(text))) == len(text.splitlines()) - 1
+
+
+def test_suite_runs_and_regressions_are_flagged(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    assert bench_pipeline.main(['--sizes', '10', '--min-repeat', '1', '--max-repeat', '1', '--min-seconds', '0',
+                                '--output', str(output)]) == 0
+    results = json.loads(output.read_text())['results']
+    assert {row['benchmark'] for row in results} == {
+        'load_ats_data_from_text', 'parse_espn_desktop', 'parse_espn_mobile', 'create_daily_chart',
+        'create_xlsx_file', 'post_index_cold', 'post_index_warm'}
+
+    faster = {'results': [{**row, 'p50_ms': row['p50_ms'] / 2} for row in results]}
+    slower = {'results': [{**row, 'p50_ms': row['p50_ms'] * 2} for row in results]}
+    assert len(bench_pipeline.compare(results, faster, max_regression=0.25)) == len(results)
+    assert bench_pipeline.compare(results, slower, max_regression=0.25) == []
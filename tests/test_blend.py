@@ -0,0 +1,95 @@
+"""Blended chart scores weigh each term's away-minus-home gap and reweight around missing tables"""
+import numpy as np
+import pytest
+
+import app
+from blend import TeamFeatures, blend_scores, blend_sources, format_blend, parse_blend
+from records import AtsRecord
+
+
+def table(**teams):
+    """{team: record dict} from team=(cover %, ATS +/-) keyword arguments"""
+    return {team.replace('_', ' '): {'rank': 'N/A', 'record': '', 'cover_pct': f'{cover:.1f}%', 'ats_pm': ats_pm}
+            for team, (cover, ats_pm) in teams.items()}
+
+
+def ats_text(**teams):
+    rows = [f"{i}\t{team.replace('_', ' ')}\t10-10\t{cover:.1f}%\t{ats_pm:+.1f}"
+            for i, (team, (cover, ats_pm)) in enumerate(teams.items(), 1)]
+    return '\n'.join(['Rank\tTeam\tATS Record\tCover %\tATS +/-'] + rows)
+
+
+def test_blend_specs_parse_and_format():
+    terms = parse_blend(' overall.cover=1, venue.ats_pm=0.5,role.cover=0,')
+    assert terms == (('overall', 'cover', 1.0), ('venue', 'ats_pm', 0.5))
+    assert format_blend(terms) == 'overall.cover=1,venue.ats_pm=0.5'
+    assert blend_sources(parse_blend('role.cover=1,overall.cover=1')) == ['overall', 'favorite', 'underdog']
+    for spec in ('overall.cover=0', 'overall.spread=1', 'nowhere.cover=1', 'overall.cover=x', 'overall.cover=inf', ''):
+        with pytest.raises(ValueError):
+            parse_blend(spec)
+
+
+def test_features_hold_every_table_with_a_nan_row_for_unknown_teams():
+    features = TeamFeatures({'overall': table(Duke=(60, 2.0), Kansas=(40, -1.0)),
+                             'last10': {'Duke': AtsRecord('Duke', 70.0, '70.0%', None)}})
+    rows = features.positions(['Kansas', 'Nobody', None, 'Duke'])
+    assert rows.tolist() == [1, -1, -1, 0]
+    np.testing.assert_array_equal(features.column('overall', 'cover')[rows], [40, np.nan, np.nan, 60])
+    np.testing.assert_array_equal(features.column('last10', 'cover')[rows], [np.nan, np.nan, np.nan, 70])
+    assert np.isnan(features.column('last10', 'ats_pm')).all()
+    assert np.isnan(features.column('home', 'cover')).all()
+
+
+def test_missing_terms_drop_out_without_shrinking_the_score():
+    features = TeamFeatures({'overall': table(A=(60, 1.0), B=(50, 0.0), C=(70, 2.0)),
+                             'last10': table(A=(80, 3.0), B=(40, -1.0))})
+    away, home = features.positions(['A', 'A', 'C', 'A']), features.positions(['B', 'C', 'Nobody', 'B'])
+    scores = blend_scores(features, away, home, parse_blend('overall.cover=1,recent.cover=3'))
+    # Both terms: 10 + 3*40; A v C has no last10 for C, so its overall gap stands for all 4 weight; C v nobody scores nothing
+    np.testing.assert_allclose(scores, [130.0, -40.0, np.nan, 130.0])
+
+    negative = blend_scores(features, away, home, parse_blend('overall.cover=1,recent.ats_pm=-1'))
+    np.testing.assert_allclose(negative, [6.0, -20.0, np.nan, 6.0])
+
+
+def test_by_line_terms_score_the_favorite_and_underdog_tables():
+    features = TeamFeatures({'favorite': table(A=(70, 0.0), B=(55, 0.0)), 'underdog': table(A=(30, 0.0), B=(45, 0.0))})
+    away, home = features.positions(['A', 'A', 'A']), features.positions(['B', 'B', 'B'])
+    terms = parse_blend('role.cover=1')
+    # Away favored: A as favorite (70) vs B as underdog (45); home favored: A as underdog (30) vs B as favorite (55)
+    np.testing.assert_allclose(blend_scores(features, away, home, terms, np.array([1, 0, -1], dtype=np.int8)),
+                               [25.0, -25.0, np.nan])
+    assert np.isnan(blend_scores(features, away, home, terms)).all()
+
+
+def test_slate_scores_tell_the_favorite_by_the_spread_sign():
+    ats_dict = table(Duke=(60, 2.0), North_Carolina=(50, 0.0))
+    tables = {'overall': ats_dict, 'favorite': table(Duke=(70, 0.0), North_Carolina=(65, 0.0)),
+              'underdog': table(Duke=(20, 0.0), North_Carolina=(35, 0.0))}
+    resolver = app.TeamResolver(ats_dict, app.team_name_mapping())
+    games = [{'Away': 'Duke', 'Home': 'North Carolina', 'Time': '7:00 PM',
+              'Market': {'original_abbrev': 'DUKE', 'value': value, 'display': f'DUKE {value}'}}
+             for value in ('-3.5', '+3.5', '0')]
+    assert app.slate_scores(games, resolver, tables, parse_blend(app.DEFAULT_BLEND)) is None
+    assert app.slate_scores(games, resolver, tables, parse_blend('role.cover=1')) == [35.0, -45.0, None]
+    assert app.slate_scores(games, resolver, tables, parse_blend('role.cover=1,overall.cover=1')) == [45.0, -35.0, 20.0]
+
+
+def test_api_scores_the_chart_with_the_requested_blend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    schedule = '\n'.join(['Saturday, February 7, 2026', '', '12:00 PM', 'ESPN', 'Duke', '(15-8)', 'North Carolina',
+                          '(12-11)', 'Spread:DUKE -3.5', 'O/U:141.5', 'Gamecast'])
+    body = {'espn_schedule': schedule, 'teamrankings_ats': ats_text(Duke=(60, 2.0), North_Carolina=(50, 0.5)),
+            'teamrankings_ats_last10': ats_text(Duke=(20, -3.0), North_Carolina=(80, 4.0))}
+    client = app.app.test_client()
+
+    plain = client.post('/api/chart', json=body).get_json()
+    assert (plain['blend'], plain['chart_rows'][0]['Market'], plain['chart_rows'][0]['Avg Conf']) == (
+        'overall.cover=1', 'DUKE -3.5', '10.0')
+    blended = client.post('/api/chart', json={**body, 'ats_blend': 'overall.cover=1,recent.cover=1,venue.cover=1'}).get_json()
+    assert blended['ats_tables'] == {'overall': 2, 'last10': 2}
+    assert blended['blend_tables_missing'] == ['away', 'home']
+    # (10 - 60) over the two terms with data, scaled to the full weight of 3
+    assert (blended['chart_rows'][0]['Market'], blended['chart_rows'][0]['Avg Conf']) == ('UNC +3.5', '75.0')
+    assert client.post('/api/chart', json={**body, 'ats_blend': 'overall.cover=x'}).status_code == 400
@@ -0,0 +1,83 @@
+"""LRUCache evicts by recency and age, and parsed inputs are cached on their normalized content"""
+import io
+import os
+import time
+
+import cache
+from app import input_digest, parse_with_cache
+from cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = LRUCache('t', max_entries=2)
+    lru.put('a', 1)
+    lru.put('b', 2)
+    assert lru.get('a') == 1
+    lru.put('c', 3)
+    assert lru.get('b') is None
+    assert (lru.get('a'), lru.get('c')) == (1, 3)
+    assert lru.stats() == {'hits': 3, 'misses': 1, 'evictions': 1, 'size': 2, 'bytes': 0}
+
+
+def test_byte_bound_evicts_until_the_values_fit():
+    lru = LRUCache('t', max_entries=10, max_bytes=10)
+    lru.put('a', b'x' * 4)
+    lru.put('b', b'x' * 4)
+    lru.put('a', b'x' * 5)
+    assert lru.stats()['bytes'] == 9
+    lru.put('c', b'x' * 3)
+    assert lru.get('b') is None
+    assert (lru.get('a'), lru.get('c')) == (b'x' * 5, b'x' * 3)
+    lru.put('d', b'x' * 20)  # Larger than the bound on its own - kept, everything else goes
+    assert lru.stats()['size'] == 1 and lru.stats()['bytes'] == 20
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    lru = LRUCache('t', ttl_seconds=60)
+    lru.put('a', 1)
+    clock.now += 60
+    assert lru.get('a') == 1
+    clock.now += 1
+    assert lru.get('a') is None
+    assert lru.stats()['evictions'] == 1 and lru.stats()['size'] == 0
+
+
+def test_disk_entries_are_shared_until_they_expire(tmp_path):
+    LRUCache('t', disk_dir=str(tmp_path)).put('a', {'x': [1, 2]})
+    other_worker = LRUCache('t', ttl_seconds=60, disk_dir=str(tmp_path))
+    assert other_worker.get('a') == {'x': [1, 2]}
+
+    path = tmp_path / 't-a.json'
+    other_worker.clear()
+    os.utime(path, (time.time() - 61, time.time() - 61))
+    assert other_worker.get('a') is None
+    assert not path.exists()
+
+
+def test_digest_ignores_indentation_and_rewinds_streams():
+    stream = io.BytesIO(b'  Duke \n\nKansas\n')
+    assert input_digest(stream) == input_digest('\nDuke\n\nKansas   \n\n') != input_digest('Duke\nKansas\n')
+    assert stream.tell() == 0
+
+
+def test_parse_is_skipped_for_content_already_seen():
+    lru = LRUCache('t')
+    calls = []
+
+    def parse(source):
+        calls.append(source)
+        return ['parsed']
+
+    assert parse_with_cache(lru, 'Duke\nKansas', parse) == (['parsed'], False)
+    assert parse_with_cache(lru, ' Duke\nKansas \n', parse) == (['parsed'], True)
+    assert len(calls) == 1
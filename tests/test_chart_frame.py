@@ -0,0 +1,60 @@
+"""The columnar chart engine gives exactly the rows of the per-game loop"""
+import random
+
+import numpy as np
+import pytest
+
+import charting
+from charting import chart_frame, chart_rows_from_frame, create_daily_chart, derive_abbreviation, team_name_mapping
+from parsing import make_spread
+
+TEAMS = ['Duke', 'North Carolina', 'Kansas', 'Baylor', 'Gonzaga', "Saint Mary's", 'Texas A&M', 'UConn',
+         'San Diego State', 'Nowhere Tech']
+
+
+def random_slate(rng, games):
+    ats_dict = {}
+    for team in TEAMS[:-1]:
+        # A few repeated cover %s so ties come up; ATS +/- is sometimes missing
+        ats_dict[team] = {'rank': 'N/A', 'record': '10-9', 'cover_pct': f'{rng.choice([40, 50, 52.6, 61.1])}%',
+                          'ats_pm': rng.choice([-2.5, 0.0, 1.5, None])}
+    slate = []
+    for _ in range(games):
+        away, home = rng.sample(TEAMS, 2)
+        market = rng.choice(['spread', 'spread', 'N/A', 'No Line', ''])
+        if market == 'spread':
+            abbrev = rng.choice([derive_abbreviation(away), derive_abbreviation(home), 'XYZ'])
+            market = make_spread(abbrev, f'{rng.choice("-+")}{rng.randint(0, 20)}.5')
+        slate.append({'Away': away, 'Home': home, 'Time': '7:00 PM', 'Market': market})
+    return slate, ats_dict
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_frame_rows_match_the_row_loop(seed):
+    games, ats_dict = random_slate(random.Random(seed), games=200)
+    expected, expected_unmapped = create_daily_chart(games, ats_dict, team_name_mapping())
+    frame, unmapped = chart_frame(games, ats_dict, team_name_mapping())
+    assert chart_rows_from_frame(frame) == expected
+    assert sorted(unmapped) == sorted(expected_unmapped)
+
+
+def test_numeric_columns_follow_the_play_side():
+    games = [{'Away': 'Duke', 'Home': 'Kansas', 'Time': '7:00 PM', 'Market': make_spread('KU', '-3.5')},
+             {'Away': 'Kansas', 'Home': 'Duke', 'Time': '9:00 PM', 'Market': make_spread('KU', '-3.5')},
+             {'Away': 'Duke', 'Home': 'Nowhere Tech', 'Time': '9:00 PM', 'Market': 'N/A'}]
+    ats_dict = {'Duke': {'cover_pct': '60.0%', 'ats_pm': 2.0}, 'Kansas': {'cover_pct': '45.0%', 'ats_pm': -1.0}}
+    frame, unmapped = chart_frame(games, ats_dict, {})
+    assert frame['play_side'].tolist() == ['away', 'home', '']
+    assert frame['play_spread'].tolist()[:2] == [3.5, 3.5]
+    assert frame['play_ats_pm'].tolist()[:2] == [2.0, 2.0]
+    assert np.isnan(frame['avg_conf'][2]) and unmapped == ['Nowhere Tech']
+
+
+def test_large_slates_take_the_columnar_path(monkeypatch):
+    games, ats_dict = random_slate(random.Random(0), games=50)
+    expected = create_daily_chart(games, ats_dict, team_name_mapping())
+    monkeypatch.setattr(charting, 'CHART_COLUMNAR_MIN_GAMES', 10)
+    calls = []
+    monkeypatch.setattr(charting, 'chart_frame', lambda *args: calls.append(args) or chart_frame(*args))
+    assert create_daily_chart(games, ats_dict, team_name_mapping())[0] == expected[0]
+    assert calls
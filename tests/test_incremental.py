@@ -0,0 +1,103 @@
+"""Re-pasted slates recompute only the games that changed, and patched workbooks match freshly written ones"""
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+import app
+from cache import LRUCache
+from records import Game
+from store import ChartStore
+
+ATS_TABLE = '\n'.join(['Rank\tTeam\tATS Record\tCover %\tATS +/-',
+                       '1\tDuke\t14-4-2\t77.8%\t+4.0',
+                       '2\tNorth Carolina\t10-9\t52.6%\t+0.5',
+                       '3\tKansas\t9-10\t47.4%\t-0.5',
+                       '4\tBaylor\t8-12\t10.0%\t-1.5'])
+
+
+def schedule(*games):
+    lines = ['Saturday, February 7, 2026', '']
+    for game_time, away, home, spread in games:
+        lines += [game_time, 'ESPN', away, '(15-8)', home, '(12-11)', f'Spread:{spread}', 'O/U:141.5', 'Gamecast']
+    return '\n'.join(lines)
+
+
+DUKE = ('12:00 PM', 'Duke', 'North Carolina', 'DUKE -3.5')
+KANSAS = ('2:00 PM', 'Kansas', 'Baylor', 'BAY -1.5')
+ARIZONA = ('4:00 PM', 'Arizona', 'Kansas', 'KU -6.5')
+
+
+def chart(previous, text, ats_dict):
+    resolver = previous.resolver if previous is not None else app.TeamResolver(ats_dict, app.team_name_mapping())
+    return app.update_slate_chart(previous, list(app.iter_espn_schedule(text)), resolver)
+
+
+def test_repaste_reuses_unchanged_rows_and_reports_changes():
+    ats_dict = app.load_ats_data_from_text(ATS_TABLE)
+    first, _ = chart(None, schedule(DUKE, KANSAS), ats_dict)
+    assert first.row_changes() == [None, None] and first.change_counts() == (0, 0, 0)
+
+    text = schedule(('12:00 PM', 'Duke', 'North Carolina', 'DUKE -5.5'), KANSAS, ARIZONA)
+    second, unmapped = chart(first, text, ats_dict)
+    games = list(app.iter_espn_schedule(text))
+    assert second.chart_rows() == app.create_daily_chart(games, ats_dict, app.team_name_mapping())[0]
+    assert unmapped == ['Arizona']
+    assert second.row_changes() == [('moved', 'DUKE -3.5'), None, ('new', None)]
+    assert second.change_counts() == (1, 1, 0)
+    kansas = ('Kansas', 'Baylor', '2:00 PM')
+    assert second.rows[kansas] is first.rows[kansas] and second.values[kansas] is first.values[kansas]
+
+    third, _ = chart(second, schedule(KANSAS), ats_dict)
+    assert third.change_counts() == (0, 0, 2) and third.row_changes() == [None]
+
+
+def test_repeated_games_get_their_own_keys():
+    games = [Game('Duke', 'Kansas', '1:00 PM')] * 3
+    assert app.slate_keys(games) == [('Duke', 'Kansas', '1:00 PM'), ('Duke', 'Kansas', '1:00 PM', 1),
+                                     ('Duke', 'Kansas', '1:00 PM', 2)]
+
+
+def test_patched_workbook_matches_the_writer_cell_for_cell(tmp_path):
+    ats_dict = app.load_ats_data_from_text(ATS_TABLE)
+    first, _ = chart(None, schedule(DUKE, KANSAS, ARIZONA), ats_dict)
+    first.build_workbook()
+    slate, _ = chart(first, schedule(('12:00 PM', 'Duke', 'North Carolina', 'DUKE -5.5'), KANSAS,
+                                     ('5:00 PM', 'A & B <x>', ' Kansas', 'KU -1')), ats_dict)
+    rows = slate.chart_rows()
+    app.create_xlsx_file(rows, tmp_path / 'written.xlsx', write_only=True)
+
+    written = load_workbook(tmp_path / 'written.xlsx').active
+    patched = load_workbook(io.BytesIO(slate.build_workbook())).active
+    assert patched.max_row == written.max_row == len(rows) + 1
+    for expected_row, row in zip(written.iter_rows(), patched.iter_rows()):
+        assert [(cell.value, cell.font.b, cell.fill.fgColor.rgb, cell.border.left.style) for cell in row] == \
+            [(cell.value, cell.font.b, cell.fill.fgColor.rgb, cell.border.left.style) for cell in expected_row]
+    assert {cell.fill.fgColor.rgb for cell in patched[3]} == {'00FFFF00'}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    monkeypatch.setattr(app, 'SLATE_CHARTS', LRUCache('slate', max_entries=8))
+    monkeypatch.setattr(app, 'CHART_STORE', ChartStore(str(tmp_path / 'store.sqlite3')))
+    return app.app.test_client()
+
+
+def test_repasted_page_marks_changed_rows_and_patches_the_store(client):
+    client.post('/', data={'espn_schedule': schedule(DUKE, KANSAS), 'teamrankings_ats': ATS_TABLE})
+    page = client.post('/', data={'espn_schedule': schedule(('12:00 PM', 'Duke', 'North Carolina', 'DUKE -5.5'), KANSAS),
+                                  'teamrankings_ats': ATS_TABLE}).get_data(as_text=True)
+    assert page.count('data-change="moved"') == 1 and '(was DUKE -3.5)' in page
+    assert '1 game(s) moved, 0 new, 0 removed' in page
+
+    store = app.CHART_STORE
+    assert [row['Market'] for row in store.chart('2026-02-07')] == ['DUKE -5.5', 'KU +1.5']
+
+
+def test_another_slate_of_the_same_day_is_not_diffed_against(client):
+    client.post('/', data={'espn_schedule': schedule(DUKE, KANSAS), 'teamrankings_ats': ATS_TABLE})
+    page = client.post('/', data={'espn_schedule': schedule(ARIZONA), 'teamrankings_ats': ATS_TABLE}).get_data(as_text=True)
+    assert 'Since the last paste' not in page
+    assert app.SLATE_CHARTS.stats()['size'] == 2
@@ -0,0 +1,120 @@
+"""Bulk ingest reads saved ESPN and TeamRankings pages into the store or backtest files"""
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from ingest import collect_results, find_pages, html_to_text, ingest_file, main, page_date
+from linehistory import LineHistory
+from store import ChartStore
+
+ATS_HTML = """<html><head><style>td { color: red }</style></head><body><table>
+<tr><th>Rank</th><th>Team</th><th>ATS Record</th><th>Cover %</th><th>ATS +/-</th></tr>
+<tr><td>1</td><td><a href="/duke">Duke</a></td><td>14-4-2</td><td>77.8%</td><td>+4.0</td></tr>
+<tr><td>2</td><td>North Carolina</td><td>10-9</td><td>52.6%</td><td>+0.5</td></tr>
+</table></body></html>"""
+
+
+def schedule_page(spreads, heading='Saturday, February 7, 2026'):
+    lines = [heading, '']
+    for game_time, away, home, spread in spreads:
+        lines += [game_time, 'ESPN', away, '(15-8)', home, '(12-11)', f'Spread:{spread}', 'O/U:141.5', 'Gamecast']
+    return '\n'.join(lines)
+
+
+def test_html_is_flattened_as_a_browser_copy_would():
+    assert html_to_text(ATS_HTML).split('\n')[1] == '1 Duke 14-4-2 77.8% +4.0'
+    assert html_to_text('<div>12:00 PM <b>Duke</b></div><script>x = 1</script><p>Kansas</p>') == '12:00 PM Duke\nKansas'
+    assert html_to_text('<table><tr><td>Duke</td><td>(15-8)</td></tr></table>', '\n') == 'Duke\n(15-8)'
+
+
+def test_pages_are_dated_by_file_name_then_heading():
+    assert page_date('/saved/20260207-espn.txt', 'January 3, 2026') == '2026-02-07'
+    assert page_date('/saved/espn.txt', '\nThursday, January 1, 2026\n') == '2026-01-01'
+    assert page_date('/saved/2026-13-40.txt', 'nothing') is None
+
+
+def test_files_are_told_apart_by_what_parses_out_of_them(tmp_path):
+    (tmp_path / 'espn.txt').write_text(schedule_page([('12:00 PM', 'Duke', 'North Carolina', 'DUKE -3.5')]))
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / '2026-02-06 ats.html').write_text(ATS_HTML)
+    (tmp_path / 'notes.txt').write_text('nothing to see')
+    (tmp_path / 'image.png').write_bytes(b'\x89PNG')
+
+    results = [ingest_file(path) for path in find_pages(str(tmp_path))]
+    assert [(result['kind'], result['date']) for result in results] == [
+        ('schedule', '2026-02-07'), (None, None), ('ats', '2026-02-06')]
+    schedules, snapshots, skipped = collect_results(results)
+    assert list(schedules) == ['2026-02-07'] and list(snapshots) == ['2026-02-06']
+    assert snapshots['2026-02-06']['Duke']['cover_pct'] == '77.8%'
+    assert [reason for _, reason in skipped] == ['no ESPN games or TeamRankings rows found']
+
+
+def test_cli_charts_each_date_against_the_snapshot_before_it(tmp_path):
+    pages = tmp_path / 'pages'
+    pages.mkdir()
+    (pages / 'espn-2026-02-05.txt').write_text(schedule_page([('7:00 PM', 'Duke', 'North Carolina', 'DUKE -2.5')]))
+    (pages / 'espn-2026-02-07.txt').write_text(schedule_page([('12:00 PM', 'North Carolina', 'Duke', 'DUKE -3.5')]))
+    (pages / 'ats-2026-02-06.html').write_text(ATS_HTML)
+
+    store_path = str(tmp_path / 'store.sqlite3')
+    assert main([str(pages), '--store', store_path, '--workers', '2']) == 0
+    store = ChartStore(store_path)
+    assert store.chart('2026-02-05') == []
+    assert [(row['Away'], row['Market']) for row in store.chart('2026-02-07')] == [('North Carolina', 'DUKE -3.5')]
+
+    assert main([str(pages), '--csv', str(tmp_path / 'csv'), '--workers', '1']) == 0
+    schedules = pd.read_csv(tmp_path / 'csv' / 'schedules.csv')
+    assert schedules[['date', 'spread_team', 'spread']].values.tolist() == [
+        ['2026-02-05', 'DUKE', -2.5], ['2026-02-07', 'DUKE', -3.5]]
+    assert len(pd.read_csv(tmp_path / 'csv' / 'ats_snapshots.csv')) == 2
+
+
+def test_cli_fails_when_nothing_parses(tmp_path):
+    (tmp_path / 'notes.txt').write_text('nothing to see')
+    assert main([str(tmp_path), '--csv', str(tmp_path / 'out')]) == 1
+
+
+def test_cli_appends_every_saved_schedule_to_the_line_history(tmp_path):
+    pages = tmp_path / 'pages'
+    pages.mkdir()
+    for name, spread, mtime in (('espn-morning.txt', 'DUKE -2.5', 1000), ('espn-evening.txt', 'DUKE -3.5', 2000)):
+        (pages / name).write_text(schedule_page([('7:00 PM', 'Duke', 'North Carolina', spread)]))
+        os.utime(pages / name, (mtime, mtime))
+
+    assert main([str(pages), '--csv', str(tmp_path / 'csv'), '--lines', str(tmp_path / 'lines'), '--workers', '1']) == 0
+    rows = LineHistory(str(tmp_path / 'lines')).history('2026-02-07', 'Duke', 'North Carolina', '7:00 PM')
+    assert rows['seen'].tolist() == [1000, 2000] and rows['value'].tolist() == [-2.5, -3.5]
+
+
+def test_snapshots_of_the_same_day_keep_each_game_once(tmp_path):
+    (tmp_path / '2026-02-07-0900.txt').write_text(schedule_page([
+        ('12:00 PM', 'Duke', 'North Carolina', 'DUKE -3.5'),
+        ('2:00 PM', 'Kansas', 'Baylor', 'BAY -1.5'),
+    ]))
+    (tmp_path / '2026-02-07-1700.txt').write_text(schedule_page([
+        ('12:00 PM', 'Duke', 'North Carolina', 'DUKE -4.5'),
+        ('2:00 PM', 'Kansas', 'Baylor', 'KU -1'),
+        ('4:00 PM', 'Gonzaga', 'Saint Mary\'s', 'GONZ -6'),
+    ]))
+
+    schedules, snapshots, skipped = collect_results([ingest_file(path) for path in find_pages(str(tmp_path))])
+
+    assert skipped == [] and snapshots == {}
+    games = schedules['2026-02-07']
+    assert [(game['Away'], game['Home']) for game in games] == [
+        ('Duke', 'North Carolina'), ('Kansas', 'Baylor'), ('Gonzaga', 'Saint Mary\'s')]
+    assert [game['Market']['display'] for game in games] == ['DUKE -4.5', 'KU -1', 'GONZ -6']
+
+
+def test_cli_runs_without_the_web_app(tmp_path):
+    (tmp_path / 'espn.txt').write_text(schedule_page([('12:00 PM', 'Duke', 'North Carolina', 'DUKE -3.5')]))
+    script = ("import sys, ingest; code = ingest.main(sys.argv[1:]); "
+              "print(code, 'app' in sys.modules, 'flask' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', script, str(tmp_path), '--csv', str(tmp_path / 'csv'),
+                             '--lines', '', '--workers', '1'],
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['0', 'False', 'False']
+    assert 'INFO - Ingested 1/1 file(s)' in result.stderr
@@ -0,0 +1,133 @@
+"""The line history appends only changed lines, is shared through its files, and reports each game's move"""
+import io
+import os
+
+import numpy as np
+import pytest
+
+import app
+from linehistory import LINE_DTYPE, LINES_FILE, LineHistory, line_move, main, slate_moves
+from teams import TeamTables
+
+
+def game(away, home, team, value, game_time='7:00 PM'):
+    return {'Away': away, 'Home': home, 'Time': game_time,
+            'Market': {'original_abbrev': team, 'value': value, 'display': f'{team} {value}'}}
+
+
+def test_only_changed_lines_are_appended(tmp_path):
+    history = LineHistory(str(tmp_path))
+    slate = [game('Duke', 'Kansas', 'KU', '-3.5'), {'Away': 'A', 'Home': 'B', 'Time': '1:00 PM', 'Market': 'N/A'}]
+    assert history.append('2026-02-07', slate, seen=100) == 1
+    assert history.append('2026-02-07', slate, seen=200) == 0
+    assert history.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-4.5')], seen=300) == 1
+    assert history.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-3.5')], seen=400) == 1
+    assert history.append('2026-02-08', [game('Duke', 'Kansas', 'KU', '-3.5')], seen=500) == 1
+
+    rows = history.history('2026-02-07', 'Duke', 'Kansas', '7:00 PM')
+    assert rows['seen'].tolist() == [100, 300, 400] and rows['value'].tolist() == [-3.5, -4.5, -3.5]
+    assert len(history) == 4 and os.path.getsize(tmp_path / LINES_FILE) == 4 * LINE_DTYPE.itemsize
+    assert len(history.history('2026-02-07', 'A', 'B', '1:00 PM')) == 0
+
+
+def test_workers_sharing_the_directory_see_each_others_lines(tmp_path):
+    first, second = LineHistory(str(tmp_path)), LineHistory(str(tmp_path))
+    first.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-3.5')], seen=100)
+    assert second.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-3.5')], seen=200) == 0
+    second.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-2'), game('UNC', 'Baylor', 'BAY', '-1')], seen=300)
+    assert [(away, rows['value'].tolist()) for away, _, _, rows in first.slate('2026-02-07')] == [
+        ('Duke', [-3.5, -2.0]), ('UNC', [-1.0])]
+
+
+def test_torn_record_from_a_crashed_writer_is_dropped(tmp_path):
+    history = LineHistory(str(tmp_path))
+    history.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-3.5')], seen=100)
+    with open(tmp_path / LINES_FILE, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+    assert LineHistory(str(tmp_path)).append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-5')], seen=200) == 1
+    assert os.path.getsize(tmp_path / LINES_FILE) == 2 * LINE_DTYPE.itemsize
+    assert LineHistory(str(tmp_path)).history('2026-02-07', 'Duke', 'Kansas', '7:00 PM')['value'].tolist() == [-3.5, -5]
+
+
+@pytest.mark.parametrize('opening, current, sides, move', [
+    (('KU', -3.5), ('KU', -5.0), {}, 1.5),
+    (('KU', -3.5), ('KU', -2.0), {}, -1.5),
+    (('KU', -1.5), ('DUKE', -2.0), {'KU': 'home', 'DUKE': 'away'}, 3.5),
+    (('KU', -1.5), ('DUKE', -2.0), {'DUKE': 'away'}, None),
+])
+def test_moves_count_toward_the_current_team(opening, current, sides, move):
+    assert line_move(*opening, *current, sides.get) == move
+
+
+def test_slate_moves_and_the_cli(tmp_path, capsys):
+    history = LineHistory(str(tmp_path))
+    history.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-1.5')], seen=0)
+    history.append('2026-02-07', [game('Duke', 'Kansas', 'DUKE', '-2')], seen=3600)
+    tables = TeamTables({'Duke': 'Duke', 'Kansas': 'Kansas'}, {'Duke': 'DUKE', 'Kansas': 'KU'})
+    [move] = slate_moves(history, '2026-02-07', tables.spread_side)
+    assert move == {'away': 'Duke', 'home': 'Kansas', 'time': '7:00 PM', 'opening': 'KU -1.5',
+                    'opened_at': '1970-01-01T00:00:00+00:00', 'current': 'DUKE -2',
+                    'updated_at': '1970-01-01T01:00:00+00:00', 'move': 3.5, 'changes': 1}
+
+    assert main([str(tmp_path), '--date', '2026-02-07']) == 0
+    assert 'opened KU -1.5' in capsys.readouterr().out
+
+
+def test_line_endpoints(tmp_path, monkeypatch):
+    history = LineHistory(str(tmp_path))
+    monkeypatch.setattr(app, 'LINE_HISTORY', history)
+    history.append('2026-02-07', [game('Duke', 'Kansas', 'KU', '-1.5')], seen=0)
+    client = app.app.test_client()
+
+    body = client.get('/api/lines?date=2026-02-07').get_json()
+    assert [(row['away'], row['current'], row['move']) for row in body['games']] == [('Duke', 'KU -1.5', 0)]
+    body = client.get('/api/lines/game?date=2026-02-07&away=Duke&home=Kansas&time=7:00 PM').get_json()
+    assert body['lines'] == [{'line': 'KU -1.5', 'team': 'KU', 'value': -1.5, 'seen_at': '1970-01-01T00:00:00+00:00'}]
+    assert client.get('/api/lines?date=Feb 7').status_code == 400
+    assert client.get('/api/lines/game?date=2026-02-07&away=Duke').status_code == 400
+    assert client.get('/api/lines/game?date=2026-02-07&away=Duke&home=UNC&time=1:00 PM').status_code == 404
+    monkeypatch.setattr(app, 'LINE_HISTORY', None)
+    assert client.get('/api/lines').status_code == 503
+
+
+def games(spreads):
+    return [{'Away': f'Away {i}', 'Home': f'Home {i}', 'Time': '7:00 PM',
+             'Market': {'original_abbrev': f'H{i}', 'value': str(spread), 'display': f'H{i} {spread}'}}
+            for i, spread in enumerate(spreads)]
+
+
+def test_index_merges_records_appended_by_any_worker(tmp_path):
+    worker_a, worker_b = LineHistory(str(tmp_path)), LineHistory(str(tmp_path))
+    rng = np.random.default_rng(0)
+    for seen in range(40):
+        writer = worker_a if seen % 3 else worker_b
+        writer.append(f'2026-02-{1 + seen % 5:02d}', games(rng.choice([-1.5, -2.5, -3.5], size=12)), seen=seen)
+        worker_a.history('2026-02-01', 'Away 0', 'Home 0', '7:00 PM')  # Builds, then keeps merging, the index
+
+    games_column = np.asarray(worker_a._lines['game'])
+    assert np.array_equal(worker_a._order, np.argsort(games_column, kind='stable'))
+    for slate_date in ('2026-02-01', '2026-02-05'):
+        for away, home, game_time, rows in worker_a.slate(slate_date):
+            assert np.all(np.diff(rows['seen'].astype(np.int64)) > 0)
+            assert [tuple(row) for row in rows] == [tuple(row) for row in worker_b.history(slate_date, away, home, game_time)]
+
+
+@pytest.mark.parametrize('upload', [False, True])
+def test_pasted_lines_are_kept_under_the_schedule_date(tmp_path, monkeypatch, upload):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    monkeypatch.setattr(app, 'LINE_HISTORY', LineHistory(str(tmp_path / 'lines')))
+    schedule = '\n'.join(['Saturday, February 7, 2026', '', '12:00 PM', 'ESPN', 'Duke', '(15-8)', 'North Carolina',
+                          '(12-11)', 'Spread:DUKE -3.5', 'O/U:141.5', 'Gamecast'])
+    ats = '\n'.join(['Rank\tTeam\tATS Record\tCover %\tATS +/-', '1\tDuke\t14-4-2\t77.8%\t+4.0',
+                     '2\tNorth Carolina\t10-9\t52.6%\t+0.5'])
+    client = app.app.test_client()
+    if upload:
+        data = {'espn_file': (io.BytesIO(schedule.encode()), 'schedule.txt'), 'teamrankings_ats': ats}
+    else:
+        data = {'espn_schedule': schedule, 'teamrankings_ats': ats}
+    assert client.post('/', data=data).status_code < 400
+
+    body = client.get('/api/lines').get_json()
+    assert body['date'] == '2026-02-07'
+    assert [(game['away'], game['current']) for game in body['games']] == [('Duke', 'DUKE -3.5')]
@@ -0,0 +1,68 @@
+"""Request and stage metrics render in the Prometheus text format at /metrics"""
+import re
+
+import app
+from metrics import MetricsRegistry, server_timing_header
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? (\S+)$')
+
+SCHEDULE = '\n'.join(['Saturday, February 7, 2026', '', '12:00 PM', 'ESPN', 'Duke', '(15-8)', 'North Carolina',
+                      '(12-11)', 'Spread:DUKE -3.5', 'O/U:141.5', 'Gamecast'])
+ATS_TABLE = '\n'.join(['Rank\tTeam\tATS Record\tCover %\tATS +/-', '1\tDuke\t14-4-2\t77.8%\t+4.0'])
+
+
+def parse(text):
+    """{(name, labels): value} for every sample, checking each line is HELP, TYPE or a sample"""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith(('# HELP ', '# TYPE ')):
+            continue
+        match = SAMPLE_RE.match(line)
+        assert match, line
+        samples[match.group(1), match.group(2) or ''] = float(match.group(3))
+    return samples
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('t_seconds', 'Test latency', ['stage'], buckets=(0.1, 1.0))
+    counter = registry.counter('t_total', 'Test count', ['path'])
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, 'parse')
+    counter.inc('a "quoted"\npath', amount=3)
+    registry.collector(lambda: [('t_entries', 'gauge', 'Test gauge', [({'cache': 'x'}, 7)])])
+
+    samples = parse(registry.render())
+    assert [samples['t_seconds_bucket', f'{{stage="parse",le="{le}"}}'] for le in ('0.1', '1.0', '+Inf')] == [1, 3, 4]
+    assert samples['t_seconds_count', '{stage="parse"}'] == 4
+    assert samples['t_seconds_sum', '{stage="parse"}'] == 6.05
+    assert samples['t_total', '{path="a \\"quoted\\"\\npath"}'] == 3
+    assert samples['t_entries', '{cache="x"}'] == 7
+    assert '# TYPE t_seconds histogram' in registry.render()
+
+
+def test_metrics_endpoint_counts_requests_and_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    monkeypatch.setattr(app, 'SERVER_TIMING', True)
+    client = app.app.test_client()
+    before = parse(client.get('/metrics').get_data(as_text=True))
+
+    response = client.post('/api/chart', json={'espn_schedule': SCHEDULE, 'teamrankings_ats': ATS_TABLE})
+    assert response.status_code == 200
+    stages = [timing.split(';dur=')[0] for timing in response.headers['Server-Timing'].split(', ')]
+    assert stages == ['parse_schedule', 'parse_ats', 'parse_sources', 'chart', 'total']
+
+    response = client.get('/metrics')
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    after = parse(response.get_data(as_text=True))
+    key = ('ncaa_requests_total', '{endpoint="api_chart",status="200"}')
+    assert after[key] == before.get(key, 0) + 1
+    assert after['ncaa_games_parsed_total', ''] == before.get(('ncaa_games_parsed_total', ''), 0) + 1
+    assert after['ncaa_unmapped_teams_total', ''] == before.get(('ncaa_unmapped_teams_total', ''), 0) + 1
+    assert after['ncaa_stage_duration_seconds_count', '{stage="chart"}'] >= 1
+    assert ('ncaa_cache_entries', '{cache="schedule"}') in after
+
+
+def test_server_timing_header():
+    assert server_timing_header([('parse', 0.0012), ('total', 0.25)]) == 'parse;dur=1.2, total;dur=250.0'
@@ -0,0 +1,91 @@
+"""Game and ATS records round-trip the parser dicts, and the column tables index missing teams safely"""
+import numpy as np
+import pytest
+
+from records import AtsRecord, AtsTable, ChartRow, CHART_COLUMNS, Game, GameTable, NO_MARKET, Spread
+
+SPREAD = {'original_abbrev': 'DUKE', 'value': '-3.5', 'display': 'DUKE -3.5'}
+
+
+@pytest.mark.parametrize('market', [SPREAD, {'original_abbrev': 'UNC', 'value': '+12', 'display': 'UNC +12'},
+                                    'N/A', 'OFF'])
+def test_games_round_trip_parser_dicts(market):
+    game = {'Away': 'Duke', 'Home': 'North Carolina', 'Time': '12:00 PM', 'Market': market}
+    record = Game.from_dict(game)
+    assert record.to_dict() == game
+    assert Game.from_dict(record.to_dict()) == record
+
+
+def test_games_without_a_line_show_no_market():
+    for market in ('', {}, None):
+        game = Game.from_dict({'Away': 'Duke', 'Home': 'Kansas', 'Time': '1:00 PM', 'Market': market})
+        assert (game.spread, game.market_text) == (None, NO_MARKET)
+    assert Game.from_dict({'Away': 'A', 'Home': 'B', 'Time': 'T', 'Market': SPREAD}).spread == Spread('DUKE', -3.5, '-3.5')
+
+
+@pytest.mark.parametrize('entry', [
+    {'rank': '1', 'record': '14-4-2', 'cover_pct': '77.8%', 'ats_pm': 4.0},
+    {'rank': 'N/A', 'record': '10-9', 'cover_pct': '52.6%', 'ats_pm': -0.5},
+    {'rank': '12', 'record': '', 'cover_pct': '50.0%', 'ats_pm': None},
+])
+def test_ats_records_round_trip_table_entries(entry):
+    record = AtsRecord.from_dict('Duke', entry)
+    assert record.to_dict() == entry
+    assert AtsTable.from_records([record])['Duke'] == record
+
+
+def test_ats_records_need_a_cover_pct():
+    assert AtsRecord.from_dict('Duke', {'rank': '1', 'record': '1-0', 'cover_pct': '', 'ats_pm': 1.0}) is None
+    assert AtsRecord.from_dict('Duke', {'cover_pct': '60%', 'record': 'n/a'}).record == ''
+
+
+def test_ats_table_sentinel_row_stands_for_missing_teams():
+    table = AtsTable.from_dict({
+        'Duke': {'rank': '1', 'record': '14-4-2', 'cover_pct': '77.8%', 'ats_pm': 4.0},
+        'Kansas': {'rank': 'N/A', 'record': '10-9', 'cover_pct': '52.6%', 'ats_pm': None},
+        'Baylor': {'rank': '3', 'record': '', 'cover_pct': '', 'ats_pm': None},
+    })
+    assert list(table) == ['Duke', 'Kansas'] and 'Baylor' not in table and len(table) == 2
+    assert AtsTable.from_dict(table) is table
+
+    positions = table.positions(['Kansas', None, 'Baylor', 'Duke'])
+    assert positions.tolist() == [1, -1, -1, 0]
+    np.testing.assert_array_equal(table.cover_pct[positions], [52.6, np.nan, np.nan, 77.8])
+    assert table.cover_text[positions].tolist() == ['52.6%', '', '', '77.8%']
+    assert np.isnan(table.ats_pm[positions]).tolist() == [True, True, True, False]
+    assert table.wins[positions].tolist() == [10, 0, 0, 14]
+    with pytest.raises(KeyError):
+        table['Baylor']
+
+
+def test_ats_table_from_columns_keeps_the_last_duplicate():
+    table = AtsTable.from_columns(['Duke', 'Kansas', 'Duke', 'Baylor'], ['61.5%', '50.0%', '70.0%', ''],
+                                  [1.0, -2.0, 3.0, 0.0])
+    assert list(table) == ['Kansas', 'Duke']
+    assert table['Duke'].cover_text == '70.0%' and table['Duke'].ats_pm == 3.0
+    numeric = AtsTable.from_columns(['Duke'], [61.5], [np.nan])
+    assert (numeric['Duke'].cover_text, numeric['Duke'].ats_pm) == ('61.5%', None)
+
+
+def test_game_table_columns_round_trip_games():
+    games = [Game('Duke', 'Kansas', '12:00 PM', Spread('DUKE', -3.5, '-3.5')), Game('A', 'B', '1:00 PM')]
+    table = GameTable.from_games(games + [{'Away': 'C', 'Home': 'D', 'Time': '2:00 PM', 'Market': SPREAD}])
+    assert list(table)[:2] == games
+    assert table.has_spread.tolist() == [True, False, True]
+    assert table.spread_display().tolist() == ['DUKE -3.5', '', 'DUKE -3.5']
+    assert len(GameTable.from_games([])) == 0
+
+    columns = GameTable.from_columns(['Duke', 'A'], ['Kansas', 'B'], ['12:00 PM', '1:00 PM'], ['DUKE', None], [-3.5, 2.0])
+    assert list(columns) == games
+
+
+def test_chart_rows_index_like_row_dicts():
+    duke = AtsRecord('Duke', 77.8, '77.8%', 4.0)
+    kansas = AtsRecord('Kansas', 52.6, '52.6%', -0.5)
+    game = Game('Duke', 'Kansas', '12:00 PM', Spread('DUKE', -3.5, '-3.5'))
+    for row, avg_conf, ats in [(ChartRow(game, duke, kansas, 'DUKE -3.5'), '25.2', '+4.0'),
+                               (ChartRow(game, kansas, duke, 'DUKE -3.5'), '25.2', '+4.0'),
+                               (ChartRow(game, duke, duke, 'DUKE -3.5'), '0.0', '-'),
+                               (ChartRow(game, duke, None, 'DUKE -3.5'), '', '')]:
+        assert {column: row[column] for column in CHART_COLUMNS} == row.to_dict()
+        assert (row['Avg Conf'], row['ATS +/-']) == (avg_conf, ats)
@@ -0,0 +1,112 @@
+"""parse_desktop_format must give exactly the games the original line-rescanning parser did"""
+import random
+import re
+
+from app import parse_desktop_format
+
+
+def reference_parse_desktop_format(lines):
+    """The parser as it was before the one-pass classifier, kept verbatim as the reference"""
+    games = []
+    i = 0
+    
+    while i < len(lines):
+        line = lines[i].strip()
+        
+        if re.match(r'^\d{1,2}:\d{2}\s*[AP]M$', line):
+            time = line
+            away_team = None
+            home_team = None
+            spread = None
+            
+            j = i + 1
+            while j < min(i+40, len(lines)):
+                check_line = lines[j].strip()
+                
+                if away_team and home_team and (re.match(r'^\d{1,2}:\d{2}\s*[AP]M$', check_line) or 'Gamecast' in check_line):
+                    break
+                
+                if away_team and home_team:
+                    if check_line.startswith('Spread:'):
+                        spread_match = re.match(r'^Spread:([A-Z0-9&\-]+)\s+([-+]?\d+\.?\d*)$', check_line)
+                        if spread_match:
+                            team_abbrev = spread_match.group(1)
+                            spread_value = spread_match.group(2)
+                            spread = {
+                                'original_abbrev': team_abbrev,
+                                'value': spread_value,
+                                'display': f"{team_abbrev} {spread_value}"
+                            }
+                    j += 1
+                    continue
+                
+                if re.match(r'^\(\d+-\d+.*?(Home|Away)\)$', check_line) and not away_team and j >= 2:
+                    if j-2 >= 0 and j-1 >= 0:
+                        potential_away = lines[j-2].strip()
+                        potential_home = lines[j-1].strip()
+                        if potential_away and potential_home and not re.match(r'^\d', potential_away):
+                            away_team = potential_away
+                            home_team = potential_home
+                            j += 1
+                            continue
+                
+                if check_line and j+1 < len(lines) and not away_team:
+                    next_line = lines[j+1].strip()
+                    if re.match(r'^\(\d+-\d+.*?\)$', next_line) and not re.match(r'^\(\d+-\d+.*?(Home|Away)\)$', next_line):
+                        away_team = check_line
+                        j += 2
+                        continue
+                
+                if check_line and j+1 < len(lines) and away_team and not home_team:
+                    next_line = lines[j+1].strip()
+                    if re.match(r'^\(\d+-\d+.*?\)$', next_line) and not re.match(r'^\(\d+-\d+.*?(Home|Away)\)$', next_line):
+                        home_team = check_line
+                        j += 2
+                        continue
+                
+                j += 1
+            
+            if away_team and home_team:
+                games.append({
+                    'Away': away_team,
+                    'Home': home_team,
+                    'Time': time,
+                    'Market': spread if spread else 'N/A'
+                })
+            
+            i = j
+        else:
+            i += 1
+    
+    return games
+
+
+GAME = ['7:00 PM', 'ESPN', 'Duke', '(10-5)', 'North Carolina', '(12-3)', 'Spread:DUKE -3.5', 'O/U:140.5', 'Gamecast']
+
+# Lines that exercise every tag, including the malformed ones the parsers disagree on easily
+FUZZ_LINES = ['7:00 PM', '12:30 AM', '(10-5)', '(3-4, 1-2 Home)', '(2-2, 0-1 Away)', 'Spread:DUKE -3.5',
+              'Spread:X Gamecast', 'Spread:bad', 'Gamecast', 'Duke', 'North Carolina', '', 'ESPN', '(1-2 Gamecast)',
+              'O/U:140.5', '3 Team', 'Tickets Gamecast']
+
+
+def test_plain_slate():
+    lines = GAME + ['8:30 PM', 'Kansas', '(9-6)', 'Baylor', '(11-4)', 'Gamecast']
+    assert parse_desktop_format(lines) == reference_parse_desktop_format(lines)
+    assert len(parse_desktop_format(lines)) == 2
+
+
+def test_malformed_spread_with_gamecast_closes_the_game():
+    # The first game has no usable line; its Gamecast is on a malformed Spread: line,
+    # so the next game's spread must not be attached to it
+    lines = ['7:00 PM', 'Duke', '(10-5)', 'North Carolina', '(12-3)', 'Spread:X Gamecast',
+             'Spread:KU -2.5', '8:30 PM', 'Kansas', '(9-6)', 'Baylor', '(11-4)', 'Gamecast']
+    games = parse_desktop_format(lines)
+    assert games == reference_parse_desktop_format(lines)
+    assert games[0]['Market'] == 'N/A'
+
+
+def test_random_line_soup_matches_reference():
+    rng = random.Random(0)
+    for _ in range(5000):
+        lines = [rng.choice(FUZZ_LINES) for _ in range(rng.randint(1, 80))]
+        assert parse_desktop_format(lines) == reference_parse_desktop_format(lines), lines
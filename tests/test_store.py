@@ -0,0 +1,102 @@
+"""The SQLite store keeps ATS snapshots, games and charts by date for every worker"""
+import threading
+
+import app
+from cache import LRUCache
+from store import ChartStore
+
+ATS_TABLE = '\n'.join(['Rank\tTeam\tATS Record\tCover %\tATS +/-',
+                       '1\tDuke\t14-4-2\t77.8%\t+4.0',
+                       '2\tNorth Carolina\t10-9\t52.6%\t+0.5',
+                       '3\tKansas\t9-10\t47.4%\t-0.5',
+                       '4\tBaylor\t8-12\t40.0%\t-1.5'])
+
+
+def schedule(duke_spread):
+    lines = ['Saturday, February 7, 2026', '']
+    for game_time, away, home, spread in (('12:00 PM', 'Duke', 'North Carolina', f'DUKE {duke_spread}'),
+                                          ('2:00 PM', 'Kansas', 'Baylor', 'BAY -1.5')):
+        lines += [game_time, 'ESPN', away, '(15-8)', home, '(12-11)', f'Spread:{spread}', 'O/U:141.5', 'Gamecast']
+    return '\n'.join(lines)
+
+
+def stored_markets(store):
+    return [game['market'] for game in store.connection().execute('SELECT market FROM games ORDER BY rowid')]
+
+
+def test_snapshots_charts_and_team_history_round_trip(tmp_path):
+    store = ChartStore(str(tmp_path / 'data' / 'store.sqlite3'))
+    ats_dict = app.load_ats_data_from_text(ATS_TABLE)
+    games = list(app.iter_espn_schedule(schedule('-3.5')))
+    rows, _ = app.create_daily_chart(games, ats_dict, app.TEAM_NAME_MAPPING)
+
+    assert store.save_ats_snapshot('2026-02-01', {'Duke': ats_dict['Duke']}) == 1
+    assert store.save_ats_snapshot('2026-02-07', ats_dict) == 4
+    assert store.ats_snapshot('2026-02-07') == ats_dict
+    assert store.latest_ats_snapshot() == ('2026-02-07', ats_dict)
+    assert store.latest_ats_snapshot(on_or_before='2026-02-06')[0] == '2026-02-01'
+    assert store.latest_ats_snapshot(on_or_before='2026-01-01') is None
+    assert store.team_ats_history('Duke') == [('2026-02-01', '77.8%', 4.0), ('2026-02-07', '77.8%', 4.0)]
+
+    assert store.save_games('2026-02-07', games) == 2
+    assert store.save_chart('2026-02-07', rows) == 2
+    assert store.save_chart('2026-02-07', rows) == 2  # A re-paste replaces the date's rows
+    assert store.chart('2026-02-07') == rows
+    assert store.team_chart_rows('Baylor') == [('2026-02-07', rows[1])]
+    assert store.team_chart_rows('Baylor', start_date='2026-02-08') == []
+
+    # Each thread gets its own connection to the same file
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append((store.connection(), store.chart('2026-02-07'))))
+    thread.start()
+    thread.join()
+    assert seen[0][0] is not store.connection() and seen[0][1] == rows
+
+
+def test_slates_without_a_teamrankings_paste_use_the_stored_table(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    store = ChartStore(str(tmp_path / 'store.sqlite3'))
+    monkeypatch.setattr(app, 'CHART_STORE', store)
+    client = app.app.test_client()
+
+    assert client.post('/', data={'espn_schedule': schedule('-3.5')}).status_code == 302
+    assert client.post('/', data={'espn_schedule': schedule('-3.5'), 'teamrankings_ats': ATS_TABLE}).status_code == 200
+    assert stored_markets(store) == ['DUKE -3.5', 'BAY -1.5']
+
+    response = client.post('/', data={'espn_schedule': schedule('-4.5')})
+    assert response.status_code == 200
+    assert b'using the table saved on' in response.data
+    assert stored_markets(store) == ['DUKE -4.5', 'BAY -1.5']
+
+
+def test_repaste_overwrites_another_workers_slate(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    store = ChartStore(str(tmp_path / 'store.sqlite3'))
+    monkeypatch.setattr(app, 'CHART_STORE', store)
+    workers = [LRUCache('slate', max_entries=8), LRUCache('slate', max_entries=8)]
+    client = app.app.test_client()
+
+    for worker, spread in ((0, '-16.5'), (1, '-30.5'), (0, '-16.5')):
+        monkeypatch.setattr(app, 'SLATE_CHARTS', workers[worker])
+        response = client.post('/', data={'espn_schedule': schedule(spread), 'teamrankings_ats': ATS_TABLE})
+        assert response.status_code < 400
+        assert stored_markets(store) == [f'DUKE {spread}', 'BAY -1.5']
+        assert [row['Market'] for row in store.chart('2026-02-07')][0].startswith('DUKE')
+
+
+def test_save_slate_rewrites_only_rows_that_differ(tmp_path):
+    store = ChartStore(str(tmp_path / 'store.sqlite3'))
+    games = [{'Away': 'Duke', 'Home': 'North Carolina', 'Time': '12:00 PM',
+              'Market': {'original_abbrev': 'DUKE', 'value': '-3.5', 'display': 'DUKE -3.5'}},
+             {'Away': 'Kansas', 'Home': 'Baylor', 'Time': '2:00 PM', 'Market': 'No Line'}]
+    rows = [{'Away': game['Away'], 'Home': game['Home'], 'Time': game['Time'], 'Market': 'x', 'A Cover %': '50.0%',
+             'H Cover %': '40.0%', 'Avg Conf': '10.0%', 'ATS +/-': '+1.0'} for game in games]
+
+    assert store.save_slate('2026-02-07', games, rows) == 2
+    assert store.save_slate('2026-02-07', games, rows) == 0
+    assert store.save_slate('2026-02-07', games, [rows[0], {**rows[1], 'Avg Conf': '12.0%'}]) == 1
+    assert [row['Avg Conf'] for row in store.chart('2026-02-07')] == ['10.0%', '12.0%']
+    assert store.save_slate('2026-02-07', games[:1], rows[:1]) == 1
+    assert len(store.chart('2026-02-07')) == 1 and stored_markets(store) == ['DUKE -3.5']
@@ -0,0 +1,168 @@
+"""Streamed parsing (strings, text and binary streams) gives what splitting the whole input did"""
+import io
+import random
+import re
+
+import pytest
+
+from app import (InputTooLargeError, detect_schedule_format, iter_ats_records, iter_espn_schedule, make_spread,
+                 parse_desktop_format)
+
+TEAMS = ['Duke', 'North Carolina', 'Kansas', 'Baylor', 'Gonzaga', "Saint Mary's", 'Texas A&M', 'UConn']
+
+
+def reference_parse_mobile_format(lines):
+    """The mobile parser as it was when it indexed into the split input, kept verbatim as the reference"""
+    games = []
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if re.match(r'^\d{1,2}:\d{2}\s*[AP]M$', line):
+            time = line
+
+            if i+5 < len(lines):
+                away_team = lines[i+1].strip()
+                home_team = lines[i+3].strip()
+
+                if away_team and home_team:
+                    spread = None
+                    j = i + 5
+                    while j < min(i+20, len(lines)):
+                        check_line = lines[j].strip()
+                        if check_line == 'Spread:' and j+1 < len(lines):
+                            spread_line = lines[j+1].strip()
+                            spread_match = re.match(r'^([A-Z0-9&\-]+)\s+([-+]?\d+\.?\d*)$', spread_line)
+                            if spread_match:
+                                spread = make_spread(spread_match.group(1), spread_match.group(2))
+                            break
+                        j += 1
+
+                    games.append({
+                        'Away': away_team,
+                        'Home': home_team,
+                        'Time': time,
+                        'Market': spread if spread else 'N/A'
+                    })
+
+            i += 6
+        else:
+            i += 1
+
+    return games
+
+
+def reference_load_ats_data_from_text(text):
+    """The TeamRankings parser as it was when it split the whole paste, kept verbatim as the reference"""
+    ats_dict = {}
+    lines = text.strip().split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        match = re.match(r'^(\d+)\s+(.+?)\s+(\d+-\d+-?\d*)\s+([\d.]+%)\s+([-+]?\d+\.?\d*)$', line)
+        if match:
+            rank = match.group(1)
+            team_name = match.group(2).strip()
+            ats_record = match.group(3)
+            cover_pct = match.group(4)
+            ats_pm = float(match.group(5))
+            ats_dict[team_name] = {'rank': rank, 'record': ats_record, 'cover_pct': cover_pct, 'ats_pm': ats_pm}
+            continue
+
+        match2 = re.match(r'^(.+?)\s+(\d+-\d+-?\d*)\s+([\d.]+%)\s+[-+]?\d+\.?\d*\s+([-+]?\d+\.?\d*)$', line)
+        if match2:
+            team_name = match2.group(1).strip()
+            ats_record = match2.group(2)
+            cover_pct = match2.group(3)
+            ats_pm = float(match2.group(4))
+            ats_dict[team_name] = {'rank': 'N/A', 'record': ats_record, 'cover_pct': cover_pct, 'ats_pm': ats_pm}
+
+    return ats_dict
+
+
+def desktop_slate(rng, games):
+    lines = ['', 'Saturday, February 7, 2026', '', 'MATCHUP', 'TIME', 'TV']
+    for _ in range(games):
+        away, home = rng.sample(TEAMS, 2)
+        lines += [f'{rng.randint(1, 11)}:{rng.choice(["00", "30"])} PM', 'ESPN', away, f'({rng.randint(0, 20)}-5)',
+                  home, f'({rng.randint(0, 20)}-9)']
+        if rng.random() < 0.7:
+            lines.append(f'Spread:{away[:4].upper()} -{rng.randint(1, 20)}.5')
+        lines += ['O/U:141.5', 'Gamecast', rng.choice(['', 'Tickets as low as $20'])]
+    return '\n'.join(lines) + '\n\n'
+
+
+def mobile_slate(rng, games):
+    lines = ['Saturday, February 7, 2026', '']
+    for _ in range(games):
+        away, home = rng.sample(TEAMS, 2)
+        lines += [f'{rng.randint(1, 11)}:{rng.choice(["00", "30"])} PM', away, '15-8', home, '12-11', 'ESPN']
+        if rng.random() < 0.7:
+            lines += ['Spread:', f'{home[:4].upper()} -{rng.randint(1, 20)}.5']
+        lines += ['O/U:', '141.5', '']
+    return '\n'.join(lines)
+
+
+def ats_table(rng):
+    lines = ['Rank\tTeam\tATS Record\tCover %\tATS +/-', '']
+    for rank, team in enumerate(TEAMS, 1):
+        if rng.random() < 0.3:
+            lines.append(f'{team}\t{rng.randint(0, 20)}-{rng.randint(0, 20)}\t{rng.uniform(0, 100):.1f}%\t+1.0\t-2.5')
+        else:
+            lines.append(f'{rank}\t{team}\t{rng.randint(0, 20)}-{rng.randint(0, 20)}-1\t{rng.uniform(0, 100):.1f}%\t+{rng.randint(0, 9)}.5')
+    return '\n'.join(lines)
+
+
+def sources(text):
+    """The same input as a string, a text stream and a binary upload stream"""
+    return [text, io.StringIO(text), io.BytesIO(text.encode('utf-8'))]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_desktop_schedule_streams_like_the_split_parser(seed):
+    text = desktop_slate(random.Random(seed), games=random.Random(seed).randint(1, 30))
+    expected = parse_desktop_format(text.strip().split('\n'))
+    assert expected
+    for source in sources(text):
+        assert list(iter_espn_schedule(source)) == expected
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_mobile_schedule_streams_like_the_split_parser(seed):
+    text = mobile_slate(random.Random(seed), games=random.Random(seed).randint(1, 30))
+    lines = text.strip().split('\n')
+    assert detect_schedule_format(lines) == 'mobile'
+    expected = reference_parse_mobile_format(lines)
+    assert expected
+    for source in sources(text):
+        assert list(iter_espn_schedule(source)) == expected
+
+
+def test_mobile_schedule_games():
+    text = '\n'.join(['7:00 PM', 'Duke', '15-8', 'North Carolina', '12-11', 'ESPN', 'Spread:', 'DUKE -3.5',
+                      'O/U:', '141.5', '', '9:00 PM', 'Kansas', '20-3', 'Baylor', '10-13', 'ESPN2', 'O/U:', '139.5'])
+    assert list(iter_espn_schedule(text)) == [
+        {'Away': 'Duke', 'Home': 'North Carolina', 'Time': '7:00 PM', 'Market': make_spread('DUKE', '-3.5')},
+        {'Away': 'Kansas', 'Home': 'Baylor', 'Time': '9:00 PM', 'Market': 'N/A'},
+    ]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_ats_table_streams_like_the_split_parser(seed):
+    text = ats_table(random.Random(seed))
+    expected = reference_load_ats_data_from_text(text)
+    assert len(expected) == len(TEAMS)
+    for source in sources(text):
+        assert dict(iter_ats_records(source)) == expected
+
+
+def test_inputs_over_the_limit_raise_while_streaming():
+    text = desktop_slate(random.Random(0), games=30)
+    with pytest.raises(InputTooLargeError):
+        list(iter_espn_schedule(io.BytesIO(text.encode('utf-8')), max_chars=len(text) // 2))
+    with pytest.raises(InputTooLargeError):
+        dict(iter_ats_records(ats_table(random.Random(0)), max_chars=50))
@@ -0,0 +1,70 @@
+"""The grid search counts the same bets as the backtest and as a game-by-game recount"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import sweep
+from test_backtest import SCHEDULES, SCORES, SNAPSHOTS
+
+
+@pytest.fixture
+def season_files(tmp_path):
+    paths = []
+    for name, table in (('schedules', SCHEDULES), ('ats', SNAPSHOTS), ('scores', SCORES)):
+        paths.append(str(tmp_path / f'{name}.csv'))
+        table.to_csv(paths[-1], index=False)
+    return paths
+
+
+def recount(matchups, cover_weight, ats_weight, min_conf, max_conf):
+    bets = wins = losses = 0
+    for pct_diff, ats_pm_diff, margin in zip(matchups['pct_diff'], matchups['ats_pm_diff'],
+                                             matchups['away_cover_margin']):
+        score = cover_weight * pct_diff + ats_weight * ats_pm_diff
+        if score == 0 or not min_conf <= abs(score) < max_conf:
+            continue
+        bets += 1
+        margin = margin if score > 0 else -margin
+        wins += margin > 0
+        losses += margin < 0
+    return [bets, wins, losses, bets - wins - losses]
+
+
+def test_current_chart_matches_the_backtest(season_files):
+    matchups = sweep.load_matchups(*season_files)
+    assert len(matchups['pct_diff']) == 3
+    results = sweep.run_sweep(matchups, [1.0], [0.0], [0.0, 30.0, 50.0], [np.inf], workers=1)
+
+    report = backtest.run_backtest(*season_files)
+    overall = report['overall']
+    assert results.iloc[0][['bets', 'wins', 'losses', 'pushes']].tolist() == [
+        overall['bets'], overall['wins'], overall['losses'], overall['pushes']]
+    assert results.iloc[0]['units'] == pytest.approx(overall['units'], abs=0.005)
+    assert results['bets'].tolist() == [3, 2, 1]
+
+
+def test_every_grid_point_matches_a_recount():
+    rng = np.random.default_rng(0)
+    matchups = {'pct_diff': rng.choice([-20.0, -5.0, 0.0, 5.0, 35.0], 300),
+                'ats_pm_diff': rng.choice([-3.0, 0.0, 1.5], 300),
+                'away_cover_margin': rng.integers(-10, 10, 300).astype(float)}
+    grid = [[1.0], [0.0, 2.0, 10.0], [0.0, 5.0, 30.0], [30.0, np.inf]]
+    results = sweep.run_sweep(matchups, *grid, workers=1)
+    assert len(results) == 3 * 5
+    for row in results.itertuples():
+        assert [row.bets, row.wins, row.losses, row.pushes] == recount(
+            matchups, row.cover_weight, row.ats_weight, row.min_conf, row.max_conf)
+    pd.testing.assert_frame_equal(sweep.run_sweep(matchups, *grid, workers=2), results)
+
+    ranked = sweep.rank_results(results, min_bets=100)
+    assert ranked['bets'].min() >= 100 and ranked['roi'].is_monotonic_decreasing
+
+
+def test_grid_values():
+    assert sweep.parse_grid_values('0:1:0.25') == [0.0, 0.25, 0.5, 0.75]
+    assert sweep.parse_grid_values('40,50,inf') == [40.0, 50.0, np.inf]
+    with pytest.raises(ValueError):
+        sweep.parse_grid_values('0:1:0')
+    with pytest.raises(ValueError):
+        sweep.run_sweep({}, [1.0], [0.0], [50.0], [40.0])
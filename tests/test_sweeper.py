@@ -0,0 +1,109 @@
+"""ArtifactSweeper deletes artifacts by age and oldest-first over a byte budget covering every worker's files"""
+import os
+import subprocess
+import sys
+import time
+
+from sweeper import ArtifactSweeper
+
+
+def write(path, size, mtime):
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_expired_files_are_deleted_and_reused_files_kept(tmp_path):
+    now = time.time()
+    sweeper = ArtifactSweeper(str(tmp_path), max_age_seconds=3600)
+    for name, age in (('old.xlsx', 7200), ('reused.xlsx', 7200), ('new.xlsx', 60)):
+        write(tmp_path / name, 10, now - age)
+        sweeper.track(tmp_path / name, created_at=now - age)
+    sweeper.track(tmp_path / 'reused.xlsx', created_at=now - 5)  # Supersedes the old entry
+
+    assert sweeper.sweep(now) == (1, 10)
+    assert sorted(os.listdir(tmp_path)) == ['new.xlsx', 'reused.xlsx']
+    assert sweeper.stats() == {'tracked_files': 2, 'tracked_bytes': 20, 'swept_files': 1, 'swept_bytes': 10}
+
+
+def test_oldest_files_go_first_over_the_byte_budget(tmp_path):
+    now = time.time()
+    sweeper = ArtifactSweeper(str(tmp_path), max_age_seconds=3600, max_total_bytes=250)
+    for i, name in enumerate(['a.xlsx', 'b.xlsx', 'c.xlsx']):
+        write(tmp_path / name, 100, now - 30 + i)
+        sweeper.track(tmp_path / name, created_at=now - 30 + i)
+
+    assert sweeper.sweep(now) == (1, 100)
+    assert sorted(os.listdir(tmp_path)) == ['b.xlsx', 'c.xlsx']
+
+
+
+def test_rescan_tracks_other_workers_files_against_the_budget(tmp_path):
+    now = time.time()
+    worker_a = ArtifactSweeper(str(tmp_path), max_age_seconds=3600, max_total_bytes=250)
+    worker_b = ArtifactSweeper(str(tmp_path), max_age_seconds=3600, max_total_bytes=250)
+    write(tmp_path / 'a.xlsx', 100, now - 30)
+    worker_a.track(tmp_path / 'a.xlsx', created_at=now - 30)
+    write(tmp_path / 'b.xlsx', 100, now - 20)
+    worker_b.track(tmp_path / 'b.xlsx', created_at=now - 20)
+    write(tmp_path / 'c.xlsx', 100, now - 10)
+    worker_b.track(tmp_path / 'c.xlsx', created_at=now - 10)
+    (tmp_path / 'notes.txt').write_text('not an artifact')
+
+    # Alone, worker A sees 100 bytes; after a rescan it sees all 300 and trims the oldest file
+    assert worker_a.sweep(now) == (0, 0)
+    worker_a.rescan()
+    assert worker_a.stats()['tracked_files'] == 3
+    assert worker_a.sweep(now) == (1, 100)
+    assert sorted(os.listdir(tmp_path)) == ['b.xlsx', 'c.xlsx', 'notes.txt']
+
+    # Files another worker deleted drop out of the total
+    os.remove(tmp_path / 'b.xlsx')
+    worker_a.rescan()
+    assert worker_a.stats() == {'tracked_files': 1, 'tracked_bytes': 100, 'swept_files': 1, 'swept_bytes': 100}
+
+
+def test_rescan_expires_files_by_modification_time(tmp_path):
+    now = time.time()
+    sweeper = ArtifactSweeper(str(tmp_path), max_age_seconds=3600)
+    write(tmp_path / 'old.xlsx', 10, now - 7200)
+    write(tmp_path / 'new.xlsx', 10, now - 60)
+    sweeper.rescan()
+    assert sweeper.sweep(now) == (1, 10)
+    assert os.listdir(tmp_path) == ['new.xlsx']
+
+
+def test_files_tracked_during_a_rescan_keep_their_entries(tmp_path, monkeypatch):
+    now = time.time()
+    sweeper = ArtifactSweeper(str(tmp_path), max_age_seconds=3600)
+    write(tmp_path / 'reused.xlsx', 10, now - 7200)
+    sweeper.rescan()
+    listdir = os.scandir
+
+    def scandir_then_write(path):
+        # A request writes one workbook and reuses another after the directory was listed
+        entries = list(listdir(path))
+        write(tmp_path / 'new.xlsx', 10, now)
+        sweeper.track(tmp_path / 'new.xlsx')
+        sweeper.track(tmp_path / 'reused.xlsx')
+        return iter(entries)
+
+    monkeypatch.setattr(os, 'scandir', scandir_then_write)
+    sweeper.rescan()
+    monkeypatch.undo()
+    assert sweeper.stats()['tracked_files'] == 2
+    assert sweeper.sweep(now + 60) == (0, 0)
+    assert sorted(os.listdir(tmp_path)) == ['new.xlsx', 'reused.xlsx']
+
+
+def test_sweeper_starts_with_the_first_request_not_on_import(tmp_path):
+    code = ('import threading, app\n'
+            'names = lambda: [thread.name for thread in threading.enumerate()]\n'
+            'print("artifact-sweeper" in names())\n'
+            'app.app.test_client().get("/metrics")\n'
+            'print("artifact-sweeper" in names())\n')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, 'PYTHONPATH': root}
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env, capture_output=True, text=True,
+                            timeout=60)
+    assert result.stdout.split() == ['False', 'True'], result.stderr
@@ -0,0 +1,68 @@
+"""TeamResolver finds ATS records by exact name, the manual mapping, a normalized key, then by trigrams"""
+import app
+from app import TeamResolver, TrigramIndex, create_daily_chart, describe_unmapped_team, normalize_team_name
+
+ATS = {name: {'rank': str(rank), 'record': '10-9', 'cover_pct': f'{50 + rank}.0%', 'ats_pm': float(rank)}
+       for rank, name in enumerate(['Duke', 'San Jose St', "Mt St Mary's", 'Miami', 'Miami OH', 'St Thomas',
+                                    "Saint Mary's", 'NC State'], 1)}
+
+
+def test_normalized_key_folds_spelling_variants():
+    assert normalize_team_name('San José State') == normalize_team_name('San Jose St') == 'san jose st'
+    assert normalize_team_name("Mt. St. Mary's") == normalize_team_name("Mt St Mary’s")
+    assert normalize_team_name('Saint Thomas') == normalize_team_name('St. Thomas')
+
+
+def test_lookup_order():
+    resolver = TeamResolver(ATS, {'Miami (FL)': 'Miami', 'N.C. State': 'NC State', 'Gone': 'Not In The Table'},
+                            fuzzy_threshold=None)
+    assert resolver.resolve_name('Duke') == 'Duke'
+    assert resolver.resolve_name('Miami (FL)') == 'Miami'
+    assert resolver.resolve_name('San José State') == 'San Jose St'
+    assert resolver.resolve_name("Mount St Mary's") is None
+    assert resolver.resolve_name('Gone') is None
+    assert resolver.resolve('St. Thomas') is ATS['St Thomas']
+    assert resolver.resolve('Nowhere') is None
+
+
+def test_keys_shared_by_two_teams_are_not_guessed():
+    ats = {'St Johns': ATS['Duke'], "St. John's": ATS['Miami']}
+    resolver = TeamResolver(ats, {}, fuzzy_threshold=None)
+    assert resolver.resolve_name('St Johns') == 'St Johns'
+    assert resolver.resolve_name("Saint John's") is None
+
+
+def test_chart_rows_match_the_mapping_entries_it_replaced():
+    games = [{'Away': away, 'Home': home, 'Time': '7:00 PM', 'Market': 'N/A'}
+             for away, home in (('San Jose State', 'Duke'), ("Mount St. Mary's", 'Miami (OH)'),
+                                ('N.C. State', "St. Mary's"))]
+    rows, unmapped = create_daily_chart(games, ATS, app.TEAM_NAME_MAPPING)
+    assert unmapped == []
+    assert [row['A Cover %'] for row in rows] == [ATS['San Jose St']['cover_pct'], ATS["Mt St Mary's"]['cover_pct'],
+                                                  ATS['NC State']['cover_pct']]
+
+
+def test_trigram_index_ranks_by_dice_similarity():
+    index = TrigramIndex(['Duke', 'Duquesne', 'San Diego', 'San Diego St', 'Duke'])
+    assert index.names == ['Duke', 'Duquesne', 'San Diego', 'San Diego St']
+    assert index.best_match('Duke') == ('Duke', 1.0)
+    assert [name for name, _ in index.matches('San Diego State', limit=2)] == ['San Diego St', 'San Diego']
+    assert index.best_match('!!!') is None
+
+
+def test_misspelled_teams_are_fuzzy_matched_and_reported():
+    resolver = TeamResolver(ATS, {})
+    assert resolver.resolve_name('San Josee St') == 'San Jose St'
+    assert resolver.resolve_name('Sann Jose St') == 'San Jose St'
+    assert resolver.resolve_name('Dukee') is None  # Close, but under the threshold
+    assert set(resolver.fuzzy_matches) == {'San Josee St', 'Sann Jose St'}
+    assert all(score >= resolver.fuzzy_threshold for _, score in resolver.fuzzy_matches.values())
+
+
+def test_fuzzy_match_keeps_qualifiers():
+    ats = {'San Diego': ATS['Duke'], "Mt St Mary's": ATS["Mt St Mary's"]}
+    resolver = TeamResolver(ats, {})
+    assert resolver.resolve_name('San Diego State') is None
+    assert resolver.resolve_name('Mt St Marys MD') is None
+    assert describe_unmapped_team('San Diego State', resolver).startswith('San Diego State (closest: San Diego, ')
+    assert describe_unmapped_team('Zzyzx', resolver) == 'Zzyzx'
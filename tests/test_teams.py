@@ -0,0 +1,138 @@
+"""Team tables load from teams.json on first use and follow changes to the file"""
+import json
+import os
+
+import pytest
+
+import app
+from teams import TEAMS_FILE, TeamTables, TeamTablesLoader, fallback_abbreviation, main
+
+
+def write_teams(path, name_mapping, abbreviations, mtime_ns=None):
+    path.write_text(json.dumps({'team_name_mapping': name_mapping, 'abbreviations': abbreviations}))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_shipped_file_matches_the_app_tables():
+    tables = TeamTables.from_file(TEAMS_FILE)
+    assert app.team_name_mapping() == tables.name_mapping
+    assert app.TEAM_NAME_MAPPING['Duke'] == 'Duke'
+    assert app.derive_abbreviation('North Carolina') == tables.abbreviation('North Carolina')
+
+
+def test_abbreviations_fall_back_to_the_name():
+    assert fallback_abbreviation('Duke') == 'DUKE'
+    assert fallback_abbreviation('University of North Texas') == 'NT'
+    assert fallback_abbreviation('Texas A and M Corpus') == 'TEXA'
+
+    tables = TeamTables({'Duke': 'Duke', 'North Carolina': 'N Carolina', 'Nowhere St': 'Nowhere'}, {'Duke': 'DUKE', 'North Carolina': 'UNC'})
+    assert tables.abbreviation('North Carolina') == 'UNC'
+    assert tables.abbreviation('Nowhere St') == 'NS'
+    assert tables.abbreviation('Unlisted Team') == 'UT'
+    assert tables.teams_for_abbreviation('unc') == ('North Carolina',)
+    assert tables.teams_for_abbreviation('XYZ') == ()
+    with pytest.raises(TypeError):
+        tables.name_mapping['Duke'] = 'Blue Devils'
+
+
+@pytest.mark.parametrize('data', [[], {'team_name_mapping': {}}, {'team_name_mapping': {'Duke': ''}, 'abbreviations': {}},
+                                  {'team_name_mapping': {'Duke': 1}, 'abbreviations': {}}])
+def test_malformed_files_are_rejected(tmp_path, data):
+    path = tmp_path / 'teams.json'
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError):
+        TeamTables.from_file(str(path))
+
+
+def test_loader_reloads_changed_files_and_keeps_the_last_good_copy(tmp_path):
+    path = tmp_path / 'teams.json'
+    write_teams(path, {'Duke': 'Duke'}, {}, mtime_ns=10 ** 18)
+    loader = TeamTablesLoader(str(path), reload_interval=0.001)
+    first = loader.get()
+    assert loader.get() is first
+
+    write_teams(path, {'Duke': 'Duke', 'Kansas': 'Kansas'}, {'Kansas': 'KU'}, mtime_ns=2 * 10 ** 18)
+    loader._next_check = 0
+    second = loader.get()
+    assert second is not first and second.abbreviation('Kansas') == 'KU'
+    assert dict(first.name_mapping) == {'Duke': 'Duke'}
+
+    path.write_text('{ not json')
+    loader._next_check = 0
+    assert loader.get() is second
+    assert loader.reload() is second
+
+
+def test_loader_without_hot_reload_reads_once(tmp_path):
+    path = tmp_path / 'teams.json'
+    write_teams(path, {'Duke': 'Duke'}, {})
+    loader = TeamTablesLoader(str(path), reload_interval=0)
+    first = loader.get()
+    write_teams(path, {'Kansas': 'Kansas'}, {}, mtime_ns=2 * 10 ** 18)
+    assert loader.get() is first
+    assert list(loader.reload().name_mapping) == ['Kansas']
+
+
+def test_missing_file_fails_the_first_load(tmp_path):
+    with pytest.raises(OSError):
+        TeamTablesLoader(str(tmp_path / 'missing.json')).get()
+
+
+def test_spread_sides_resolve_by_exact_abbreviation():
+    tables = TeamTables({'North Carolina': 'N Carolina', 'UNC Wilmington': 'NC-Wilmington', 'Duke': 'Duke',
+                         'Miami': 'Miami (FL)', 'Miami (OH)': 'Miami (OH)'},
+                        {'North Carolina': 'UNC', 'UNC Wilmington': 'UNCW', 'Miami': 'MIA', 'Miami (OH)': 'MIA'})
+    assert tables.spread_side('UNC', 'UNC Wilmington', 'North Carolina') == 'home'
+    assert tables.spread_side('uncw', 'UNC Wilmington', 'North Carolina') == 'away'
+    # Prefixes only count for abbreviations the tables don't know, and only when one side matches
+    assert tables.spread_side('DU', 'Duke', 'North Carolina') == 'away'
+    assert tables.spread_side('UN', 'UNC Wilmington', 'North Carolina') is None
+    # Abbreviations shared by different teams only resolve when they are exactly one side's
+    assert tables.spread_side('MIA', 'Miami', 'Miami (OH)') is None
+    assert tables.spread_side('MIA', 'Duke', 'Miami (OH)') == 'home'
+    assert tables.conflict_report() == ['MIA: Miami (Miami (FL)), Miami (OH) (Miami (OH))']
+
+
+def test_names_of_one_team_share_its_abbreviation():
+    tables = TeamTables({'UConn': 'Connecticut', 'Connecticut': 'Connecticut', 'Duke': 'Duke'}, {'UConn': 'CONN'})
+    assert tables.abbreviation_conflicts == {}
+    assert tables.spread_side('CONN', 'Duke', 'Connecticut') == 'home'
+
+
+def test_ambiguous_lines_stay_unflipped(monkeypatch):
+    tables = TeamTables({'Miami': 'Miami (FL)', 'Miami (OH)': 'Miami (OH)'}, {'Miami': 'MIA', 'Miami (OH)': 'MIA'})
+    monkeypatch.setattr(app.TEAM_TABLES, 'get', lambda: tables)
+    games = [{'Away': 'Miami', 'Home': 'Miami (OH)', 'Time': '7:00 PM',
+              'Market': {'original_abbrev': 'MIA', 'value': '-3.5', 'display': 'MIA -3.5'}}]
+    ats = {'Miami (FL)': {'rank': '1', 'record': '10-5', 'cover_pct': '66.7%', 'ats_pm': 2.0},
+           'Miami (OH)': {'rank': '2', 'record': '5-10', 'cover_pct': '33.3%', 'ats_pm': -2.0}}
+    rows, _ = app.create_daily_chart(games, ats, tables.name_mapping)
+    assert rows[0]['Market'] == 'MIA -3.5'
+    frame, _ = app.chart_frame(games, ats, tables.name_mapping)
+    assert frame['Market'].tolist() == ['MIA -3.5']
+
+
+def test_cli_reports_shared_abbreviations(tmp_path, capsys):
+    path = tmp_path / 'teams.json'
+    write_teams(path, {'Miami': 'Miami (FL)', 'Miami (OH)': 'Miami (OH)'}, {'Miami': 'MIA', 'Miami (OH)': 'MIA'})
+    assert main([str(path)]) == 1
+    assert 'MIA: Miami (Miami (FL)), Miami (OH) (Miami (OH))' in capsys.readouterr().out
+    write_teams(path, {'Duke': 'Duke'}, {})
+    assert main([str(path)]) == 0
+    assert main([str(tmp_path / 'missing.json')]) == 2
+
+
+def test_shipped_teams_file_has_no_abbreviation_conflicts(capsys):
+    tables = TeamTables.from_file(TEAMS_FILE)
+    assert tables.conflict_report() == []
+    assert main([TEAMS_FILE]) == 0
+    assert 'shared by different teams' not in capsys.readouterr().out
+
+
+def test_formerly_shared_abbreviations_pick_the_right_side():
+    tables = TeamTables.from_file(TEAMS_FILE)
+    assert tables.spread_side('HCU', 'Houston Christian', 'Holy Cross') == 'away'
+    assert tables.spread_side('HC', 'Houston Christian', 'Holy Cross') == 'home'
+    assert tables.spread_side('M-OH', 'Miami (FL)', 'Miami (Ohio)') == 'home'
+    assert tables.spread_side('SLU', 'SE Louisiana', 'Saint Louis') == 'home'
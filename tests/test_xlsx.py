@@ -0,0 +1,78 @@
+"""Chart workbooks are named by their content, built once per distinct chart, and the same in either export mode"""
+import io
+import json
+import os
+
+from openpyxl import load_workbook
+
+import app
+from app import CHART_COLUMNS, chart_digest, create_xlsx_file, get_or_create_xlsx
+from cache import LRUCache
+
+
+def chart_rows(n, avg_conf='12.5'):
+    return [{'Away': f'Away {i}', 'Home': f'Home {i}', 'Market': f'H{i} -{i}.5', 'A Cover %': '55.0%',
+             'H Cover %': '42.5%', 'Avg Conf': avg_conf, 'ATS +/-': f'+{i}.0', 'Time': '7:00 PM'} for i in range(n)]
+
+
+def test_identical_charts_share_one_workbook(tmp_path):
+    filename, created = get_or_create_xlsx(chart_rows(5), str(tmp_path))
+    assert created and filename == f'daily_chart_{chart_digest(chart_rows(5))}.xlsx'
+    os.utime(tmp_path / filename, (0, 0))
+
+    assert get_or_create_xlsx(chart_rows(5), str(tmp_path)) == (filename, False)
+    assert os.path.getmtime(tmp_path / filename) > 0
+    other, created = get_or_create_xlsx(chart_rows(5, avg_conf='13.0'), str(tmp_path))
+    assert created and other != filename
+    assert sorted(os.listdir(tmp_path)) == sorted([filename, other])
+
+
+def test_workbook_holds_the_chart_rows(tmp_path):
+    rows = chart_rows(3)
+    filename, _ = get_or_create_xlsx(rows, str(tmp_path))
+    sheet = load_workbook(tmp_path / filename).active
+    assert [list(row) for row in sheet.iter_rows(values_only=True)] == (
+        [CHART_COLUMNS] + [[row[column] for column in CHART_COLUMNS] for row in rows])
+
+
+def cell_styles(cell):
+    return (cell.value, cell.font.b, cell.fill.fill_type, cell.fill.fgColor.rgb, cell.alignment.horizontal,
+            cell.alignment.vertical, cell.border.left.style, cell.border.top.style)
+
+
+def test_write_only_export_matches_the_standard_writer_cell_for_cell(tmp_path):
+    rows = chart_rows(6)
+    for i, avg_conf in enumerate(['55.0', '30.0', '29.9', '', 'n/a', '50.0']):
+        rows[i]['Avg Conf'] = avg_conf
+    create_xlsx_file(rows, tmp_path / 'standard.xlsx')
+    create_xlsx_file(rows, tmp_path / 'write_only.xlsx', write_only=True)
+
+    standard = load_workbook(tmp_path / 'standard.xlsx').active
+    write_only = load_workbook(tmp_path / 'write_only.xlsx').active
+    assert write_only.title == standard.title
+    assert write_only.max_row == standard.max_row == len(rows) + 1
+    for expected_row, row in zip(standard.iter_rows(), write_only.iter_rows()):
+        assert [cell_styles(cell) for cell in row] == [cell_styles(cell) for cell in expected_row]
+    for column in 'ABCDEFGH':
+        assert write_only.column_dimensions[column].width == standard.column_dimensions[column].width
+
+
+def test_memory_mode_downloads_are_rebuilt_from_the_posted_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    monkeypatch.setattr(app, 'XLSX_STORE', LRUCache('xlsx', max_bytes=1 << 20))
+    rows = chart_rows(4)
+    filename, created = get_or_create_xlsx(rows, storage='memory')
+    assert created and os.listdir(tmp_path / 'static') == []
+    client = app.app.test_client()
+
+    response = client.get(f'/download/{filename}')
+    assert response.status_code == 200
+    assert load_workbook(io.BytesIO(response.data)).active['A2'].value == 'Away 0'
+
+    app.XLSX_STORE.clear()  # Another worker, or evicted
+    assert client.get(f'/download/{filename}').status_code == 302
+    assert client.post(f'/download/{filename}', data={'chart_rows': json.dumps(rows[:3])}).status_code == 302
+    response = client.post(f'/download/{filename}', data={'chart_rows': json.dumps(rows)})
+    assert response.status_code == 200
+    assert app.XLSX_STORE.get(filename) == response.data
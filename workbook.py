@@ -0,0 +1,83 @@
+"""Chart workbooks assembled from per-row sheet XML, so an updated slate only re-renders its changed rows"""
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils.exceptions import IllegalCharacterError
+
+SHEET_PATH = 'xl/worksheets/sheet1.xml'
+
+ROW_RE = re.compile(r'<row r="(\d+)"[^>]*>(.*?)</row>', re.S)
+CELL_RE = re.compile(r'<c r="([A-Z]+)\d+" s="(\d+)"')
+
+
+class ChartSheetTemplate:
+    """A one-sheet chart workbook with its data rows cut out.
+
+    Made from a sample workbook written by the regular XLSX writer with a
+    header row and one data row per fill ('none' plus the names in fills),
+    so styles, column widths and every other part of the package are the
+    writer's own. render_row() turns a row of strings into the sheet XML the
+    writer would produce for it, with {0} in place of the row number, and
+    build() numbers and joins such fragments into a complete workbook.
+    """
+
+    def __init__(self, parts, sheet_head, sheet_tail, columns, styles):
+        self.parts = parts
+        self.sheet_head = sheet_head
+        self.sheet_tail = sheet_tail
+        self.columns = columns
+        self.styles = styles
+
+    @classmethod
+    def from_workbook(cls, data, fills):
+        """Template from sample workbook bytes whose data rows have fills 'none', *fills in order"""
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            parts = [(info.filename, archive.read(info)) for info in archive.infolist()]
+        sheet = dict(parts)[SHEET_PATH].decode('utf-8')
+        rows = list(ROW_RE.finditer(sheet))
+        if len(rows) != len(fills) + 2:
+            raise ValueError(f'sample workbook has {len(rows)} rows, expected a header and {len(fills) + 1}')
+        columns = [column for column, _ in CELL_RE.findall(rows[0].group(2))]
+        styles = {}
+        for fill, row in zip(('none',) + tuple(fills), rows[1:]):
+            cell_styles = {style for _, style in CELL_RE.findall(row.group(2))}
+            if len(cell_styles) != 1:
+                raise ValueError(f"sample row for fill {fill!r} doesn't have one style for every cell")
+            styles[fill] = cell_styles.pop()
+        return cls(parts, sheet[:rows[0].end()], sheet[rows[-1].end():], columns, styles)
+
+    def render_row(self, values, fill=None):
+        """Sheet XML for one data row, with '{0}' where its row number goes"""
+        style = self.styles[fill or 'none']
+        cells = [f'<row r="{{0}}">']
+        for column, value in zip(self.columns, values):
+            if value is None or value == '':
+                cells.append(f'<c r="{column}{{0}}" s="{style}" t="inlineStr" />')
+                continue
+            value = str(value)
+            if ILLEGAL_CHARACTERS_RE.search(value):
+                raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+            text = escape(value).replace('{', '{{').replace('}', '}}')
+            space = ' xml:space="preserve"' if value.strip() and value != value.strip() else ''
+            cells.append(f'<c r="{column}{{0}}" s="{style}" t="inlineStr"><is><t{space}>{text}</t></is></c>')
+        cells.append('</row>')
+        return ''.join(cells)
+
+    def build(self, fragments, output=None):
+        """Workbook bytes (or written to output, a path or file) with render_row fragments as rows 2, 3, ..."""
+        sheet = ''.join(chain_rows(self.sheet_head, fragments, self.sheet_tail))
+        buffer = output if output is not None else io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, content in self.parts:
+                archive.writestr(name, sheet.encode('utf-8') if name == SHEET_PATH else content)
+        return buffer.getvalue() if output is None else None
+
+
+def chain_rows(head, fragments, tail):
+    yield head
+    for number, fragment in enumerate(fragments, 2):
+        yield fragment.format(number)
+    yield tail